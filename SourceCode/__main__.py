@@ -1,43 +1,182 @@
-from lox.lexer import Lexer
-from lox.parser import Parser
-from lox.interpreter import Interpreter
-
+import glob
+import io
+import os
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from itertools import repeat
 
-def main(file):
-    with open(file, "r") as f:
-        lines = f.readlines()
+from lox.lexer import Lexer, LexerError
+from lox.parser import Parser
+from lox.limits import Limits
+from lox.program import BACKENDS, CompileError, Program
+from lox.cache import ProgramCache, CACHE_DIRECTORY
 
-    # remove comments and empty lines, then join lines
-    processed_lines = []
-    for line in lines:
-        line = line.split("#", 1)[0].strip()
-        if line:
-            processed_lines.append(line)
-    source = "\n".join(processed_lines)
 
-    # initialise the interpreter.
-    interpreter = Interpreter()
+def main(file, backend="interpreter", optimize=False, stream=False, cache_dir=None, profile=False, flamegraph=None,
+         limits=None, vectorize=False):
+    # returns whether the script ran without an error
+    if stream:
+        return run_stream(file, backend, optimize, vectorize)
 
-    try:
-        lexer = Lexer(source)
-        tokens = lexer.tokenize()
-    except Exception as e:
-        print(f"Lexer Error: {e}")
-        return
+    with open(file, "r") as f:
+        source = f.read()
 
+    # reuse the parse of an unchanged script
+    cache = ProgramCache(cache_dir) if cache_dir else None
     try:
-        parser = Parser(tokens)
-        statements = parser.parse()
-    except Exception as e:
-        print(f"Parser Error: {e}")
-        return
+        program = Program(source, backend=backend, optimize=optimize, vectorize=vectorize, limits=limits, cache=cache)
+    except CompileError as e:
+        print(f"{e.phase} Error: {e}")
+        return False
 
+    runner = program.runner(profile=profile or bool(flamegraph))
+    ok = True
     try:
-        interpreter.interpret(statements)
+        program.execute(runner)
     except Exception as e:
         print(f"Runtime Error: {e}")
+        ok = False
+
+    # a run that failed is still profiled up to the error
+    if profile:
+        print(runner.report(source), file=sys.stderr)
+    if flamegraph:
+        runner.write_collapsed(flamegraph)
+    return ok
+
+
+def run_stream(file, backend, optimize, vectorize=False):
+    # lex, parse and run one top-level statement at a time, so memory is
+    # bounded by the largest statement rather than the whole file
+    program = Program("", backend=backend, optimize=optimize, vectorize=vectorize)
+    runner = program.runner()
+
+    with open(file, "r") as f:
+        statements = Parser(Lexer(f).scan()).statements()
+        while True:
+            try:
+                stmt = next(statements, None)
+                if stmt is None:
+                    return True
+                code = program.compile([stmt])
+            except CompileError as e:
+                print(f"{e.phase} Error: {e}")
+                return False
+            except LexerError as e:
+                print(f"Lexer Error: {e}")
+                return False
+            except Exception as e:
+                print(f"Parser Error: {e}")
+                return False
+
+            try:
+                program.execute(runner, code)
+            except Exception as e:
+                print(f"Runtime Error: {e}")
+                return False
+
+
+def find_scripts(pattern):
+    # every .txt script in a directory, or the files a glob pattern matches, sorted
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.txt")
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def run_batch(pattern, workers=None, backend="interpreter", optimize=False, cache_dir=None, limits=None,
+              vectorize=False):
+    # runs every script pattern matches in a pool of worker processes and prints
+    # their output in order, each under a header naming the script
+    files = find_scripts(pattern)
+    failed = 0
+    # batches of scripts per task so thousands of small ones don't each pay a round trip
+    chunksize = max(1, len(files) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        results = pool.map(run_captured, files, repeat(backend), repeat(optimize), repeat(cache_dir),
+                           repeat(limits), repeat(vectorize), chunksize=chunksize)
+        for file, (ok, output) in zip(files, results):
+            print(f"==> {file} <==")
+            print(output, end="")
+            failed += not ok
+    print(f"{len(files)} scripts, {failed} failed", file=sys.stderr)
+    return failed == 0
+
+
+def init_worker():
+    # scripts share the terminal, input() reads end of file instead of racing for it
+    sys.stdin = open(os.devnull)
+
+
+def run_captured(file, backend, optimize, cache_dir, limits, vectorize):
+    # one script of a batch, returns whether it succeeded and what it printed
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            ok = main(file, backend, optimize, cache_dir=cache_dir, limits=limits, vectorize=vectorize)
+        except Exception as e:
+            print(f"Error: {e}")
+            ok = False
+    return ok, output.getvalue()
 
 
 if __name__ == "__main__":
-    file = "test.txt"
-    main(file)
+    arg_parser = ArgumentParser(usage='__main__.py [file] [--backend {interpreter,vm,python,compact}] [--optimize] [--stream] [--cache [DIR]] '
+                                      '[--profile] [--flamegraph FILE] [--batch] [--workers N] '
+                                      '[--max-steps N] [--timeout SECONDS] [--max-string N] [--vectorize]')
+    arg_parser.add_argument('file', nargs='?', default='test.txt',
+                            help='Lox script to run. Default: test.txt')
+    arg_parser.add_argument('--backend', choices=BACKENDS, default='interpreter',
+                            help='interpreter walks the AST, vm runs compiled bytecode, '
+                                 'python runs the program translated to Python, '
+                                 'compact walks the AST packed into arrays')
+    arg_parser.add_argument('--optimize', action='store_true',
+                            help='fold constants and simplify expressions before running')
+    arg_parser.add_argument('--stream', action='store_true',
+                            help='run each top-level statement as soon as it is parsed')
+    arg_parser.add_argument('--cache', nargs='?', const='', metavar='DIR',
+                            help=f'reuse parsed programs stored in DIR. Default: {CACHE_DIRECTORY} next to the file')
+    arg_parser.add_argument('--profile', action='store_true',
+                            help='print execution counts and times per node and per line to stderr')
+    arg_parser.add_argument('--flamegraph', metavar='FILE',
+                            help='write the profile to FILE as collapsed stacks for flamegraph.pl or speedscope')
+    arg_parser.add_argument('--batch', action='store_true',
+                            help='file is a directory or glob pattern, run every script it matches in parallel')
+    arg_parser.add_argument('--workers', type=int, metavar='N',
+                            help='worker processes for --batch. Default: one per CPU')
+    arg_parser.add_argument('--max-steps', type=int, metavar='N',
+                            help='stop a script after it has executed N statements')
+    arg_parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                            help='stop a script that runs longer than SECONDS')
+    arg_parser.add_argument('--max-string', type=int, metavar='N',
+                            help='stop a script that builds a string longer than N characters')
+    arg_parser.add_argument('--vectorize', action='store_true',
+                            help='run arithmetic loops counting towards a bound as compiled Python, '
+                                 'or in closed form when they only sum integers')
+    args = arg_parser.parse_args()
+    if (args.profile or args.flamegraph) and (args.backend != 'interpreter' or args.stream):
+        arg_parser.error('--profile and --flamegraph need the interpreter backend without --stream')
+    limits = None
+    if args.max_steps is not None or args.timeout is not None or args.max_string is not None:
+        limits = Limits(args.max_steps, args.timeout, args.max_string)
+        if args.backend != 'interpreter' or args.stream or args.profile or args.flamegraph:
+            arg_parser.error('--max-steps, --timeout and --max-string need the interpreter backend '
+                             'without --stream, --profile or --flamegraph')
+    if args.vectorize and args.backend != 'interpreter':
+        arg_parser.error('--vectorize needs the interpreter backend')
+    if args.stream and args.cache is not None:
+        arg_parser.error('--cache can\'t be combined with --stream')
+    if args.batch and (args.stream or args.profile or args.flamegraph):
+        arg_parser.error('--batch can\'t be combined with --stream, --profile or --flamegraph')
+    cache_dir = args.cache
+    if cache_dir == '':
+        if args.batch and os.path.isdir(args.file):
+            cache_dir = os.path.join(args.file, CACHE_DIRECTORY)
+        else:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(args.file)), CACHE_DIRECTORY)
+    if args.batch:
+        sys.exit(0 if run_batch(args.file, args.workers, args.backend, args.optimize, cache_dir, limits,
+                                   args.vectorize) else 1)
+    main(args.file, args.backend, args.optimize, args.stream, cache_dir, args.profile, args.flamegraph, limits,
+         args.vectorize)
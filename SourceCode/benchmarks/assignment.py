@@ -0,0 +1,41 @@
+# first-assignment throughput: assign() with a RuntimeError fallback to define()
+# vs Environment.assign_or_define, for many fresh bindings under a few parent scopes
+# run from SourceCode/: python -m benchmarks.assignment
+from lox.interpreter import Environment
+from lox.symbols import SYMBOLS
+from benchmarks.common import best_of, report
+
+
+def chain(depth):
+    environment = Environment()
+    for _ in range(depth):
+        environment = Environment(environment)
+    return environment
+
+
+def with_exceptions(symbols, depth):
+    environment = chain(depth)
+    for symbol in symbols:
+        try:
+            environment.assign(symbol, 1)
+        except RuntimeError:
+            environment.define(SYMBOLS.names[symbol], 1)
+
+
+def without_exceptions(symbols, depth):
+    environment = chain(depth)
+    for symbol in symbols:
+        environment.assign_or_define(symbol, 1)
+
+
+def main(n=1000000):
+    symbols = [SYMBOLS.intern(f"v{index}") for index in range(n)]
+    for depth in (0, 4):
+        report(f"{n} first assignments, {depth} parent scopes", [
+            ("assign + except", best_of(lambda: with_exceptions(symbols, depth), repeat=3)),
+            ("assign_or_define", best_of(lambda: without_exceptions(symbols, depth), repeat=3)),
+        ])
+
+
+if __name__ == "__main__":
+    main()
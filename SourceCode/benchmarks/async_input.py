@@ -0,0 +1,66 @@
+# many scripts that each wait on a slow input(), as a script reading from a
+# socket or an API would: one Interpreter per script run one after another,
+# with input blocking, vs AsyncInterpreters sharing one event loop, with
+# input awaiting
+# run from SourceCode/: python -m benchmarks.async_input
+import asyncio
+import time
+
+from lox.output import ListWriter
+from lox.program import Program
+from benchmarks.common import best_of, report
+
+SOURCE = """
+total = 0
+i = 0
+while (i < 5) {
+    line = input("> ")
+    total = total + line * 2
+    i = i + 1
+}
+print total
+"""
+
+SCRIPTS = 50
+# seconds each input() takes to answer
+DELAY = 0.01
+
+
+def slow_input(prompt):
+    time.sleep(DELAY)
+    return 21
+
+
+async def async_slow_input(prompt):
+    await asyncio.sleep(DELAY)
+    return 21
+
+
+def sequential(program):
+    output = ListWriter()
+    for _ in range(SCRIPTS):
+        program.run({"input": slow_input}, output)
+    return output.lines
+
+
+def concurrent(program):
+    outputs = [ListWriter() for _ in range(SCRIPTS)]
+
+    async def run_all():
+        await asyncio.gather(*(program.run_async({"input": async_slow_input}, output) for output in outputs))
+
+    asyncio.run(run_all())
+    return [line for output in outputs for line in output.lines]
+
+
+def main():
+    program = Program(SOURCE)
+    assert sequential(program) == concurrent(program) == ["210"] * SCRIPTS
+    report(f"{SCRIPTS} scripts, 5 input() calls of {DELAY * 1000:.0f} ms each", [
+        ("Interpreter, one by one", best_of(lambda: sequential(program), repeat=1)),
+        ("AsyncInterpreter, gather", best_of(lambda: concurrent(program), repeat=3)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# --batch scaling: wall time to run a directory of independent scripts with
+# 1 to N worker processes, interpreter start-up included
+# run from SourceCode/: python -m benchmarks.batch
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import report
+from benchmarks.workloads import arithmetic_loop
+
+
+def run(directory, workers):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "__main__.py", directory, "--batch", "--workers", str(workers)],
+                            capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    assert result.returncode == 0, result.stderr
+    return result.stdout, seconds
+
+
+def main(scripts=48, max_workers=None):
+    cpus = os.cpu_count() or 1
+    max_workers = max_workers or cpus
+    counts = sorted({1, 2, 4, 8, 16, max_workers} & set(range(1, max_workers + 1)))
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(scripts):
+            with open(os.path.join(directory, f"script{index:03d}.txt"), "w") as f:
+                f.write(arithmetic_loop(1) + f"print total + {index}\n")
+        rows = []
+        expected = None
+        for workers in counts:
+            output, seconds = run(directory, workers)
+            # same output in the same order whatever the worker count
+            assert expected is None or output == expected
+            expected = output
+            rows.append((f"{workers} worker{'s' if workers > 1 else ''}", seconds))
+        report(f"{scripts} scripts, 20000-iteration loop each, {cpus} CPUs", rows)
+
+
+if __name__ == "__main__":
+    main()
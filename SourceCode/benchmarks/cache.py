@@ -0,0 +1,58 @@
+# cold vs warm startup with the on-disk program cache: lex + parse + store
+# against loading the stored parse, checks the warm program matches the cold one
+# run from SourceCode/: python -m benchmarks.cache
+import pickle
+import tempfile
+import time
+
+from lox.cache import ProgramCache
+from lox.lexer import Lexer
+from lox.parser import Parser
+
+UNIT = """i = 0
+while (i < 10) {
+    total = total + (i * 2.5 - 1) / 3
+    if (total >= 1000 and i != 7) {
+        print "wrapped " + name
+    }
+    i = i + 1
+}
+"""
+
+
+def startup(cache, source):
+    statements = cache.load(source)
+    if statements is None:
+        statements = Parser(Lexer(source).tokenize()).parse()
+        cache.store(source, statements)
+    return statements
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(kilobytes=512):
+    source = UNIT * (kilobytes * 1024 // len(UNIT))
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory)
+        cold, cold_seconds = timed(lambda: startup(cache, source))
+        warm, warm_seconds = timed(lambda: startup(cache, source))
+        assert pickle.dumps(cold) == pickle.dumps(warm)
+
+        print(f"startup of a {kilobytes} KB script")
+        print(f"  {'cold':<8} {cold_seconds * 1000:10.2f} ms")
+        print(f"  {'warm':<8} {warm_seconds * 1000:10.2f} ms  {cold_seconds / warm_seconds:6.2f}x")
+
+        # a cache that only fits one entry keeps the most recently stored one
+        small = ProgramCache(directory, max_bytes=len(pickle.dumps(cold)) * 3 // 2)
+        small.clear()
+        startup(small, source)
+        startup(small, source + "\nprint 1")
+        assert small.load(source) is None and small.load(source + "\nprint 1") is not None
+
+
+if __name__ == "__main__":
+    main()
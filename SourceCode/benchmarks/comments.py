@@ -0,0 +1,78 @@
+# startup on a comment-heavy script: the old driver pass that split every
+# line on '#' and re-joined the file vs handing the raw file to the lexer.
+# Lexing the tokens dominates the total, so the columns that tell them apart
+# are the time to the first token and the peak memory: the old pass holds the
+# file three times over before the lexer sees a character, --stream holds a chunk
+# run from SourceCode/: python -m benchmarks.comments [megabytes], 100 for the full-size run
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from lox.lexer import Lexer
+
+UNIT = """# running totals for the report, recomputed every pass
+# keep in sync with the generator that writes these scripts
+total = total + 1 # bump
+# ----------------------------------------------------------------
+print "line " + name
+"""
+
+
+def split_lines(f):
+    lines = f.readlines()
+    processed_lines = []
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            processed_lines.append(line)
+    return Lexer("\n".join(processed_lines)).scan()
+
+
+def raw_file(f):
+    return Lexer(f.read()).scan()
+
+
+def stream(f):
+    return Lexer(f).scan()
+
+
+def measure(func, path):
+    # (seconds to the first token, seconds in total, MB of peak memory above the
+    # process's own), in a fresh process
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(path, "r") as f:
+        start = time.perf_counter()
+        tokens = func(f)
+        next(tokens)
+        first = time.perf_counter() - start
+        for _ in tokens:
+            pass
+        total = time.perf_counter() - start
+    return first, total, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+
+
+def main(megabytes=10):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        # a megabyte at a time, the workers would inherit this process's peak otherwise
+        block = UNIT * (1024 * 1024 // len(UNIT))
+        for _ in range(megabytes):
+            f.write(block)
+        path = f.name
+    try:
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(f"read + lex of a {size:.1f} MB comment-heavy script")
+        print(f"  {'':<12} {'first token':>14} {'total':>12} {'peak memory':>14}")
+        context = multiprocessing.get_context("spawn")
+        for label, func in (("split lines", split_lines), ("raw file", raw_file), ("stream", stream)):
+            with context.Pool(1) as pool:
+                first, total, peak = pool.apply(measure, (func, path))
+            print(f"  {label:<12} {first * 1000:11.2f} ms {total * 1000:9.2f} ms {peak:11.1f} MB")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
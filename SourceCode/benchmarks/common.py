@@ -0,0 +1,29 @@
+import time
+
+from lox.lexer import Lexer
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+
+
+def parse(source):
+    statements = Parser(Lexer(source).tokenize()).parse()
+    return Resolver(Interpreter().globals.names()).resolve(statements)
+
+
+def best_of(func, repeat=5):
+    # smallest wall time over a few runs, in seconds
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(title, rows):
+    # rows are (label, seconds) pairs, the first row is the reference
+    print(title)
+    reference = rows[0][1]
+    for label, seconds in rows:
+        print(f"  {label:<24} {seconds * 1000:10.2f} ms  {reference / seconds:6.2f}x")
@@ -0,0 +1,51 @@
+# memory per node of the object AST vs the array-backed CompactProgram on a
+# large flat script, and the run time of the two evaluators on a loop
+# run from SourceCode/: python -m benchmarks.compact
+import gc
+import tracemalloc
+
+from lox.compact import CompactEncoder, CompactInterpreter
+from lox.expressions import children
+from lox.interpreter import Interpreter
+from lox.lexer import Lexer
+from lox.parser import Parser
+from lox.resolver import Resolver
+from benchmarks.common import best_of, parse, report
+from benchmarks.workloads import arithmetic_loop, huge_flat_script
+
+
+def count_nodes(node) -> int:
+    return 1 + sum(count_nodes(child) for child in children(node))
+
+
+def allocated(func):
+    # bytes still allocated by func's result, the result itself
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(scale=5):
+    # tokens are made beforehand, the trees hold on to them either way
+    tokens = Lexer(huge_flat_script(scale)).tokenize()
+    statements, tree_size = allocated(lambda: Resolver(Interpreter().globals.names()).resolve(Parser(tokens).parse()))
+    program, compact_size = allocated(lambda: CompactEncoder().encode(statements))
+    nodes = sum(count_nodes(stmt) for stmt in statements)
+    print(f"flat script, {nodes} nodes ({len(program)} packed, groupings are dropped)")
+    print(f"  {'object AST':<24} {tree_size / 1e6:8.2f} MB  {tree_size / nodes:6.1f} bytes/node")
+    print(f"  {'CompactProgram':<24} {compact_size / 1e6:8.2f} MB  {compact_size / nodes:6.1f} bytes/node"
+          f"  ({program.nbytes() / 1e6:.2f} MB by nbytes(), shared values included)")
+
+    statements = parse(arithmetic_loop(1))
+    program = CompactEncoder().encode(statements)
+    report("arithmetic loop, 20000 iterations", [
+        ("Interpreter", best_of(lambda: Interpreter().interpret(statements), repeat=3)),
+        ("CompactInterpreter", best_of(lambda: CompactInterpreter().run(program), repeat=3)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# block frames: a new Scope for every block execution, as before, vs no frame
+# for blocks that define nothing and one reused Scope for those that do.
+# Counts the Scope objects each way creates and times them
+# run from SourceCode/: python -m benchmarks.frames
+import lox.interpreter
+from lox.interpreter import Interpreter, Scope
+from lox.lexer import Lexer
+from lox.output import ListWriter
+from lox.parser import Parser
+from lox.resolver import Resolver
+from benchmarks.common import best_of, report
+from benchmarks.workloads import WORKLOADS
+
+# a loop body that defines a variable, with an if block inside that doesn't
+LOCALS = """
+total = 0
+i = 0
+while (i < 30000) {
+    step = i * 2
+    if (step > 100) {
+        total = total + step
+    }
+    i = i + 1
+}
+print total
+"""
+
+
+class EveryBlockResolver(Resolver):
+    # depths counting every block, for FreshScopeInterpreter
+    def resolve(self, statements):
+        for stmt in statements:
+            stmt.accept(self)
+        return statements
+
+
+class FreshScopeInterpreter(Interpreter):
+    # the old visit_block_stmt
+    def visit_block_stmt(self, stmt):
+        previous = self.environment
+        self.environment = lox.interpreter.Scope(previous, stmt.names)
+        try:
+            for statement in stmt.statements:
+                self.execute(statement)
+        finally:
+            self.environment = previous
+
+
+class CountingScope(Scope):
+    created = 0
+
+    def __init__(self, parent, names):
+        CountingScope.created += 1
+        super().__init__(parent, names)
+
+
+def prepare(source, resolver_class):
+    statements = Parser(Lexer(source).tokenize()).parse()
+    return resolver_class(Interpreter().globals.names()).resolve(statements)
+
+
+def run(interpreter_class, statements):
+    interpreter = interpreter_class(ListWriter())
+    interpreter.interpret(statements)
+    return interpreter.output.lines
+
+
+def scopes_created(interpreter_class, statements):
+    CountingScope.created = 0
+    lox.interpreter.Scope = CountingScope
+    try:
+        run(interpreter_class, statements)
+    finally:
+        lox.interpreter.Scope = Scope
+    return CountingScope.created
+
+
+def main():
+    workloads = [(name, WORKLOADS[name](1)) for name in ("arithmetic_loop", "deep_nesting", "many_variables")]
+    for name, source in workloads + [("loop with locals", LOCALS)]:
+        fresh = prepare(source, EveryBlockResolver)
+        reused = prepare(source, Resolver)
+        assert run(FreshScopeInterpreter, fresh) == run(Interpreter, reused)
+        before, after = scopes_created(FreshScopeInterpreter, fresh), scopes_created(Interpreter, reused)
+        report(f"{name}: {before} Scopes created before, {after} now", [
+            ("new Scope per block", best_of(lambda: run(FreshScopeInterpreter, fresh), repeat=3)),
+            ("skipped and reused", best_of(lambda: run(Interpreter, reused), repeat=3)),
+        ])
+
+
+if __name__ == "__main__":
+    main()
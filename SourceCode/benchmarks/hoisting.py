@@ -0,0 +1,87 @@
+# loop-invariant hoisting and Comparison conditions: loops whose bodies
+# recompute expressions of variables they never assign, run through the
+# Optimizer with hoisting and without it (constant folding only)
+# run from SourceCode/: python -m benchmarks.hoisting
+from lox.expressions import Comparison, Invariant, children
+from lox.interpreter import Interpreter
+from lox.lexer import Lexer
+from lox.optimizer import Optimizer
+from lox.output import ListWriter
+from lox.parser import Parser
+from lox.resolver import Resolver
+from benchmarks.common import best_of, report
+
+INVARIANT_BODY = """
+width = 640
+height = 480
+scale = 3
+total = 0
+i = 0
+while (i < 50000) {
+    total = total + i * (width * height) / (scale * scale + 1) - (width + height) * scale
+    i = i + 1
+}
+print total
+"""
+
+NESTED = """
+rows = 250
+columns = 200
+offset = 7
+total = 0
+row = 0
+while (row < 300) {
+    column = 0
+    while (column < 200) {
+        total = total + row * (columns + offset) + column - (rows - offset) * 2
+        column = column + 1
+    }
+    row = row + 1
+}
+print total
+"""
+
+COUNTING = """
+i = 0
+while (i < 200000) {
+    i = i + 1
+}
+print i
+"""
+
+
+def prepare(source, hoist):
+    statements = Parser(Lexer(source).tokenize()).parse()
+    Optimizer(hoist=hoist).optimize(statements)
+    Resolver(Interpreter().globals.names()).resolve(statements)
+    return statements
+
+
+def run(statements):
+    interpreter = Interpreter(ListWriter())
+    interpreter.interpret(statements)
+    return interpreter.output.lines
+
+
+def count(statements, node_type):
+    pending, found = list(statements), 0
+    while pending:
+        node = pending.pop()
+        found += type(node) is node_type
+        pending.extend(children(node))
+    return found
+
+
+def main():
+    for name, source in (("invariant body", INVARIANT_BODY), ("nested loops", NESTED), ("counting loop", COUNTING)):
+        plain, hoisted = prepare(source, hoist=False), prepare(source, hoist=True)
+        assert run(plain) == run(hoisted)
+        assert count(hoisted, Comparison) > 0
+        report(f"{name}: {count(hoisted, Invariant)} invariants hoisted", [
+            ("without hoisting", best_of(lambda: run(plain), repeat=3)),
+            ("hoisting", best_of(lambda: run(hoisted), repeat=3)),
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# lexing throughput in MB/s and tokens/s on generated multi-megabyte scripts
+# run from SourceCode/: python -m benchmarks.lexer
+from lox.lexer import Lexer
+from benchmarks.common import best_of
+
+ARITHMETIC = """i = 0
+while (i < 100) {
+    total = total + (i * 2.5 - 1) / 3
+    if (total >= 1000 and i != 7) {
+        total = total - 1000
+    }
+    i = i + 1
+}
+"""
+
+STRINGS = 'print "the quick brown fox jumps over the lazy dog" + " " + name\n'
+
+IDENTIFIERS = "alpha_value = beta_value + gamma_value * delta_value - epsilon\n"
+
+
+def main(megabytes=4):
+    print(f"lexing {megabytes} MB scripts")
+    for label, unit in (("arithmetic", ARITHMETIC), ("strings", STRINGS), ("identifiers", IDENTIFIERS)):
+        source = unit * (megabytes * 1024 * 1024 // len(unit))
+        size = len(source.encode("utf-8")) / (1024 * 1024)
+        count = len(Lexer(source).tokenize())
+        seconds = best_of(lambda: Lexer(source).tokenize(), repeat=3)
+        print(f"  {label:<12} {size / seconds:8.2f} MB/s  {count / seconds / 1e6:6.2f} M tokens/s")
+
+
+if __name__ == "__main__":
+    main()
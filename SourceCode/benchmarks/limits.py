@@ -0,0 +1,45 @@
+# what checking execution budgets costs: the same workloads on Interpreter
+# and on a LimitedInterpreter with every limit set high enough never to trip
+# run from SourceCode/: python -m benchmarks.limits
+from lox.interpreter import Interpreter
+from lox.limits import LimitedInterpreter, LimitExceeded, Limits
+from lox.output import ListWriter
+from benchmarks.common import best_of, parse, report
+from benchmarks.workloads import WORKLOADS
+
+RUNAWAY = """
+i = 0
+while (true) {
+    i = i + 1
+}
+"""
+
+# limits that never trip, the string check costs a call per binary expression so it is measured apart
+STEPS_AND_TIMEOUT = Limits(max_steps=10 ** 9, timeout=3600.0)
+ALL = Limits(max_steps=10 ** 9, timeout=3600.0, max_string=10 ** 8)
+
+
+def run(make_interpreter, statements):
+    make_interpreter().interpret(statements)
+
+
+def main():
+    for name in ("arithmetic_loop", "deep_nesting", "many_variables", "string_concatenation"):
+        statements = parse(WORKLOADS[name](1))
+        report(name, [
+            ("Interpreter", best_of(lambda: run(lambda: Interpreter(ListWriter()), statements))),
+            ("steps, timeout", best_of(lambda: run(lambda: LimitedInterpreter(STEPS_AND_TIMEOUT, ListWriter()), statements))),
+            ("steps, timeout, string", best_of(lambda: run(lambda: LimitedInterpreter(ALL, ListWriter()), statements))),
+        ])
+
+    # a runaway loop is stopped, at exactly the step limit
+    interpreter = LimitedInterpreter(Limits(max_steps=100000), ListWriter())
+    try:
+        interpreter.interpret(parse(RUNAWAY))
+        raise AssertionError("the runaway loop wasn't stopped")
+    except LimitExceeded:
+        assert interpreter.steps == 100000
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# guard-heavy loop: and/or parsed as Binary (both operands always run) vs
+# short-circuiting Logical nodes. The guarded native call counts its invocations,
+# the runs check the right operand is skipped whenever the left one decides
+# run from SourceCode/: python -m benchmarks.logical
+from lox.expressions import Binary
+from lox.interpreter import Interpreter
+from lox.lexer import Lexer
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.tokens import TokenType
+from benchmarks.common import best_of, report
+
+SOURCE = """
+i = 0
+hits = 0
+while (i < {n}) {{
+    if (i / 10 == 0 and expensive(i)) {{
+        hits = hits + 1
+    }}
+    if (i > -1 or expensive(i)) {{
+        hits = hits + 1
+    }}
+    i = i + 1
+}}
+"""
+
+
+class BinaryParser(Parser):
+    # and/or as they were parsed before Logical nodes
+    def logic_or(self):
+        expr = self.logic_and()
+        while self.match(TokenType.OR):
+            operator = self.previous()
+            right = self.logic_and()
+            expr = Binary(expr, operator, right)
+        return expr
+
+    def logic_and(self):
+        expr = self.equality()
+        while self.match(TokenType.AND):
+            operator = self.previous()
+            right = self.equality()
+            expr = Binary(expr, operator, right)
+        return expr
+
+
+def run(parser_class, source):
+    calls = []
+
+    def expensive(value):
+        calls.append(value)
+        return sum(range(500)) > 0
+
+    interpreter = Interpreter()
+    interpreter.globals.define("expensive", expensive)
+    statements = parser_class(Lexer(source).tokenize()).parse()
+    Resolver(interpreter.globals.names()).resolve(statements)
+    interpreter.interpret(statements)
+    return calls
+
+
+def main(n=20000):
+    source = SOURCE.format(n=n)
+    # i / 10 == 0 holds only for i == 0, i > -1 always holds
+    assert run(BinaryParser, source) == [index for index in range(n) for _ in range(2)]
+    assert run(Parser, source) == [0]
+    report(f"guard-heavy loop, {n} iterations", [
+        ("and/or as Binary", best_of(lambda: run(BinaryParser, source))),
+        ("short-circuit Logical", best_of(lambda: run(Parser, source))),
+    ])
+
+
+if __name__ == "__main__":
+    main()
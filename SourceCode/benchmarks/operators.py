@@ -0,0 +1,75 @@
+# per-operator Binary evaluation cost: the old if/elif chain over TokenType
+# vs the operator function bound on the node
+# run from SourceCode/: python -m benchmarks.operators
+from lox.expressions import Binary, Literal
+from lox.interpreter import Interpreter
+from lox.tokens import Token, TokenType
+from benchmarks.common import best_of
+
+OPERATORS = [
+    ("+", TokenType.PLUS), ("-", TokenType.MINUS), ("*", TokenType.MUL), ("/", TokenType.DIV),
+    ("==", TokenType.EQUAL_EQUAL), ("!=", TokenType.BANG_EQUAL), ("<", TokenType.LESS),
+    ("<=", TokenType.LESS_EQUAL), (">", TokenType.GREATER), (">=", TokenType.GREATER_EQUAL),
+    ("and", TokenType.AND), ("or", TokenType.OR),
+]
+
+
+class ChainInterpreter(Interpreter):
+    # visit_binary_expr as it was before operators were bound on Binary
+    def visit_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        operator_type = expr.operator.type
+
+        if operator_type == TokenType.PLUS:
+            if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+                return left + right
+            elif isinstance(left, str) and isinstance(right, str):
+                return left + right
+            else:
+                raise RuntimeError("Operands must be two numbers or two strings")
+        elif operator_type == TokenType.MINUS:
+            return left - right
+        elif operator_type == TokenType.MUL:
+            return left * right
+        elif operator_type == TokenType.DIV:
+            return left / right
+        elif operator_type == TokenType.EQUAL_EQUAL:
+            return left == right
+        elif operator_type == TokenType.BANG_EQUAL:
+            return left != right
+        elif operator_type == TokenType.LESS:
+            return left < right
+        elif operator_type == TokenType.LESS_EQUAL:
+            return left <= right
+        elif operator_type == TokenType.GREATER:
+            return left > right
+        elif operator_type == TokenType.GREATER_EQUAL:
+            return left >= right
+        elif operator_type == TokenType.AND:
+            return left and right
+        elif operator_type == TokenType.OR:
+            return left or right
+        else:
+            raise Exception("Unknown binary operator")
+
+
+def evaluate_many(interpreter, expr, n):
+    evaluate = interpreter.evaluate
+    for _ in range(n):
+        evaluate(expr)
+
+
+def main(n=200000):
+    print(f"Binary evaluation, {n} evaluations, ns per evaluation")
+    print(f"  {'operator':<10} {'if/elif':>10} {'bound':>10}")
+    chain, bound = ChainInterpreter(), Interpreter()
+    for lexeme, token_type in OPERATORS:
+        expr = Binary(Literal(7), Token(token_type, lexeme, None), Literal(3))
+        before = best_of(lambda: evaluate_many(chain, expr, n))
+        after = best_of(lambda: evaluate_many(bound, expr, n))
+        print(f"  {lexeme:<10} {before / n * 1e9:10.1f} {after / n * 1e9:10.1f}  {before / after:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# constant folding: a loop full of literal-only subtrees, with and without the Optimizer
+# run from SourceCode/: python -m benchmarks.optimizer
+from lox.compiler import Compiler
+from lox.interpreter import Interpreter
+from lox.lexer import Lexer
+from lox.optimizer import Optimizer
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.vm import VM
+from benchmarks.common import best_of, report
+
+SOURCE = """
+i = 0
+total = 0
+while (i < {n}) {{
+    total = total + (60 * 60 * 24) * (i - 0) * 1 + -(2 + 3) / (4 - 2)
+    i = i + (1)
+}}
+"""
+
+
+def prepare(source, optimize):
+    statements = Parser(Lexer(source).tokenize()).parse()
+    if optimize:
+        statements = Optimizer().optimize(statements)
+    return Resolver(Interpreter().globals.names()).resolve(statements)
+
+
+def main(n=50000):
+    source = SOURCE.format(n=n)
+    plain = prepare(source, optimize=False)
+    folded = prepare(source, optimize=True)
+    report(f"literal-heavy loop, {n} iterations, interpreter", [
+        ("unoptimized", best_of(lambda: Interpreter().interpret(plain))),
+        ("optimized", best_of(lambda: Interpreter().interpret(folded))),
+    ])
+    plain_chunk = Compiler().compile(plain)
+    folded_chunk = Compiler().compile(folded)
+    report(f"literal-heavy loop, {n} iterations, vm", [
+        ("unoptimized", best_of(lambda: VM().run(plain_chunk))),
+        ("optimized", best_of(lambda: VM().run(folded_chunk))),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# print-heavy loops: the builtin print per statement, as before, vs the
+# interpreter's buffered writer and the in-memory ListWriter. Output goes to
+# a line-buffered file, which flushes on every newline like a terminal does
+# run from SourceCode/: python -m benchmarks.output
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from lox.interpreter import Interpreter
+from lox.output import BufferedWriter, ListWriter
+from benchmarks.common import parse, best_of, report
+
+SOURCE = """
+i = 0
+while (i < {n}) {{
+    print i * 2
+    print "line"
+    i = i + 1
+}}
+"""
+
+
+class PrintInterpreter(Interpreter):
+    def visit_print_stmt(self, stmt):
+        print(self.evaluate(stmt.expression))
+
+
+def main(n=50000):
+    statements = parse(SOURCE.format(n=n))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "out.txt")
+        with open(path, "w", buffering=1) as terminal, redirect_stdout(terminal):
+            rows = [
+                ("print per statement", best_of(lambda: PrintInterpreter().interpret(statements), repeat=3)),
+                ("BufferedWriter", best_of(lambda: Interpreter().interpret(statements), repeat=3)),
+                ("ListWriter", best_of(lambda: Interpreter(ListWriter()).interpret(statements), repeat=3)),
+            ]
+        # the same text whichever way it was written
+        expected = io.StringIO()
+        with redirect_stdout(expected):
+            PrintInterpreter().interpret(statements)
+        buffered = io.StringIO()
+        Interpreter(BufferedWriter(buffered, threshold=100)).interpret(statements)
+        assert buffered.getvalue() == expected.getvalue()
+    report(f"{2 * n} printed lines", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# cost of profiling: the plain Interpreter vs ProfilingInterpreter on the same
+# loop, and the size of the report and collapsed stacks it produces
+# run from SourceCode/: python -m benchmarks.profiler
+from lox.interpreter import Interpreter
+from lox.profiler import ProfilingInterpreter
+from benchmarks.common import parse, best_of, report
+from benchmarks.workloads import arithmetic_loop
+
+
+def main(scale=1):
+    statements = parse(arithmetic_loop(scale))
+    profiler = ProfilingInterpreter()
+    profiler.interpret(statements)
+    # every node on the loop's hot path ran once per iteration
+    assert max(stats.count for stats in profiler.nodes.values()) == 20000 * scale + 1
+    report(f"arithmetic loop, {20000 * scale} iterations", [
+        ("Interpreter", best_of(lambda: Interpreter().interpret(statements), repeat=3)),
+        ("ProfilingInterpreter", best_of(lambda: ProfilingInterpreter().interpret(statements), repeat=3)),
+    ])
+    print(f"  {len(profiler.nodes)} nodes, {len(profiler.lines)} lines, {len(profiler.collapsed())} stacks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# evaluating one small script against many inputs: lexing, parsing and
+# resolving it for every input, as __main__ does per file, vs a Program
+# compiled once and run per input
+# run from SourceCode/: python -m benchmarks.program
+from lox.interpreter import Interpreter
+from lox.lexer import Lexer
+from lox.output import ListWriter
+from lox.parser import Parser
+from lox.program import Program
+from lox.resolver import Resolver
+from benchmarks.common import best_of, report
+
+SOURCE = """
+price = base * quantity
+if (quantity > 10) {
+    price = price - price / 10
+}
+if (member and price > 100) {
+    price = price - 5
+}
+print price
+"""
+
+INPUTS = [{"base": 3 + index % 7, "quantity": index % 25, "member": index % 2 == 0} for index in range(5000)]
+
+
+def reparsed():
+    lines = []
+    for values in INPUTS:
+        interpreter = Interpreter(ListWriter())
+        for name, value in values.items():
+            interpreter.globals.define(name, value)
+        statements = Parser(Lexer(SOURCE).tokenize()).parse()
+        Resolver(interpreter.globals.names()).resolve(statements)
+        interpreter.interpret(statements)
+        lines.extend(interpreter.output.lines)
+    return lines
+
+
+def compiled(program):
+    output = ListWriter()
+    for values in INPUTS:
+        program.run(values, output)
+    return output.lines
+
+
+def main():
+    program = Program(SOURCE, globals=("base", "quantity", "member"))
+    python_program = Program(SOURCE, globals=("base", "quantity", "member"), backend="python")
+    assert reparsed() == compiled(program) == compiled(python_program)
+    report(f"{len(INPUTS)} runs of an 8-line script", [
+        ("parse per run", best_of(reparsed, repeat=3)),
+        ("Program.run", best_of(lambda: compiled(program), repeat=3)),
+        ("Program.run, python", best_of(lambda: compiled(python_program), repeat=3)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# tree-walker vs bytecode VM vs the Python source backend on a few loop workloads
+# run from SourceCode/: python -m benchmarks.pycompiler
+from lox.compiler import Compiler
+from lox.interpreter import Interpreter
+from lox.pycompiler import PyCompiler
+from lox.vm import VM
+from benchmarks.common import parse, best_of, report
+
+WORKLOADS = {
+    "while-loop arithmetic": """
+i = 0
+total = 0
+while (i < {n}) {{
+    total = total + i * 2 - 1
+    i = i + 1
+}}
+""",
+    "nested loops": """
+i = 0
+total = 0
+while (i < {n} / 100) {{
+    j = 0
+    while (j < 100) {{
+        total = total + i * j
+        j = j + 1
+    }}
+    i = i + 1
+}}
+""",
+    "guards and branches": """
+i = 0
+hits = 0
+while (i < {n}) {{
+    if (i / 3 > 5 and i != 50 or i == 2) {{
+        hits = hits + 1
+    }} else {{
+        hits = hits - 1
+    }}
+    i = i + 1
+}}
+""",
+    "string building": """
+i = 0
+text = ""
+while (i < {n} / 10) {{
+    text = text + "x"
+    i = i + 1
+}}
+""",
+}
+
+
+def main(n=100000):
+    for title, source in WORKLOADS.items():
+        statements = parse(source.format(n=n))
+        chunk = Compiler().compile(statements)
+        program = PyCompiler().compile(statements)
+        report(f"{title}, n = {n}", [
+            ("interpreter", best_of(lambda: Interpreter().interpret(statements), repeat=3)),
+            ("vm", best_of(lambda: VM().run(chunk), repeat=3)),
+            ("python", best_of(lambda: program.run(Interpreter().globals), repeat=3)),
+        ])
+
+
+if __name__ == "__main__":
+    main()
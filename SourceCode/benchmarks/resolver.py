@@ -0,0 +1,45 @@
+# slot lookups from the Resolver vs walking the environment chain by name,
+# inner loop reads and writes variables defined at every nesting level
+# run from SourceCode/: python -m benchmarks.resolver
+from lox.expressions import Variable, Assignment, children
+from lox.interpreter import Interpreter
+from benchmarks.common import parse, best_of, report
+
+
+def nested_source(depth, n):
+    # bare blocks don't parse, so nest with if (true)
+    lines = []
+    for level in range(depth):
+        lines.append("if (true) {")
+        lines.append(f"v{level} = {level}")
+    lines.append("i = 0")
+    lines.append(f"while (i < {n}) {{")
+    lines.append("    i = i + 1")
+    lines.append("    v0 = v0 + v" + str(depth - 1) + " * i")
+    lines.append("}")
+    lines.extend(["}"] * depth)
+    return "\n".join(lines)
+
+
+def unresolve(node):
+    # clear the Resolver's slots so every access takes the by-name path
+    if isinstance(node, (Variable, Assignment)):
+        node.depth = node.slot = None
+    for child in children(node):
+        unresolve(child)
+
+
+def main(n=20000):
+    for depth in (1, 8, 32):
+        resolved = parse(nested_source(depth, n))
+        dynamic = parse(nested_source(depth, n))
+        for stmt in dynamic:
+            unresolve(stmt)
+        report(f"nested blocks, depth {depth}, {n} iterations", [
+            ("by name", best_of(lambda: Interpreter().interpret(dynamic))),
+            ("slots", best_of(lambda: Interpreter().interpret(resolved))),
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# building long strings by appending to a variable, on an Interpreter whose
+# + copies both strings every time, as before, and on Interpreter, where a
+# long enough string becomes a Rope that is only joined when it is printed
+# or compared
+# run from SourceCode/: python -m benchmarks.ropes
+from lox.expressions import NumericBinary
+from lox.interpreter import Interpreter
+from lox.operators import add
+from lox.output import ListWriter
+from lox.rope import Rope
+from benchmarks.common import best_of, parse, report
+
+# doubles "0123456789" into a piece of 10 * 2^doublings characters and appends it count times
+APPEND = """
+piece = "0123456789"
+i = 0
+while (i < {doublings}) {{
+    piece = piece + piece
+    i = i + 1
+}}
+text = ""
+i = 0
+while (i < {count}) {{
+    text = text + piece
+    i = i + 1
+}}
+print text == text + ""
+print text
+"""
+
+
+class CopyingInterpreter(Interpreter):
+    # visit_binary_expr before ropes
+    def visit_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if expr.function is add and type(left) is type(right) and type(left) in (int, float):
+            expr.__class__ = NumericBinary
+            return left + right
+        return expr.function(left, right)
+
+
+def run(interpreter_class, statements):
+    interpreter = interpreter_class(ListWriter())
+    interpreter.interpret(statements)
+    return interpreter
+
+
+def main():
+    workloads = [
+        ("10 KB pieces to 10 MB", 10, 1000),
+        ("80 character pieces to 1 MB", 3, 12500),
+    ]
+    for name, doublings, count in workloads:
+        source = APPEND.format(doublings=doublings, count=count)
+        copying, roped = parse(source), parse(source)
+        assert run(CopyingInterpreter, copying).output.lines == run(Interpreter, roped).output.lines
+        report(name, [
+            ("copying", best_of(lambda: run(CopyingInterpreter, copying), repeat=3)),
+            ("ropes", best_of(lambda: run(Interpreter, roped), repeat=3)),
+        ])
+
+    # small pieces to 10 MB, which copying would take minutes for
+    statements = parse(APPEND.format(doublings=3, count=125000))
+    interpreter = run(Interpreter, statements)
+    assert interpreter.output.lines == ["True", "0123456789" * 1000000]
+    assert any(type(value) is Rope for value in interpreter.globals.values.values())
+    report("80 character pieces to 10 MB", [("ropes", best_of(lambda: run(Interpreter, statements), repeat=3))])
+
+
+if __name__ == "__main__":
+    main()
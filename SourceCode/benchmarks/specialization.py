@@ -0,0 +1,98 @@
+# type-feedback specialization of +: numeric loops on an Interpreter whose
+# Binary nodes never specialize, as before, and on Interpreter, where a + that
+# has seen two ints or two floats becomes a NumericBinary
+# run from SourceCode/: python -m benchmarks.specialization
+from lox.expressions import Binary, NumericBinary, children
+from lox.interpreter import Interpreter
+from lox.output import ListWriter
+from benchmarks.common import best_of, parse, report
+from benchmarks.workloads import WORKLOADS
+
+INT_SUM = """
+total = 0
+i = 0
+while (i < 40000) {
+    total = total + i + 1 + i
+    i = i + 1
+}
+print total
+"""
+
+FLOAT_SUM = """
+total = 0.5
+x = 0.25
+i = 0
+while (i < 40000) {
+    total = total + x + 0.125
+    x = x + 1.0
+    i = i + 1
+}
+print total
+"""
+
+# x + i sees ints, then a float and an int, which Python's + handles alike, then a string
+DEOPTIMIZING = """
+i = 0
+x = 1
+while (i < 6) {
+    y = x + i
+    if (i == 2) {
+        x = 0.5
+    }
+    if (i == 4) {
+        x = "s"
+    }
+    i = i + 1
+}
+"""
+
+
+class GenericInterpreter(Interpreter):
+    # visit_binary_expr before specialization
+    def visit_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        return expr.function(left, right)
+
+    visit_numeric_binary_expr = visit_binary_expr
+
+
+def run(interpreter_class, statements):
+    interpreter = interpreter_class(ListWriter())
+    interpreter.interpret(statements)
+    return interpreter.output.lines
+
+
+def count(statements, node_type):
+    pending, found = list(statements), 0
+    while pending:
+        node = pending.pop()
+        found += type(node) is node_type
+        pending.extend(children(node))
+    return found
+
+
+def main():
+    workloads = [("arithmetic_loop", WORKLOADS["arithmetic_loop"](2)), ("int sum", INT_SUM), ("float sum", FLOAT_SUM)]
+    for name, source in workloads:
+        generic, specialized = parse(source), parse(source)
+        assert run(GenericInterpreter, generic) == run(Interpreter, specialized)
+        numeric = count(specialized, NumericBinary)
+        report(f"{name}: {numeric} of {numeric + count(specialized, Binary)} binary expressions specialized", [
+            ("generic", best_of(lambda: run(GenericInterpreter, generic), repeat=3)),
+            ("specialized", best_of(lambda: run(Interpreter, specialized), repeat=3)),
+        ])
+
+    # a mismatch deoptimizes for good, and add() still raises its own error
+    statements = parse(DEOPTIMIZING)
+    try:
+        run(Interpreter, statements)
+        raise AssertionError("adding a string to a number didn't fail")
+    except RuntimeError as e:
+        assert str(e) == "Operands must be two numbers or two strings"
+    # x + i went back to a Binary, i = i + 1 stayed specialized
+    assert count(statements, NumericBinary) == 1
+
+
+if __name__ == "__main__":
+    main()
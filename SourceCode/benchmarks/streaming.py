@@ -0,0 +1,53 @@
+# peak memory of lexing + parsing a large file whole vs streaming it
+# statement by statement from the file object
+# run from SourceCode/: python -m benchmarks.streaming
+import os
+import tempfile
+import time
+import tracemalloc
+
+from lox.lexer import Lexer
+from lox.parser import Parser
+
+UNIT = "total = total + (i * 2 - 1) / 3\nif (total > 100) {\n    total = total - 100\n}\n"
+
+
+def whole(path):
+    with open(path, "r") as f:
+        source = f.read()
+    for _ in Parser(Lexer(source).tokenize()).parse():
+        pass
+
+
+def streamed(path):
+    with open(path, "r") as f:
+        for _ in Parser(Lexer(f).scan()).statements():
+            pass
+
+
+def measure(func, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main(megabytes=1):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write(UNIT * (megabytes * 1024 * 1024 // len(UNIT)))
+        path = f.name
+    try:
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(f"lex + parse of a {size:.1f} MB script, peak traced memory")
+        for label, func in (("whole file", whole), ("streamed", streamed)):
+            seconds, peak = measure(func, path)
+            print(f"  {label:<12} {peak / (1024 * 1024):10.2f} MB  {seconds * 1000:10.2f} ms")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
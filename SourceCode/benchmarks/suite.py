@@ -0,0 +1,140 @@
+# times the lexer, parser, resolver and interpreter phases separately on the
+# generated workloads, writes the results as JSON and compares them to a baseline
+# run from SourceCode/:
+#   python -m benchmarks.suite --output results.json
+#   python -m benchmarks.suite --baseline results.json
+import json
+import platform
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+
+from lox.expressions import children
+from lox.interpreter import Interpreter
+from lox.lexer import Lexer
+from lox.parser import Parser
+from lox.resolver import Resolver
+from benchmarks.workloads import WORKLOADS
+
+PHASES = ("lex", "parse", "resolve", "interpret")
+
+
+class CountingInterpreter(Interpreter):
+    # counts executed statements, used once per workload outside the timed runs
+    def __init__(self):
+        super().__init__()
+        self.executed = 0
+
+    def interpret(self, statements):
+        for stmt in statements:
+            self.execute(stmt)
+
+    def execute(self, stmt):
+        self.executed += 1
+        stmt.accept(self)
+
+
+def count_nodes(node) -> int:
+    # every expression and statement in the tree under node
+    return 1 + sum(count_nodes(child) for child in children(node))
+
+
+def sample(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(times, amount, unit):
+    return {
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "min": min(times),
+        "rate": amount / min(times),
+        "unit": unit,
+    }
+
+
+def run_workload(source, repeat):
+    tokens = Lexer(source).tokenize()
+    statements = Parser(tokens).parse()
+    nodes = sum(count_nodes(stmt) for stmt in statements)
+    Resolver(Interpreter().globals.names()).resolve(statements)
+    counter = CountingInterpreter()
+    counter.interpret(statements)
+
+    def resolve():
+        # resolution is idempotent, so the same tree can be resolved repeatedly
+        Resolver(Interpreter().globals.names()).resolve(statements)
+
+    return {
+        "lex": summarize(sample(lambda: Lexer(source).tokenize(), repeat), len(tokens), "tokens/s"),
+        "parse": summarize(sample(lambda: Parser(tokens).parse(), repeat), nodes, "nodes/s"),
+        "resolve": summarize(sample(resolve, repeat), nodes, "nodes/s"),
+        "interpret": summarize(sample(lambda: Interpreter().interpret(statements), repeat),
+                               counter.executed, "statements/s"),
+    }
+
+
+def compare(results, baseline, threshold):
+    # prints the change of every phase's best time, returns the regressions
+    regressions = []
+    print(f"\nagainst baseline (regression threshold {threshold:.0%})")
+    for workload, phases in results["results"].items():
+        for phase, current in phases.items():
+            previous = baseline.get("results", {}).get(workload, {}).get(phase)
+            if previous is None:
+                continue
+            change = current["min"] / previous["min"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append((workload, phase, change))
+            print(f"  {workload:<22} {phase:<10} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = ArgumentParser(usage='python -m benchmarks.suite [options]')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timed runs per phase. Default: 5')
+    arg_parser.add_argument('--scale', type=int, default=1, help='workload size multiplier. Default: 1')
+    arg_parser.add_argument('--only', nargs='+', choices=WORKLOADS, help='run only these workloads')
+    arg_parser.add_argument('--output', help='write the results to this JSON file')
+    arg_parser.add_argument('--baseline', help='compare against results saved with --output')
+    arg_parser.add_argument('--threshold', type=float, default=0.10,
+                            help='slowdown reported as a regression. Default: 0.10')
+    args = arg_parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "scale": args.scale,
+        "results": {},
+    }
+    print(f"{'workload':<22} {'phase':<10} {'mean ms':>10} {'stdev':>8} {'min ms':>10}  throughput")
+    for name in args.only or WORKLOADS:
+        phases = run_workload(WORKLOADS[name](args.scale), args.repeat)
+        results["results"][name] = phases
+        for phase in PHASES:
+            entry = phases[phase]
+            print(f"{name:<22} {phase:<10} {entry['mean'] * 1000:10.2f} {entry['stdev'] * 1000:8.2f} "
+                  f"{entry['min'] * 1000:10.2f}  {entry['rate']:,.0f} {entry['unit']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# variable traffic with environments keyed on symbol ids vs on name strings,
+# and how many identifier strings the lexer keeps once they are interned
+# run from SourceCode/: python -m benchmarks.symbols
+from sys import getsizeof
+
+from lox.interpreter import Environment, Interpreter
+from lox.lexer import Lexer
+from lox.resolver import GLOBAL
+from lox.tokens import TokenType
+from benchmarks.common import parse, best_of, report
+from benchmarks.workloads import arithmetic_loop, many_variables, huge_flat_script
+
+
+class NamedEnvironment(Environment):
+    # globals keyed on name strings, as they were before symbol ids
+    def define(self, name: str, value):
+        self.values[name] = value
+
+    def get(self, name):
+        if name.lexeme in self.values:
+            return self.values[name.lexeme]
+        raise RuntimeError(f"Undefined variable '{name.lexeme}'.")
+
+
+class NamedInterpreter(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.globals = NamedEnvironment()
+        self.environment = self.globals
+        self.globals.define("input", lambda prompt: input(prompt))
+
+    # as they were before symbol ids, only the global cases differ
+    def visit_variable_expr(self, expr):
+        depth = expr.depth
+        if depth is None:
+            return self.environment.get(expr.symbol)
+        if depth == GLOBAL:
+            return self.globals.get(expr.name)
+        environment = self.environment
+        while depth:
+            environment = environment.parent
+            depth -= 1
+        return environment.values[expr.slot]
+
+    def visit_assignment_expr(self, expr):
+        value = self.evaluate(expr.value)
+        depth = expr.depth
+        if depth is None:
+            self.environment.assign_or_define(expr.symbol, value)
+        elif depth == GLOBAL:
+            self.globals.values[expr.name.lexeme] = value
+        else:
+            environment = self.environment
+            while depth:
+                environment = environment.parent
+                depth -= 1
+            environment.values[expr.slot] = value
+        return value
+
+def main(scale=1):
+    # the workloads only use globals and resolved block slots, never a by-name lookup
+    for title, source in (("arithmetic loop", arithmetic_loop(scale)),
+                          ("many variables", many_variables(scale)),
+                          ("huge flat script", huge_flat_script(scale))):
+        statements = parse(source)
+        report(title, [
+            ("name strings", best_of(lambda: NamedInterpreter().interpret(statements), repeat=3)),
+            ("symbol ids", best_of(lambda: Interpreter().interpret(statements), repeat=3)),
+        ])
+
+    tokens = [token for token in Lexer(huge_flat_script(scale)).tokenize() if token.type == TokenType.IDENTIFIER]
+    shared = {id(token.lexeme): token.lexeme for token in tokens}
+    print(f"huge flat script, {len(tokens)} identifier tokens")
+    print(f"  {len(shared)} distinct lexeme strings, "
+          f"{(sum(getsizeof(token.lexeme) for token in tokens) - sum(map(getsizeof, shared.values()))) / 1e6:.2f} MB "
+          f"of duplicate strings avoided")
+
+
+if __name__ == "__main__":
+    main()
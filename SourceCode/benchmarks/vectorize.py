@@ -0,0 +1,111 @@
+# counted loops: arithmetic loops interpreted statement by statement, and
+# through the Vectorizer, which sums integer loops in closed form and runs
+# the others as compiled Python. Results have to come out identical, ints
+# staying ints and floats rounding the same
+# run from SourceCode/: python -m benchmarks.vectorize
+from lox.expressions import children
+from lox.interpreter import Interpreter
+from lox.output import ListWriter
+from lox.statements import WhileStmt
+from lox.vectorizer import Vectorizer
+from benchmarks.common import best_of, parse, report
+
+# integer accumulators of polynomials of i: closed form
+INT_SUMS = """
+total = 0
+squares = 7
+i = 3
+while (i < 200000) {
+    total = total + i
+    i = i + 2
+    squares = squares - (i * i * 3 - i)
+}
+print total
+print squares
+print i
+"""
+
+# float state carried from one iteration to the next: compiled Python
+FLOAT_RECURRENCE = """
+x = 0.5
+velocity = 0
+i = 100000
+while (i > 0) {
+    velocity = velocity * 0.999 + 0.001 * x
+    x = x + velocity / 3 - 0.25
+    i = i - 1
+}
+print x
+print velocity
+print i
+"""
+
+# an int bound, an int counter and one float accumulator
+MIXED = """
+total = 0
+n = 150000
+i = 0
+while (i <= n) {
+    total = total + i * 0.5
+    i = i + 1
+}
+print total
+print i
+"""
+
+# the same loop, but total turns out to be a string at run time
+FALLBACK = """
+total = "x"
+i = 0
+while (i < 3) {
+    total = total + i
+    i = i + 1
+}
+"""
+
+
+def prepare(source, vectorize):
+    statements = parse(source)
+    if vectorize:
+        Vectorizer().vectorize(statements)
+    return statements
+
+
+def run(statements):
+    interpreter = Interpreter(ListWriter())
+    interpreter.interpret(statements)
+    numbers = [value for value in interpreter.globals.values.values() if not callable(value)]
+    return interpreter.output.lines, [(type(value), value) for value in numbers]
+
+
+def kernels(statements):
+    pending, found = list(statements), 0
+    while pending:
+        node = pending.pop()
+        found += isinstance(node, WhileStmt) and node.kernel is not None
+        pending.extend(children(node))
+    return found
+
+
+def main():
+    for name, source in (("int sums", INT_SUMS), ("float recurrence", FLOAT_RECURRENCE), ("mixed", MIXED)):
+        plain, vectorized = prepare(source, False), prepare(source, True)
+        assert kernels(vectorized) == 1
+        assert run(plain) == run(vectorized)
+        report(name, [
+            ("interpreted", best_of(lambda: run(plain), repeat=3)),
+            ("vectorized", best_of(lambda: run(vectorized), repeat=3)),
+        ])
+
+    # a kernel that can't run leaves the loop to the Interpreter, which raises as it always did
+    statements = prepare(FALLBACK, True)
+    assert kernels(statements) == 1
+    try:
+        run(statements)
+        raise AssertionError("adding a number to a string didn't fail")
+    except RuntimeError as e:
+        assert str(e) == "Operands must be two numbers or two strings"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# tree-walking interpreter vs bytecode VM on while-loop arithmetic
+# run from SourceCode/: python -m benchmarks.vm
+from lox.compiler import Compiler
+from lox.interpreter import Interpreter
+from lox.vm import VM
+from benchmarks.common import parse, best_of, report
+
+SOURCE = """
+i = 0
+total = 0
+while (i < {n}) {{
+    total = total + i * 2 - 1
+    i = i + 1
+}}
+"""
+
+
+def main(n=100000):
+    statements = parse(SOURCE.format(n=n))
+    chunk = Compiler().compile(statements)
+    report(f"while-loop arithmetic, {n} iterations", [
+        ("interpreter", best_of(lambda: Interpreter().interpret(statements))),
+        ("vm", best_of(lambda: VM().run(chunk))),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# generated Lox scripts for the benchmark suite, scale multiplies their size.
+# none of them print, so timings measure the interpreter and not the terminal
+
+
+def arithmetic_loop(scale):
+    return f"""
+i = 0
+total = 0
+while (i < {20000 * scale}) {{
+    total = total + (i * 3 - 1) / 2
+    i = i + 1
+}}
+"""
+
+
+def deep_nesting(scale, depth=24):
+    lines = []
+    for level in range(depth):
+        lines.append("if (true) {")
+        lines.append(f"v{level} = {level}")
+    lines.append("i = 0")
+    lines.append(f"while (i < {2000 * scale}) {{")
+    lines.append(f"    v0 = v0 + v{depth - 1} - i")
+    lines.append("    i = i + 1")
+    lines.append("}")
+    lines.extend(["}"] * depth)
+    return "\n".join(lines)
+
+
+def many_variables(scale, count=500):
+    lines = ["i = 0", f"while (i < {20 * scale}) {{"]
+    for index in range(count):
+        previous = f"x{index - 1}" if index else "i"
+        lines.append(f"    x{index} = {previous} + {index}")
+    lines.append("    i = i + 1")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def string_concatenation(scale):
+    return f"""
+i = 0
+text = ""
+while (i < {5000 * scale}) {{
+    text = text + "ab" + "c"
+    i = i + 1
+}}
+"""
+
+
+def huge_flat_script(scale):
+    lines = ["v0 = 0"]
+    for index in range(1, 10000 * scale):
+        lines.append(f"v{index} = v{index - 1} + {index} * 2 - 1")
+    return "\n".join(lines)
+
+
+WORKLOADS = {
+    "arithmetic_loop": arithmetic_loop,
+    "deep_nesting": deep_nesting,
+    "many_variables": many_variables,
+    "string_concatenation": string_concatenation,
+    "huge_flat_script": huge_flat_script,
+}
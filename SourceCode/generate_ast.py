@@ -27,6 +27,7 @@ EXPRESSIONS: ASTDict = {
     'Call': ('callee: Expr', 'paren: Token', 'arguments: List[Expr]'),
     'Get': ('obj: Expr', 'name: Token'),
     'Grouping': ('expression: Expr',),
+    'Invariant': ('expression: Expr', 'index: int'),
     'Literal': ('value: Any',),
     'Logical': ('left: Expr', 'operator: Token', 'right: Expr'),
     'Set': ('obj: Expr', 'name: Token', 'value: Expr'),
@@ -54,6 +55,8 @@ def define_ast(path: Path, base_name: str, types: ASTDict, imports: Tuple[str])
         file.write('\n\n')
         file.write(f'class {name}(ABC):')
         file.write('\n')
+        file.write(f'{INDENTATION}__slots__ = ()')
+        file.write('\n\n')
         file.write(f'{INDENTATION}@abstractmethod')
         file.write('\n')
         file.write(f'{INDENTATION}def accept(self, visitor: {visitor}):')
@@ -74,6 +77,9 @@ def define_imports(file: TextIO, lines: Tuple[str]) -> None:
 def define_type(file: TextIO, base_name: str, class_name: str, fields: Tuple[str]) -> None:
     file.write(f'class {class_name}({base_name}):')
     file.write('\n')
+    slots = ''.join(f"'{field.split(':')[0]}', " for field in fields)
+    file.write(f'{INDENTATION}__slots__ = ({slots.rstrip()})')
+    file.write('\n\n')
     file.write(f'{INDENTATION}')
     file.write(f'def __init__(self, {", ".join(fields)}) -> None:')
     file.write('\n')
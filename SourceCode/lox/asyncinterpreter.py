@@ -0,0 +1,157 @@
+import asyncio
+from inspect import isawaitable
+from typing import Dict
+from lox.expressions import Assignment, Binary, Call, Grouping, Logical, NumericBinary, Unary, children
+from lox.interpreter import Interpreter
+from lox.operators import add
+from lox.resolver import GLOBAL
+from lox.rope import compare_flattened, concatenate, flatten
+from lox.statements import BlockStmt, Expression, IfStmt, Print, WhileStmt
+from lox.tokens import TokenType
+
+
+class AsyncInterpreter(Interpreter):
+    # Interpreter whose native functions may be coroutine functions, or return
+    # any awaitable, which is awaited. Many instances can run on one event loop.
+    #
+    # only statements and expressions containing a call can suspend. Everything
+    # else runs through the synchronous Interpreter methods, so loops without
+    # calls cost the same as in Interpreter, and never yield to other scripts.
+    # input() reads stdin in the loop's default executor.
+    def __init__(self, output=None):
+        super().__init__(output)
+        # node -> whether evaluating it may await
+        self.suspends: Dict[object, bool] = {}
+
+    async def interpret_async(self, statements):
+        # statements must have been through the Resolver
+        try:
+            for stmt in statements:
+                await self.execute_async(stmt)
+        finally:
+            self.output.flush()
+
+    async def read_line(self, prompt):
+        # Runner.read_line, reading stdin in the loop's default executor
+        self.output.flush()
+        return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+    def may_suspend(self, node) -> bool:
+        result = self.suspends.get(node)
+        if result is None:
+            result = isinstance(node, Call) or any(self.may_suspend(child) for child in children(node))
+            self.suspends[node] = result
+        return result
+
+    async def evaluate_async(self, expr):
+        if not self.may_suspend(expr):
+            return self.evaluate(expr)
+        return await ASYNC_VISITORS[type(expr)](self, expr)
+
+    async def execute_async(self, stmt):
+        if not self.may_suspend(stmt):
+            self.execute(stmt)
+            return
+        await ASYNC_VISITORS[type(stmt)](self, stmt)
+
+    async def _print(self, stmt):
+        self.output.write(await self.evaluate_async(stmt.expression))
+
+    async def _expression(self, stmt):
+        await self.evaluate_async(stmt.expression)
+
+    async def _if(self, stmt):
+        if self.is_truthy(await self.evaluate_async(stmt.condition)):
+            await self.execute_async(stmt.then_branch)
+        elif stmt.else_branch is not None:
+            await self.execute_async(stmt.else_branch)
+
+    async def _while(self, stmt):
+        while self.is_truthy(await self.evaluate_async(stmt.condition)):
+            await self.execute_async(stmt.body)
+
+    async def _block(self, stmt):
+        # Runner._run_block, awaiting
+        if not stmt.names:
+            for statement in stmt.statements:
+                await self.execute_async(statement)
+            return
+        previous = self.environment
+        self.environment = self._block_scope(stmt, stmt.names, previous)
+        try:
+            for statement in stmt.statements:
+                await self.execute_async(statement)
+        finally:
+            self.environment = previous
+
+    async def _assignment(self, expr):
+        value = await self.evaluate_async(expr.value)
+        depth = expr.depth
+        if depth is None:
+            self.environment.assign_or_define(expr.symbol, value)
+        elif depth == GLOBAL:
+            self.globals.values[expr.symbol] = value
+        else:
+            environment = self.environment
+            while depth:
+                environment = environment.parent
+                depth -= 1
+            environment.values[expr.slot] = value
+        return value
+
+    async def _binary(self, expr):
+        left = await self.evaluate_async(expr.left)
+        right = await self.evaluate_async(expr.right)
+        if expr.function is add:
+            return concatenate(left, right)
+        try:
+            return expr.function(left, right)
+        except TypeError as error:
+            return compare_flattened(expr.function, left, right, error)
+
+    async def _logical(self, expr):
+        left = await self.evaluate_async(expr.left)
+        if expr.operator.type == TokenType.OR:
+            if self.is_truthy(left): return left
+        else:
+            if not self.is_truthy(left): return left
+        return await self.evaluate_async(expr.right)
+
+    async def _unary(self, expr):
+        right = await self.evaluate_async(expr.right)
+        if expr.operator.type == TokenType.MINUS:
+            return -right
+        elif expr.operator.type == TokenType.BANG:
+            return not right
+        else:
+            raise Exception("Unknown unary operator")
+
+    async def _grouping(self, expr):
+        return await self.evaluate_async(expr.expression)
+
+    async def _call(self, expr):
+        callee = await self.evaluate_async(expr.callee)
+        arguments = [await self.evaluate_async(arg) for arg in expr.arguments]
+        if not callable(callee):
+            raise RuntimeError("Can only call functions")
+        result = callee(*[flatten(argument) for argument in arguments])
+        if isawaitable(result):
+            result = await result
+        return result
+
+
+# node type -> coroutine running it, for the nodes that may contain a call
+ASYNC_VISITORS = {
+    Print: AsyncInterpreter._print,
+    Expression: AsyncInterpreter._expression,
+    IfStmt: AsyncInterpreter._if,
+    WhileStmt: AsyncInterpreter._while,
+    BlockStmt: AsyncInterpreter._block,
+    Assignment: AsyncInterpreter._assignment,
+    Binary: AsyncInterpreter._binary,
+    NumericBinary: AsyncInterpreter._binary,
+    Logical: AsyncInterpreter._logical,
+    Unary: AsyncInterpreter._unary,
+    Grouping: AsyncInterpreter._grouping,
+    Call: AsyncInterpreter._call,
+}
@@ -0,0 +1,166 @@
+from math import copysign
+from typing import Any, Dict, List
+from lox.symbols import SYMBOLS
+from lox.tokens import Token
+
+
+# opcodes, operands follow inline in Chunk.code
+OP_CONSTANT = 0        # index into constants
+OP_GET = 1             # index into names, walks the environment chain
+OP_SET = 2             # index into names, leaves the value on the stack
+OP_POP = 3
+OP_PRINT = 4
+OP_ADD = 5
+OP_SUBTRACT = 6
+OP_MULTIPLY = 7
+OP_DIVIDE = 8
+OP_EQUAL = 9
+OP_NOT_EQUAL = 10
+OP_LESS = 11
+OP_LESS_EQUAL = 12
+OP_GREATER = 13
+OP_GREATER_EQUAL = 14
+OP_AND = 15
+OP_OR = 16
+OP_NEGATE = 17
+OP_NOT = 18
+OP_JUMP = 19                # absolute target
+OP_JUMP_IF_FALSE = 20       # absolute target, pops the condition
+OP_JUMP_IF_TRUE_OR_POP = 21  # absolute target
+OP_JUMP_IF_FALSE_OR_POP = 22  # absolute target
+OP_CALL = 23           # argument count
+OP_PUSH_SCOPE = 24     # index into scopes
+OP_POP_SCOPE = 25
+OP_STORE = 26          # index into names, OP_SET followed by OP_POP
+OP_JUMP_IF_TRUE = 27   # absolute target, pops the condition
+OP_GET_GLOBAL = 28     # index into names
+OP_SET_GLOBAL = 29
+OP_STORE_GLOBAL = 30
+OP_GET_LOCAL = 31      # scope depth, slot
+OP_SET_LOCAL = 32
+OP_STORE_LOCAL = 33
+
+OP_NAMES = {
+    value: name for name, value in globals().items() if name.startswith("OP_") and isinstance(value, int)
+}
+
+# number of inline operands each opcode takes
+OPERANDS = {
+    OP_CONSTANT: 1,
+    OP_GET: 1,
+    OP_SET: 1,
+    OP_STORE: 1,
+    OP_JUMP: 1,
+    OP_JUMP_IF_FALSE: 1,
+    OP_JUMP_IF_TRUE: 1,
+    OP_JUMP_IF_TRUE_OR_POP: 1,
+    OP_JUMP_IF_FALSE_OR_POP: 1,
+    OP_CALL: 1,
+    OP_PUSH_SCOPE: 1,
+    OP_GET_GLOBAL: 1,
+    OP_SET_GLOBAL: 1,
+    OP_STORE_GLOBAL: 1,
+    OP_GET_LOCAL: 2,
+    OP_SET_LOCAL: 2,
+    OP_STORE_LOCAL: 2,
+}
+
+# opcodes whose operand is a position in code
+JUMPS = frozenset((OP_JUMP, OP_JUMP_IF_FALSE, OP_JUMP_IF_TRUE, OP_JUMP_IF_TRUE_OR_POP, OP_JUMP_IF_FALSE_OR_POP))
+# opcodes whose operand is an index into names
+NAMED = frozenset((OP_GET, OP_SET, OP_STORE, OP_GET_GLOBAL, OP_SET_GLOBAL, OP_STORE_GLOBAL))
+
+
+class Chunk:
+    def __init__(self):
+        self.code: List[int] = []
+        self.constants: List[Any] = []
+        self.names: List[Token] = []
+        # symbol id of each name, what environments are keyed on
+        self.symbols: List[int] = []
+        # slot layouts for OP_PUSH_SCOPE, from BlockStmt.names
+        self.scopes: List[Dict[str, int]] = []
+        self._constant_index = {}
+        self._name_index = {}
+        self._instructions = None
+
+    def emit(self, *values: int) -> int:
+        # returns the position of the first emitted value
+        position = len(self.code)
+        self.code.extend(values)
+        return position
+
+    def patch(self, position: int, value: int):
+        self.code[position] = value
+
+    def add_constant(self, value) -> int:
+        # key on the type too so 1, 1.0 and true get separate slots, and on
+        # the sign of a float so 0.0 and -0.0 do
+        key = (type(value), value, copysign(1.0, value) if type(value) is float else None)
+        if key not in self._constant_index:
+            self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self._constant_index[key]
+
+    def add_name(self, name: Token) -> int:
+        if name.lexeme not in self._name_index:
+            self._name_index[name.lexeme] = len(self.names)
+            self.names.append(name)
+            self.symbols.append(SYMBOLS.intern(name.lexeme))
+        return self._name_index[name.lexeme]
+
+    def add_scope(self, names: Dict[str, int]) -> int:
+        self.scopes.append(names)
+        return len(self.scopes) - 1
+
+    def instructions(self) -> List[tuple]:
+        # code decoded once into (op, operand) pairs for the VM: jump targets
+        # are instruction indices, constants their values, names their symbol
+        # ids and local slots (depth, slot). A final (None, None) ends the run
+        if self._instructions is None:
+            positions = {}
+            ip = 0
+            while ip < len(self.code):
+                positions[ip] = len(positions)
+                ip += 1 + OPERANDS.get(self.code[ip], 0)
+            positions[len(self.code)] = len(positions)
+            instructions = []
+            for ip in positions:
+                if ip == len(self.code):
+                    break
+                op = self.code[ip]
+                operands = self.code[ip + 1:ip + 1 + OPERANDS.get(op, 0)]
+                if op in JUMPS:
+                    operand = positions[operands[0]]
+                elif op == OP_CONSTANT:
+                    operand = self.constants[operands[0]]
+                elif op in NAMED:
+                    operand = self.symbols[operands[0]]
+                elif len(operands) == 2:
+                    operand = tuple(operands)
+                else:
+                    operand = operands[0] if operands else None
+                instructions.append((op, operand))
+            instructions.append((None, None))
+            self._instructions = instructions
+        return self._instructions
+
+    def disassemble(self) -> str:
+        lines = []
+        ip = 0
+        while ip < len(self.code):
+            op = self.code[ip]
+            line = f"{ip:04d} {OP_NAMES[op]}"
+            if OPERANDS.get(op):
+                operand = self.code[ip + 1]
+                if op == OP_CONSTANT:
+                    line += f" {operand} ({self.constants[operand]!r})"
+                elif op in NAMED:
+                    line += f" {operand} ({self.names[operand].lexeme})"
+                elif op == OP_PUSH_SCOPE:
+                    line += f" {operand} ({', '.join(self.scopes[operand])})"
+                else:
+                    line += " " + " ".join(str(value) for value in self.code[ip + 1:ip + 1 + OPERANDS[op]])
+            lines.append(line)
+            ip += 1 + OPERANDS.get(op, 0)
+        return "\n".join(lines)
@@ -0,0 +1,153 @@
+import gc
+import hashlib
+import io
+import os
+import pickle
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from lox import expressions, statements
+from lox.operators import BINARY_OPERATORS, unknown
+from lox.tokens import Token, TokenType
+
+# default directory, created next to the script like __pycache__
+CACHE_DIRECTORY = "__loxcache__"
+# the cache is trimmed back under this size after every store
+MAX_BYTES = 64 * 1024 * 1024
+
+MAGIC = b"LOXC"
+DIGEST_SIZE = 32
+HEADER_SIZE = len(MAGIC) + 3 * DIGEST_SIZE
+
+
+@lru_cache(maxsize=None)
+def interpreter_version() -> bytes:
+    # changes whenever the Python version or any lox module does, so a stale
+    # entry can never be read back by an interpreter that parses differently
+    digest = hashlib.sha256(sys.version.encode())
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.digest()
+
+
+class ProgramCache:
+    # on-disk store of Parser.parse() output keyed by source hash and interpreter version.
+    #
+    # an entry is MAGIC, the interpreter version, the source digest and the
+    # payload digest, followed by the pickled statements. Anything that doesn't
+    # check out on load is deleted and treated as a miss. Loading an entry
+    # touches its mtime, eviction removes the oldest mtimes first.
+    #
+    # anyone able to write to the directory can forge a header, so entries are
+    # unpickled with TreeUnpickler, which can build nothing but syntax tree
+    # nodes: loading a planted entry can't run code, at worst it makes the
+    # script it is keyed on run a different Lox program.
+    def __init__(self, directory, max_bytes: int = MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def load(self, source: str) -> Optional[list]:
+        source_digest = hashlib.sha256(source.encode()).digest()
+        path = self._path(source_digest)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+
+        payload = data[HEADER_SIZE:]
+        expected = MAGIC + interpreter_version() + source_digest + hashlib.sha256(payload).digest()
+        try:
+            if data[:HEADER_SIZE] != expected:
+                raise ValueError("stale or corrupt cache entry")
+            statements = _unpickle(payload)
+        except Exception:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return statements
+
+    def store(self, source: str, statements):
+        try:
+            payload = pickle.dumps(statements, pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            # very deep trees don't pickle, they just aren't cached
+            return
+        source_digest = hashlib.sha256(source.encode()).digest()
+        header = MAGIC + interpreter_version() + source_digest + hashlib.sha256(payload).digest()
+        if len(header) + len(payload) > self.max_bytes:
+            return
+
+        path = self._path(source_digest)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary.write_bytes(header + payload)
+            # atomic, concurrent runs never see a half-written entry
+            os.replace(temporary, path)
+        except OSError:
+            self._remove(temporary)
+            return
+        self._evict()
+
+    def clear(self):
+        for path in self.directory.glob("*.pickle"):
+            self._remove(path)
+
+    def _path(self, source_digest: bytes) -> Path:
+        key = hashlib.sha256(interpreter_version() + source_digest).hexdigest()
+        return self.directory / f"{key}.pickle"
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pickle"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(Path(path))
+            total -= size
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+class TreeUnpickler(pickle.Unpickler):
+    # refuses every global except the classes and operator functions Parser.parse() output refers to
+    ALLOWED = {(value.__module__, value.__name__): value for value in [
+        *(value for module in (expressions, statements) for value in vars(module).values()
+          if isinstance(value, type) and issubclass(value, (expressions.Expr, statements.Stmt))),
+        Token, TokenType, unknown, *BINARY_OPERATORS.values(),
+    ]}
+
+    def find_class(self, module, name):
+        value = self.ALLOWED.get((module, name))
+        if value is None:
+            raise pickle.UnpicklingError(f"{module}.{name} isn't part of a syntax tree")
+        return value
+
+
+def _unpickle(payload: bytes):
+    # the tree has no cycles, and collections triggered by its many
+    # allocations would otherwise cost more than the unpickling itself
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return TreeUnpickler(io.BytesIO(payload)).load()
+    finally:
+        if enabled:
+            gc.enable()
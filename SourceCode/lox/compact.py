@@ -0,0 +1,310 @@
+from array import array
+from math import copysign
+from sys import getsizeof
+from typing import Dict, List
+from lox.expressions import ExprVisitor
+from lox.statements import StmtVisitor
+from lox.interpreter import Runner
+from lox.operators import BINARY_OPERATORS, unknown
+from lox.resolver import GLOBAL
+from lox.symbols import SYMBOLS
+from lox.tokens import TokenType
+
+# node kinds
+(LITERAL, VARIABLE, ASSIGNMENT, BINARY, LOGICAL, UNARY, CALL,
+ EXPRESSION, PRINT, IF, WHILE, BLOCK) = range(12)
+
+# depth stored for a Variable/Assignment resolved to DYNAMIC, and slot for one without a slot
+DYNAMIC_DEPTH = -2
+NO_SLOT = -1
+
+# operator functions by TokenType value, the number the arrays store
+OPERATOR_FUNCTIONS = [unknown] * (max(token_type.value for token_type in TokenType) + 1)
+for token_type, function in BINARY_OPERATORS.items():
+    OPERATOR_FUNCTIONS[token_type.value] = function
+
+
+class CompactProgram:
+    # a resolved AST stored as parallel arrays, one entry per node.
+    #
+    # nodes are laid out children first, so a node's last child is always the
+    # node just before it. The other children and every operand live in
+    # first/second/third as indices:
+    #   LITERAL     first: constant
+    #   VARIABLE    first: name, second: depth, third: slot
+    #   ASSIGNMENT  as VARIABLE, value before it
+    #   BINARY      operator, first: left, right before it
+    #   LOGICAL     as BINARY
+    #   UNARY       operator, operand before it
+    #   CALL        first: callee, second/third: offset and count of arguments in lists
+    #   EXPRESSION  expression before it
+    #   PRINT       expression before it
+    #   IF          first: condition, second: then branch, third: else branch or -1
+    #   WHILE       first: condition, second: body
+    #   BLOCK       first/second: offset and count of statements in lists, third: scope
+    def __init__(self):
+        self.kinds = array("B")
+        self.operators = array("B")
+        self.first = array("i")
+        self.second = array("i")
+        self.third = array("i")
+        # child lists of blocks and calls
+        self.lists = array("i")
+        # interned literal values and variable names
+        self.constants: List = []
+        self.names: List[str] = []
+        # BlockStmt.names of every block
+        self.scopes: List[Dict[str, int]] = []
+        # top-level statements
+        self.statements = array("i")
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def nbytes(self) -> int:
+        # memory held by the program, the tables' contents included
+        total = getsizeof(self)
+        for column in (self.kinds, self.operators, self.first, self.second, self.third, self.lists, self.statements):
+            total += getsizeof(column)
+        for table in (self.constants, self.names):
+            total += getsizeof(table) + sum(getsizeof(value) for value in table)
+        return total + getsizeof(self.scopes) + sum(getsizeof(scope) for scope in self.scopes)
+
+
+class CompactEncoder(ExprVisitor, StmtVisitor):
+    # packs resolved parser output into a CompactProgram
+    def __init__(self):
+        self.program = CompactProgram()
+        self.constant_index: Dict = {}
+        self.name_index: Dict[str, int] = {}
+
+    def encode(self, statements) -> CompactProgram:
+        for stmt in statements:
+            self.program.statements.append(stmt.accept(self))
+        return self.program
+
+    def _node(self, kind: int, operator: int = 0, first: int = 0, second: int = 0, third: int = 0) -> int:
+        program = self.program
+        program.kinds.append(kind)
+        program.operators.append(operator)
+        program.first.append(first)
+        program.second.append(second)
+        program.third.append(third)
+        return len(program.kinds) - 1
+
+    def _list(self, indices: List[int]) -> int:
+        offset = len(self.program.lists)
+        self.program.lists.extend(indices)
+        return offset
+
+    def _name(self, name: str) -> int:
+        if name not in self.name_index:
+            self.name_index[name] = len(self.program.names)
+            self.program.names.append(name)
+        return self.name_index[name]
+
+    def _binding(self, expr):
+        depth = DYNAMIC_DEPTH if expr.depth is None else expr.depth
+        slot = NO_SLOT if expr.slot is None else expr.slot
+        return self._name(expr.name.lexeme), depth, slot
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+        return self._node(EXPRESSION)
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression.accept(self)
+        return self._node(PRINT)
+
+    def visit_if_stmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        then_branch = stmt.then_branch.accept(self)
+        else_branch = stmt.else_branch.accept(self) if stmt.else_branch is not None else -1
+        return self._node(IF, 0, condition, then_branch, else_branch)
+
+    def visit_while_stmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        body = stmt.body.accept(self)
+        return self._node(WHILE, 0, condition, body)
+
+    def visit_block_stmt(self, stmt):
+        statements = [statement.accept(self) for statement in stmt.statements]
+        self.program.scopes.append(stmt.names)
+        return self._node(BLOCK, 0, self._list(statements), len(statements), len(self.program.scopes) - 1)
+
+    def visit_assignment_expr(self, expr):
+        expr.value.accept(self)
+        return self._node(ASSIGNMENT, 0, *self._binding(expr))
+
+    def visit_variable_expr(self, expr):
+        return self._node(VARIABLE, 0, *self._binding(expr))
+
+    def visit_binary_expr(self, expr):
+        left = expr.left.accept(self)
+        expr.right.accept(self)
+        return self._node(BINARY, expr.operator.type.value, left)
+
+    def visit_logical_expr(self, expr):
+        left = expr.left.accept(self)
+        expr.right.accept(self)
+        return self._node(LOGICAL, expr.operator.type.value, left)
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+        return self._node(UNARY, expr.operator.type.value)
+
+    def visit_literal_expr(self, expr):
+        # 1, 1.0 and True are equal keys, the type keeps them apart, and
+        # 0.0 and -0.0 are, the sign keeps them apart
+        value = expr.value
+        key = (type(value), value, copysign(1.0, value) if type(value) is float else None)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.program.constants)
+            self.program.constants.append(value)
+        return self._node(LITERAL, 0, self.constant_index[key])
+
+    def visit_grouping_expr(self, expr):
+        # parentheses only shaped the tree, the inner expression stands in for them
+        return expr.expression.accept(self)
+
+    def visit_invariant_expr(self, expr):
+        # evaluated every time, like a grouping
+        return expr.expression.accept(self)
+
+    def visit_call_expr(self, expr):
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        return self._node(CALL, 0, callee, self._list(arguments), len(arguments))
+
+    def visit_get_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_set_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_super_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_this_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+
+class CompactInterpreter(Runner):
+    # walks a CompactProgram, mirrors Interpreter output exactly
+    def run(self, program: CompactProgram):
+        self.program = program
+        self.kinds = program.kinds
+        self.operators = program.operators
+        self.first = program.first
+        self.second = program.second
+        self.third = program.third
+        # environments are keyed on symbol ids
+        self.symbols = [SYMBOLS.intern(name) for name in program.names]
+        # frames are keyed on scope index, which another program numbers differently
+        self.frames.clear()
+        self.expressions = {
+            LITERAL: self._literal, VARIABLE: self._variable, ASSIGNMENT: self._assignment,
+            BINARY: self._binary, LOGICAL: self._logical, UNARY: self._unary, CALL: self._call,
+        }
+        self.statements = {
+            EXPRESSION: self._expression, PRINT: self._print, IF: self._if, WHILE: self._while, BLOCK: self._block,
+        }
+        try:
+            for index in program.statements:
+                self.execute(index)
+        finally:
+            self.output.flush()
+
+    def evaluate(self, index: int):
+        return self.expressions[self.kinds[index]](index)
+
+    def execute(self, index: int):
+        self.statements[self.kinds[index]](index)
+
+    def is_truthy(self, value):
+        if value is None: return False
+        if isinstance(value, bool): return value
+        return True
+
+    def _literal(self, index):
+        return self.program.constants[self.first[index]]
+
+    def _variable(self, index):
+        depth = self.second[index]
+        if depth == DYNAMIC_DEPTH:
+            return self.environment.get(self.symbols[self.first[index]])
+        if depth == GLOBAL:
+            return self.globals.get(self.symbols[self.first[index]])
+        environment = self.environment
+        while depth:
+            environment = environment.parent
+            depth -= 1
+        return environment.values[self.third[index]]
+
+    def _assignment(self, index):
+        value = self.evaluate(index - 1)
+        depth = self.second[index]
+        if depth == DYNAMIC_DEPTH:
+            self.environment.assign_or_define(self.symbols[self.first[index]], value)
+        elif depth == GLOBAL:
+            self.globals.values[self.symbols[self.first[index]]] = value
+        else:
+            environment = self.environment
+            while depth:
+                environment = environment.parent
+                depth -= 1
+            environment.values[self.third[index]] = value
+        return value
+
+    def _binary(self, index):
+        left = self.evaluate(self.first[index])
+        right = self.evaluate(index - 1)
+        return OPERATOR_FUNCTIONS[self.operators[index]](left, right)
+
+    def _logical(self, index):
+        left = self.evaluate(self.first[index])
+        if self.operators[index] == TokenType.OR.value:
+            if self.is_truthy(left): return left
+        else:
+            if not self.is_truthy(left): return left
+        return self.evaluate(index - 1)
+
+    def _unary(self, index):
+        right = self.evaluate(index - 1)
+        if self.operators[index] == TokenType.MINUS.value:
+            return -right
+        elif self.operators[index] == TokenType.BANG.value:
+            return not right
+        else:
+            raise Exception("Unknown unary operator")
+
+    def _call(self, index):
+        callee = self.evaluate(self.first[index])
+        offset = self.second[index]
+        lists = self.program.lists
+        arguments = [self.evaluate(lists[position]) for position in range(offset, offset + self.third[index])]
+        if callable(callee):
+            return callee(*arguments)
+        else:
+            raise RuntimeError("Can only call functions")
+
+    def _expression(self, index):
+        self.evaluate(index - 1)
+
+    def _print(self, index):
+        self.output.write(self.evaluate(index - 1))
+
+    def _if(self, index):
+        if self.is_truthy(self.evaluate(self.first[index])):
+            self.execute(self.second[index])
+        elif self.third[index] != -1:
+            self.execute(self.third[index])
+
+    def _while(self, index):
+        condition, body = self.first[index], self.second[index]
+        while self.is_truthy(self.evaluate(condition)):
+            self.execute(body)
+
+    def _block(self, index):
+        offset, count, scope_index = self.first[index], self.second[index], self.third[index]
+        self._run_block(scope_index, self.program.scopes[scope_index], self.program.lists[offset:offset + count])
@@ -0,0 +1,156 @@
+from lox.bytecode import (
+    Chunk, OP_CONSTANT, OP_GET, OP_SET, OP_POP, OP_PRINT, OP_ADD, OP_SUBTRACT, OP_MULTIPLY, OP_DIVIDE,
+    OP_EQUAL, OP_NOT_EQUAL, OP_LESS, OP_LESS_EQUAL, OP_GREATER, OP_GREATER_EQUAL, OP_AND, OP_OR,
+    OP_NEGATE, OP_NOT, OP_JUMP, OP_JUMP_IF_FALSE, OP_JUMP_IF_TRUE_OR_POP, OP_JUMP_IF_FALSE_OR_POP,
+    OP_CALL, OP_PUSH_SCOPE, OP_POP_SCOPE, OP_STORE, OP_JUMP_IF_TRUE, OP_GET_GLOBAL, OP_SET_GLOBAL,
+    OP_STORE_GLOBAL, OP_GET_LOCAL, OP_SET_LOCAL, OP_STORE_LOCAL,
+)
+from lox.expressions import ExprVisitor, Assignment
+from lox.statements import StmtVisitor
+from lox.resolver import GLOBAL
+from lox.tokens import TokenType
+
+BINARY_OPS = {
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.MUL: OP_MULTIPLY,
+    TokenType.DIV: OP_DIVIDE,
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.AND: OP_AND,
+    TokenType.OR: OP_OR,
+}
+
+
+class Compiler(ExprVisitor, StmtVisitor):
+    # turns resolved parser output into a flat Chunk for the VM
+    def __init__(self):
+        self.chunk = Chunk()
+
+    def compile(self, statements) -> Chunk:
+        for stmt in statements:
+            stmt.accept(self)
+        return self.chunk
+
+    def _jump(self, op) -> int:
+        # emit a jump with a placeholder target, returns the operand position
+        return self.chunk.emit(op, 0) + 1
+
+    def _patch(self, position):
+        self.chunk.patch(position, len(self.chunk.code))
+
+    def _variable(self, expr, dynamic_op, global_op, local_op):
+        # pick the access opcode from the Resolver's depth
+        if expr.depth is None:
+            self.chunk.emit(dynamic_op, self.chunk.add_name(expr.name))
+        elif expr.depth == GLOBAL:
+            self.chunk.emit(global_op, self.chunk.add_name(expr.name))
+        else:
+            self.chunk.emit(local_op, expr.depth, expr.slot)
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.chunk.emit(OP_PRINT)
+
+    def visit_expression_stmt(self, stmt):
+        if isinstance(stmt.expression, Assignment):
+            # assignment statements don't need their value left on the stack
+            stmt.expression.value.accept(self)
+            self._variable(stmt.expression, OP_STORE, OP_STORE_GLOBAL, OP_STORE_LOCAL)
+            return
+        stmt.expression.accept(self)
+        self.chunk.emit(OP_POP)
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        else_jump = self._jump(OP_JUMP_IF_FALSE)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is None:
+            self._patch(else_jump)
+            return
+        end_jump = self._jump(OP_JUMP)
+        self._patch(else_jump)
+        stmt.else_branch.accept(self)
+        self._patch(end_jump)
+
+    def visit_while_stmt(self, stmt):
+        # condition sits after the body so each iteration costs a single jump
+        condition_jump = self._jump(OP_JUMP)
+        start = len(self.chunk.code)
+        stmt.body.accept(self)
+        self._patch(condition_jump)
+        stmt.condition.accept(self)
+        self.chunk.emit(OP_JUMP_IF_TRUE, start)
+
+    def visit_block_stmt(self, stmt):
+        # a block that defines nothing has no frame, see Resolver
+        if stmt.names:
+            self.chunk.emit(OP_PUSH_SCOPE, self.chunk.add_scope(stmt.names))
+        for statement in stmt.statements:
+            statement.accept(self)
+        if stmt.names:
+            self.chunk.emit(OP_POP_SCOPE)
+
+    def visit_assignment_expr(self, expr):
+        expr.value.accept(self)
+        self._variable(expr, OP_SET, OP_SET_GLOBAL, OP_SET_LOCAL)
+
+    def visit_variable_expr(self, expr):
+        self._variable(expr, OP_GET, OP_GET_GLOBAL, OP_GET_LOCAL)
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        if expr.operator.type not in BINARY_OPS:
+            raise Exception("Unknown binary operator")
+        self.chunk.emit(BINARY_OPS[expr.operator.type])
+
+    def visit_logical_expr(self, expr):
+        expr.left.accept(self)
+        if expr.operator.type == TokenType.OR:
+            end_jump = self._jump(OP_JUMP_IF_TRUE_OR_POP)
+        else:
+            end_jump = self._jump(OP_JUMP_IF_FALSE_OR_POP)
+        expr.right.accept(self)
+        self._patch(end_jump)
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+        if expr.operator.type == TokenType.MINUS:
+            self.chunk.emit(OP_NEGATE)
+        elif expr.operator.type == TokenType.BANG:
+            self.chunk.emit(OP_NOT)
+        else:
+            raise Exception("Unknown unary operator")
+
+    def visit_literal_expr(self, expr):
+        self.chunk.emit(OP_CONSTANT, self.chunk.add_constant(expr.value))
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_invariant_expr(self, expr):
+        # no cache in the VM, the expression is evaluated every time
+        expr.expression.accept(self)
+
+    def visit_call_expr(self, expr):
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+        self.chunk.emit(OP_CALL, len(expr.arguments))
+
+    def visit_get_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_set_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_super_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_this_expr(self, expr):
+        raise NotImplementedError("not implemented")
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, List
 from lox.tokens import Token
+from lox.operators import BINARY_OPERATORS, unknown
 
 
 class ExprVisitor(ABC):
@@ -20,6 +21,9 @@ class ExprVisitor(ABC):
     def visit_grouping_expr(self, expr: 'Grouping') -> Any:
         pass
     @abstractmethod
+    def visit_invariant_expr(self, expr: 'Invariant') -> Any:
+        pass
+    @abstractmethod
     def visit_literal_expr(self, expr: 'Literal') -> Any:
         pass
     @abstractmethod
@@ -41,33 +45,78 @@ class ExprVisitor(ABC):
     def visit_variable_expr(self, expr: 'Variable') -> Any:
         pass
 
+    def visit_numeric_binary_expr(self, expr: 'NumericBinary') -> Any:
+        # only the Interpreter evaluates it differently from any other Binary
+        return self.visit_binary_expr(expr)
+
+
+def children(node):
+    # the expressions and statements directly under a node of either kind
+    for cls in type(node).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            value = getattr(node, name, None)
+            for child in value if isinstance(value, list) else [value]:
+                if hasattr(child, "accept"):
+                    yield child
+
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: ExprVisitor) -> Any:
         pass
 
 
 class Assignment(Expr):
+    __slots__ = ("name", "value", "symbol", "depth", "slot")
+
     def __init__(self, name: Token, value: Expr) -> None:
         self.name = name
         self.value = value
+        # filled in by the Resolver
+        self.symbol = None
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor) -> Any:
         return visitor.visit_assignment_expr(self)
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right", "function")
+
     def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
         self.left = left
         self.operator = operator
         self.right = right
+        # resolved once here so evaluation skips comparing operator types
+        self.function = BINARY_OPERATORS.get(operator.type, unknown)
 
     def accept(self, visitor: ExprVisitor) -> Any:
         return visitor.visit_binary_expr(self)
 
 
+class Comparison(Binary):
+    # variable <, <=, >, >=, == or != literal as a while condition, see
+    # Optimizer. Always a bool, so the Interpreter tests it without is_truthy
+    # and reads both operands directly. Other visitors take it for the Binary it is
+    __slots__ = ()
+
+
+class NumericBinary(Binary):
+    # a + the Interpreter has seen add two ints or two floats. The Binary it
+    # was rewrites itself to this class and back again on a type mismatch,
+    # see Interpreter.visit_binary_expr
+    __slots__ = ()
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_numeric_binary_expr(self)
+
+
 class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments")
+
     def __init__(self, callee: Expr, paren: Token, arguments: List[Expr]) -> None:
         self.callee = callee
         self.paren = paren
@@ -78,6 +127,8 @@ class Call(Expr):
 
 
 class Get(Expr):
+    __slots__ = ("obj", "name")
+
     def __init__(self, obj: Expr, name: Token) -> None:
         self.obj = obj
         self.name = name
@@ -87,6 +138,8 @@ class Get(Expr):
 
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
@@ -94,7 +147,23 @@ class Grouping(Expr):
         return visitor.visit_grouping_expr(self)
 
 
+class Invariant(Expr):
+    # an expression whose operands a WhileStmt never changes. It is evaluated
+    # the first time an iteration reaches it and cached in slot index of the
+    # loop's cache for the rest of that run of the loop, see Optimizer
+    __slots__ = ("expression", "index")
+
+    def __init__(self, expression: Expr, index: int) -> None:
+        self.expression = expression
+        self.index = index
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_invariant_expr(self)
+
+
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: Any) -> None:
         self.value = value
 
@@ -103,6 +172,8 @@ class Literal(Expr):
 
 
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
         self.left = left
         self.operator = operator
@@ -113,6 +184,8 @@ class Logical(Expr):
 
 
 class Set(Expr):
+    __slots__ = ("obj", "name", "value")
+
     def __init__(self, obj: Expr, name: Token, value: Expr) -> None:
         self.obj = obj
         self.name = name
@@ -123,6 +196,8 @@ class Set(Expr):
 
 
 class Super(Expr):
+    __slots__ = ("keyword", "method")
+
     def __init__(self, keyword: Token, method: Token) -> None:
         self.keyword = keyword
         self.method = method
@@ -132,6 +207,8 @@ class Super(Expr):
 
 
 class This(Expr):
+    __slots__ = ("keyword",)
+
     def __init__(self, keyword: Token) -> None:
         self.keyword = keyword
 
@@ -140,6 +217,8 @@ class This(Expr):
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr) -> None:
         self.operator = operator
         self.right = right
@@ -149,8 +228,14 @@ class Unary(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ("name", "symbol", "depth", "slot")
+
     def __init__(self, name: Token) -> None:
         self.name = name
+        # filled in by the Resolver
+        self.symbol = None
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor) -> Any:
         return visitor.visit_variable_expr(self)
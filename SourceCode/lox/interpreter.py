@@ -1,100 +1,222 @@
-from lox.expressions import ExprVisitor, Variable, Assignment, Binary, Unary, Literal, Grouping
+from typing import List
+from lox.expressions import ExprVisitor, Variable, Assignment, Binary, Comparison, NumericBinary, Unary, Literal, Grouping
 from lox.statements import StmtVisitor, Print, Expression
-from lox.tokens import TokenType, Token
+from lox.tokens import TokenType
+from lox.resolver import GLOBAL
+from lox.operators import add
+from lox.output import BufferedWriter
+from lox.rope import compare_flattened, concatenate, flatten
+from lox.symbols import SYMBOLS
+
+# symbol id -> name, for the by-name block lookups and error messages
+NAMES = SYMBOLS.names
+
+# marks a slot whose variable hasn't been assigned yet
+UNSET = object()
+# operand types a + can be specialized for
+SPECIALIZED = (int, float)
 
 
 class Environment:
+    # values are keyed on symbol ids, see lox.symbols
     def __init__(self, parent=None):
         self.values = {}
         self.parent = parent
 
     def define(self, name: str, value):
-        self.values[name] = value
+        self.values[SYMBOLS.intern(name)] = value
 
-    def assign(self, name: Token, value):
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
-        if self.parent:
-            self.parent.assign(name, value)
-            return
-        raise RuntimeError(f"Undefined variable '{name.lexeme}'.")
+    def names(self) -> List[str]:
+        return [NAMES[symbol] for symbol in self.values]
+
+    def assign(self, symbol: int, value):
+        environment = self
+        while environment is not None:
+            if environment._store(symbol, value):
+                return
+            environment = environment.parent
+        raise RuntimeError(f"Undefined variable '{NAMES[symbol]}'.")
 
-    def get(self, name: Token):
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
+    def assign_or_define(self, symbol: int, value):
+        # assign the variable where it is bound, otherwise define it here, in one walk
+        environment = self
+        while environment is not None:
+            if environment._store(symbol, value):
+                return
+            environment = environment.parent
+        self._define(symbol, value)
+
+    def get(self, symbol: int):
+        if symbol in self.values:
+            return self.values[symbol]
         if self.parent:
-            return self.parent.get(name)
-        raise RuntimeError(f"Undefined variable '{name.lexeme}'.")
+            return self.parent.get(symbol)
+        raise RuntimeError(f"Undefined variable '{NAMES[symbol]}'.")
+
+    def _define(self, symbol: int, value):
+        self.values[symbol] = value
+
+    def _store(self, symbol: int, value) -> bool:
+        # overwrite the variable if it is bound in this environment alone
+        if symbol in self.values:
+            self.values[symbol] = value
+            return True
+        return False
+
+
+class Scope(Environment):
+    # block environment, variables live in a fixed-size array laid out by the Resolver
+    def __init__(self, parent: Environment, names: dict):
+        self.names = names
+        self.values = [UNSET] * len(names)
+        self.parent = parent
+
+    def define(self, name: str, value):
+        self.values[self.names[name]] = value
+
+    def get(self, symbol: int):
+        slot = self.names.get(NAMES[symbol])
+        if slot is not None and self.values[slot] is not UNSET:
+            return self.values[slot]
+        return self.parent.get(symbol)
 
+    def _define(self, symbol: int, value):
+        self.define(NAMES[symbol], value)
 
-class Interpreter(ExprVisitor, StmtVisitor):
-    def __init__(self):
+    def _store(self, symbol: int, value) -> bool:
+        slot = self.names.get(NAMES[symbol])
+        if slot is not None and self.values[slot] is not UNSET:
+            self.values[slot] = value
+            return True
+        return False
+
+
+class Runner:
+    # what every backend running a program shares: where print statements
+    # write, the globals with input() bound, and the Scope each block reuses.
+    # Subclasses define execute() for whatever their statements are
+    def __init__(self, output=None):
+        # print statements write here, see lox.output
+        self.output = output if output is not None else BufferedWriter()
         self.globals = Environment()
         self.environment = self.globals
-        self.globals.define("input", lambda prompt: input(prompt))
+        self.globals.define("input", self.read_line)
+        # block key -> its Scope, see _block_scope
+        self.frames = {}
+
+    def read_line(self, prompt):
+        # lines printed so far have to show before the prompt
+        self.output.flush()
+        return input(prompt)
+
+    def execute(self, stmt):
+        raise NotImplementedError
+
+    def _run_block(self, key, names: dict, statements):
+        # a block that defines nothing has no frame, see Resolver
+        if not names:
+            for statement in statements:
+                self.execute(statement)
+            return
+        previous = self.environment
+        self.environment = self._block_scope(key, names, previous)
+        try:
+            for statement in statements:
+                self.execute(statement)
+        finally:
+            self.environment = previous
+
+    def _block_scope(self, key, names: dict, parent):
+        # the Scope of the block key with every slot unset. Each block reuses one
+        # Scope: with no functions, a frame can't outlive its block or be entered twice at once
+        scope = self.frames.get(key)
+        if scope is None:
+            scope = self.frames[key] = Scope(parent, names)
+        else:
+            scope.parent = parent
+            scope.values = [UNSET] * len(names)
+        return scope
+
+
+class Interpreter(Runner, ExprVisitor, StmtVisitor):
+    # whether loops the Vectorizer gave a CountedLoop run through it, which
+    # executes none of their statements one by one
+    kernels = True
+
+    def __init__(self, output=None):
+        super().__init__(output)
+        # Invariant values of the innermost running loop that has any
+        self.hoisted = []
 
     def interpret(self, statements):
-        for stmt in statements:
-            stmt.accept(self)
+        # statements must have been through the Resolver
+        try:
+            for stmt in statements:
+                stmt.accept(self)
+        finally:
+            self.output.flush()
+            # --stream runs one statement per call, its blocks won't run again
+            self.frames.clear()
 
     def visit_print_stmt(self, stmt):
         # handle print statements
         value = self.evaluate(stmt.expression)
-        print(value)
+        self.output.write(value)
 
     def visit_expression_stmt(self, stmt):
         self.evaluate(stmt.expression)
 
     def visit_assignment_expr(self, expr):
         value = self.evaluate(expr.value)
-        try:
-            # assign the variable if it exists
-            self.environment.assign(expr.name, value)
-        except RuntimeError:
-            # if not define it
-            self.environment.define(expr.name.lexeme, value)
+        depth = expr.depth
+        if depth is None:
+            self.environment.assign_or_define(expr.symbol, value)
+        elif depth == GLOBAL:
+            self.globals.values[expr.symbol] = value
+        else:
+            environment = self.environment
+            while depth:
+                environment = environment.parent
+                depth -= 1
+            environment.values[expr.slot] = value
         return value
 
     def visit_variable_expr(self, expr):
-        return self.environment.get(expr.name)
+        depth = expr.depth
+        if depth is None:
+            return self.environment.get(expr.symbol)
+        if depth == GLOBAL:
+            return self.globals.get(expr.symbol)
+        environment = self.environment
+        while depth:
+            environment = environment.parent
+            depth -= 1
+        return environment.values[expr.slot]
 
     def visit_binary_expr(self, expr):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-        operator_type = expr.operator.type
-
-        if operator_type == TokenType.PLUS:
-            if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        if expr.function is add:
+            if type(left) is type(right) and type(left) in SPECIALIZED:
+                # type feedback: a + of two ints or two floats becomes a NumericBinary
+                expr.__class__ = NumericBinary
                 return left + right
-            elif isinstance(left, str) and isinstance(right, str):
-                return left + right
-            else:
-                raise RuntimeError("Operands must be two numbers or two strings")
-        elif operator_type == TokenType.MINUS:
-            return left - right
-        elif operator_type == TokenType.MUL:
-            return left * right
-        elif operator_type == TokenType.DIV:
-            return left / right
-        elif operator_type == TokenType.EQUAL_EQUAL:
-            return left == right
-        elif operator_type == TokenType.BANG_EQUAL:
-            return left != right
-        elif operator_type == TokenType.LESS:
-            return left < right
-        elif operator_type == TokenType.LESS_EQUAL:
-            return left <= right
-        elif operator_type == TokenType.GREATER:
-            return left > right
-        elif operator_type == TokenType.GREATER_EQUAL:
-            return left >= right
-        elif operator_type == TokenType.AND:
-            return left and right
-        elif operator_type == TokenType.OR:
-            return left or right
-        else:
-            raise Exception("Unknown binary operator")
+            return concatenate(left, right)
+        try:
+            return expr.function(left, right)
+        except TypeError as error:
+            return compare_flattened(expr.function, left, right, error)
+
+    def visit_numeric_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if type(left) in SPECIALIZED and type(right) in SPECIALIZED:
+            return left + right
+        # a string, whose + may make a Rope, a bool, or a native's list, which
+        # Python's + would concatenate where add() refuses: deoptimize for good
+        expr.__class__ = Binary
+        expr.function = concatenate
+        return concatenate(left, right)
 
     def visit_unary_expr(self, expr):
         right = self.evaluate(expr.right)
@@ -111,11 +233,18 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visit_grouping_expr(self, expr):
         return self.evaluate(expr.expression)
 
+    def visit_invariant_expr(self, expr):
+        value = self.hoisted[expr.index]
+        if value is UNSET:
+            value = self.hoisted[expr.index] = self.evaluate(expr.expression)
+        return value
+
     def visit_call_expr(self, expr):
         callee = self.evaluate(expr.callee)
         arguments = [self.evaluate(arg) for arg in expr.arguments]
         if callable(callee):
-            return callee(*arguments)
+            # natives only ever see plain strings
+            return callee(*[flatten(argument) for argument in arguments])
         else:
             raise RuntimeError("Can only call functions")
 
@@ -154,17 +283,53 @@ class Interpreter(ExprVisitor, StmtVisitor):
             self.execute(stmt.else_branch)
 
     def visit_while_stmt(self, stmt):
-        while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
-
-    def visit_block_stmt(self, stmt):
-        previous = self.environment
-        self.environment = Environment(previous)
+        if stmt.kernel is not None and self.kernels and stmt.kernel.run(self):
+            return
+        if not stmt.invariants:
+            self._loop(stmt)
+            return
+        # every run of the loop starts with an empty cache
+        hoisted, self.hoisted = self.hoisted, [UNSET] * stmt.invariants
         try:
-            for statement in stmt.statements:
-                self.execute(statement)
+            self._loop(stmt)
         finally:
-            self.environment = previous
+            self.hoisted = hoisted
+
+    def _loop(self, stmt):
+        condition, body = stmt.condition, stmt.body
+        if type(condition) is not Comparison:
+            while self.is_truthy(self.evaluate(condition)):
+                self.execute(body)
+            return
+        # the variable is read straight from where it lives, which doesn't
+        # change between iterations, and compared to the literal
+        variable, function, constant = condition.left, condition.function, condition.right.value
+        depth = variable.depth
+        try:
+            if depth is None:
+                get, symbol = self.environment.get, variable.symbol
+                while function(get(symbol), constant):
+                    self.execute(body)
+            elif depth == GLOBAL:
+                get, symbol = self.globals.get, variable.symbol
+                while function(get(symbol), constant):
+                    self.execute(body)
+            else:
+                environment = self.environment
+                while depth:
+                    environment = environment.parent
+                    depth -= 1
+                values, slot = environment.values, variable.slot
+                while function(values[slot], constant):
+                    self.execute(body)
+        except TypeError as error:
+            if error.__traceback__.tb_next is not None:
+                # raised inside the body
+                raise
+            compare_flattened(function, self.evaluate(variable), constant, error)
+
+    def visit_block_stmt(self, stmt):
+        self._run_block(stmt, stmt.names, stmt.statements)
 
     def execute(self, stmt):
         stmt.accept(self)
\ No newline at end of file
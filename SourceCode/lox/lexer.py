@@ -1,160 +1,178 @@
+import codecs
+import re
+from lox.symbols import SYMBOLS
 from lox.tokens import Token, TokenType
 
+# one alternative per token class, the group number tells them apart
+TOKEN_PATTERN = re.compile(r"""
+    ((?:\s+|\#[^\n]*\s*)(?:\#[^\n]*\s*)*)  # 1 whitespace and comments
+  | ([A-Za-z_]\w*)                     # 2 identifier or keyword
+  | (\d+(?:\.\d*)?|\.\d*)              # 3 number, a trailing '.' is an error
+  | ("[^"]*")                          # 4 string, may span lines
+  | (!=|==|<=|>=|[-+*/!=<>(){}–])     # 5 operator or bracket
+  | (\w+)                              # 6 identifier starting with a non-ASCII letter
+  | (.)                                # 7 anything else
+""", re.VERBOSE | re.DOTALL)
+
+SKIP, IDENTIFIER, NUMBER, STRING, OPERATOR, UNICODE_IDENTIFIER = range(1, 7)
+
+KEYWORDS = {
+    "true": TokenType.TRUE,
+    "false": TokenType.FALSE,
+    "print": TokenType.PRINT,
+    "if": TokenType.IF,
+    "else": TokenType.ELSE,
+    "while": TokenType.WHILE,
+    "input": TokenType.INPUT,
+    "and": TokenType.AND,
+    "or": TokenType.OR,
+}
+
+# operator -> (type, whether the lexeme is the operator itself). The other
+# operators take the character that follows them as lexeme, as they always have.
+OPERATORS = {
+    "(": (TokenType.LPAREN, True),
+    ")": (TokenType.RPAREN, True),
+    "{": (TokenType.LBRACE, True),
+    "}": (TokenType.RBRACE, True),
+    "+": (TokenType.PLUS, True),
+    "-": (TokenType.MINUS, True),
+    "–": (TokenType.MINUS, True),  # converts weird dash to normal one
+    "*": (TokenType.MUL, True),
+    "/": (TokenType.DIV, True),
+    "!": (TokenType.BANG, False),
+    "!=": (TokenType.BANG_EQUAL, False),
+    "=": (TokenType.EQUAL, False),
+    "==": (TokenType.EQUAL_EQUAL, False),
+    "<": (TokenType.LESS, False),
+    "<=": (TokenType.LESS_EQUAL, False),
+    ">": (TokenType.GREATER, False),
+    ">=": (TokenType.GREATER_EQUAL, False),
+}
+
+
+# characters read per step when lexing a file object or mmap
+CHUNK_SIZE = 1 << 16
+
+
+class LexerError(RuntimeError):
+    # line and column are where the offending text starts, 1-based
+    def __init__(self, message: str, line: int = 0, column: int = 0):
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
 
 class Lexer:
-    def __init__(self, source: str):
+    def __init__(self, source, chunk_size: int = CHUNK_SIZE):
+        # source is a str, a file object or mmap read chunk_size at a time,
+        # or any iterable of str chunks
         self.source = source
+        self.chunk_size = chunk_size
         self.tokens = []
-        self.current = 0
+        # current line, and where it starts relative to the buffer being scanned
+        self._line = 1
+        self._line_start = 0
 
     def tokenize(self):
-        # loop through code and generate tokens
-        while not self._is_at_end():
-            char = self._peek()
-
-            if char.isspace():
-                self._advance()
-            elif char == "(":
-                self._add_token(TokenType.LPAREN)
-                self._advance()
-            elif char == ")":
-                self._add_token(TokenType.RPAREN)
-                self._advance()
-            elif char == "{":
-                self._add_token(TokenType.LBRACE)
-                self._advance()
-            elif char == "}":
-                self._add_token(TokenType.RBRACE)
-                self._advance()
-            elif char == '"':
-                self._string()
-            elif char in "+-–*/":
-                # converts weird dash to normal one
-                if char == "–":
-                    char = "-"
-                self._handle_operator(char)
-            elif char == "!":
-                self._advance()
-                if self._peek() == "=":
-                    self._advance()
-                    self._add_token(TokenType.BANG_EQUAL)
-                else:
-                    self._add_token(TokenType.BANG)
-            elif char == "=":
-                self._advance()
-                if self._peek() == "=":
-                    self._advance()
-                    self._add_token(TokenType.EQUAL_EQUAL)
-                else:
-                    self._add_token(TokenType.EQUAL)
-            elif char in "<>":
-                self._advance()
-                if self._peek() == "=":
-                    ch = char
-                    self._advance()
-                    if ch == "<":
-                        self._add_token(TokenType.LESS_EQUAL)
-                    else:
-                        self._add_token(TokenType.GREATER_EQUAL)
-                else:
-                    if char == "<":
-                        self._add_token(TokenType.LESS)
-                    else:
-                        self._add_token(TokenType.GREATER)
-            elif char.isdigit() or char == ".":  # for decimals
-                self._number()
-            elif char.isalpha() or char == "_":  # for variables
-                self._identifier()
-            else:
-                raise RuntimeError(f"Unexpected character: {char}")
-
-        self._add_token(TokenType.EOF)  # end of file token
+        self.tokens.extend(self.scan())
         return self.tokens
 
-    def _string(self):
-        # skip opening quotation mark
-        self._advance()
-        start = self.current
-        while self._peek() != '"' and not self._is_at_end():
-            self._advance()
-        if self._is_at_end():
-            raise RuntimeError("Unterminated string literal")
-        # extract content
-        value = self.source[start:self.current]
-        # advance past closing quotation mark
-        self._advance()
-        self._add_token(TokenType.STRING, value, start)
-
-    def _handle_operator(self, char):
-        operator_map = {
-            "+": TokenType.PLUS,
-            "-": TokenType.MINUS,
-            "*": TokenType.MUL,
-            "/": TokenType.DIV
-        }
-        self._add_token(operator_map[char])
-        self._advance()
-
-    def _number(self):
-        start = self.current
-        is_float = False
-
-        while self._is_digit(self._peek()):
-            self._advance()
-
-        if self._peek() == ".":  # handle decimals for floats
-            is_float = True
-            self._advance()
-            if not self._is_digit(self._peek()):
-                raise RuntimeError(f"Invalid number: '{self.source[start:self.current]}'")
-            while self._is_digit(self._peek()):
-                self._advance()
-
-        number_str = self.source[start:self.current]
-        value = float(number_str) if is_float else int(number_str)
-        self._add_token(TokenType.NUMBER, value, start)
-
-    def _identifier(self):
-        start = self.current
-        while self._peek().isalnum() or self._peek() == "_":
-            self._advance()
-        text = self.source[start:self.current]
-        keywords = {
-            "true": TokenType.TRUE,
-            "false": TokenType.FALSE,
-            "print": TokenType.PRINT,
-            "if": TokenType.IF,
-            "else": TokenType.ELSE,
-            "while": TokenType.WHILE,
-            "input": TokenType.INPUT,
-            "and": TokenType.AND,
-            "or": TokenType.OR,
-        }
-        token_type = keywords.get(text, TokenType.IDENTIFIER)
-        self._add_token(token_type, text, start)
-
-    def _advance(self):
-        self.current += 1
-
-    def _peek(self):
-        return self.source[self.current] if self.current < len(self.source) else "\0"
-
-    def _is_at_end(self):
-        return self.current >= len(self.source)
-
-    def _is_digit(self, c):
-        return c.isdigit()
-
-    def _add_token(self, type: TokenType, literal=None, start: int = None):
-        if type == TokenType.NUMBER:
-            lexeme = self.source[start:self.current]
-        elif type == TokenType.STRING:
-            lexeme = self.source[start - 1:self.current]
-        elif start is not None:
-            lexeme = self.source[start:self.current]
+    def scan(self):
+        # yields tokens as they are read, ending with EOF. Only the current
+        # chunk and the token crossing its end are held in memory
+        if isinstance(self.source, str):
+            yield from self._scan(self.source, True)
         else:
-            lexeme = self.source[self.current:self.current + 1] if self.current < len(self.source) else ""
-        self.tokens.append(Token(type, lexeme, literal))
+            buffer = ""
+            for chunk in self._chunks():
+                buffer += chunk
+                consumed = yield from self._scan(buffer, False)
+                buffer = buffer[consumed:]
+            yield from self._scan(buffer, True)
+        yield Token(TokenType.EOF, "", None, self._line, 1 - self._line_start)  # end of file token
+
+    def _chunks(self):
+        if not hasattr(self.source, "read"):
+            yield from self.source
+            return
+        # mmaps and binary files give bytes, a character may straddle two reads
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        while True:
+            chunk = self.source.read(self.chunk_size)
+            if not chunk:
+                break
+            yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        yield decoder.decode(b"", final=True)
+
+    def _scan(self, buffer: str, final: bool):
+        # yields the tokens in buffer, returns how much of it was consumed.
+        # Unless final, a token touching the end of buffer may continue in the
+        # next chunk, so it is left for the next call
+        keywords_get = KEYWORDS.get
+        symbol_ids, names, intern = SYMBOLS.ids, SYMBOLS.names, SYMBOLS.intern
+        identifier_type, number_type, string_type = TokenType.IDENTIFIER, TokenType.NUMBER, TokenType.STRING
+        size = len(buffer)
+        line, line_start = self._line, self._line_start
+
+        for match in TOKEN_PATTERN.finditer(buffer):
+            kind = match.lastindex
+            start = match.start()
+            if not final and (match.end() == size or match.group(kind) == '"'):
+                self._line, self._line_start = line, line_start - start
+                return start
+            if kind == SKIP:
+                # only whitespace and strings can hold newlines
+                end = match.end()
+                newlines = buffer.count("\n", start, end)
+                if newlines:
+                    line += newlines
+                    line_start = buffer.rindex("\n", start, end) + 1
+                continue
+            text = match.group(kind)
+            column = start - line_start + 1
+            if kind == IDENTIFIER:
+                token_type = keywords_get(text)
+                if token_type is None:
+                    # the symbol table's copy, so every token of a name shares one string
+                    symbol = symbol_ids.get(text)
+                    text = names[symbol if symbol is not None else intern(text)]
+                    token_type = identifier_type
+                yield Token(token_type, text, text, line, column)
+            elif kind == OPERATOR:
+                token_type, own_lexeme = OPERATORS[text]
+                if own_lexeme:
+                    yield Token(token_type, text, None, line, column)
+                else:
+                    end = match.end()
+                    yield Token(token_type, buffer[end:end + 1], None, line, column)
+            elif kind == NUMBER:
+                if "." in text:
+                    if text[-1] == ".":
+                        raise LexerError(f"Invalid number: '{text}'", line, column)
+                    yield Token(number_type, text, float(text), line, column)
+                else:
+                    yield Token(number_type, text, int(text), line, column)
+            elif kind == STRING:
+                yield Token(string_type, text, text[1:-1], line, column)
+                newlines = text.count("\n")
+                if newlines:
+                    line += newlines
+                    line_start = start + text.rindex("\n") + 1
+            elif kind == UNICODE_IDENTIFIER and text[0].isalpha():
+                text = names[intern(text)]
+                yield Token(identifier_type, text, text, line, column)
+            else:
+                self._error(text[0], line, column)
+        self._line, self._line_start = line, line_start - size
+        return size
+
+    def _error(self, char, line, column):
+        if char == '"':
+            raise LexerError("Unterminated string literal", line, column)
+        if char.isdigit():
+            raise LexerError(f"Invalid number: '{char}'", line, column)
+        raise LexerError(f"Unexpected character: {char}", line, column)
 
 class Environment:
     def __init__(self, parent=None):
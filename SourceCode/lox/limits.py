@@ -0,0 +1,124 @@
+from operator import mul
+from threading import Timer
+from typing import Optional
+from lox.interpreter import Interpreter
+from lox.operators import add
+from lox.rope import STRINGS, compare_flattened, concatenate
+
+# statements run between two step count checks
+CHECK_INTERVAL = 1024
+
+
+class LimitExceeded(RuntimeError):
+    pass
+
+
+class Limits:
+    # budgets for one run of an untrusted script, None is unlimited.
+    #   max_steps   statements executed, every loop iteration runs at least its body
+    #   timeout     wall-clock seconds since the run started
+    #   max_string  length of a string built by + or *
+    def __init__(self, max_steps: Optional[int] = None, timeout: Optional[float] = None,
+                 max_string: Optional[int] = None):
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_string = max_string
+
+
+class LimitedInterpreter(Interpreter):
+    # Interpreter that stops a script with LimitExceeded once it goes over its Limits.
+    #
+    # the per-statement cost is a decrement, a compare and a flag test: a
+    # countdown runs to the next point the steps have to be added up, at most
+    # CHECK_INTERVAL statements away, so max_steps is exact. The clock isn't
+    # read per statement, a Timer thread sets a flag once the timeout is up,
+    # so a script whose statements get slower and slower still stops after
+    # the statement running at the deadline. String + and * results are
+    # checked only when a max_string is set. Loops always run statement by
+    # statement, so every step is counted.
+    kernels = False
+
+    def __init__(self, limits: Limits, output=None):
+        super().__init__(output)
+        self.limits = limits
+        # statements counted so far, including the ones the countdown still lets through
+        self._counted = 0
+        self._countdown = 0
+        # set by the timeout's Timer
+        self._expired = False
+        if limits.max_string is not None:
+            # a NumericBinary concatenates strings too, so it is checked the same way
+            self.visit_binary_expr = self.visit_numeric_binary_expr = self._checked_binary_expr
+
+    def interpret(self, statements):
+        # the clock and the step count start over with every call
+        self._counted = 0
+        self._countdown = 0
+        self._expired = False
+        timer = None
+        if self.limits.timeout is not None:
+            timer = Timer(self.limits.timeout, self._expire)
+            timer.daemon = True
+            timer.start()
+        try:
+            for stmt in statements:
+                self.execute(stmt)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self.output.flush()
+
+    @property
+    def steps(self) -> int:
+        # statements executed so far
+        return self._counted - self._countdown
+
+    def execute(self, stmt):
+        self._countdown -= 1
+        if self._countdown < 0 or self._expired:
+            self._check()
+        stmt.accept(self)
+
+    def _expire(self):
+        # runs on the Timer thread
+        self._expired = True
+
+    def _check(self):
+        # called for the statement about to run, once the countdown is spent
+        # or the time is up
+        if self._expired:
+            # the statement doesn't run, so it isn't a step
+            self._countdown += 1
+            raise LimitExceeded(f"Timeout of {self.limits.timeout} seconds exceeded.")
+        self._countdown = 0
+        max_steps = self.limits.max_steps
+        if max_steps is not None and self._counted >= max_steps:
+            raise LimitExceeded(f"Step limit of {max_steps} exceeded.")
+        interval = CHECK_INTERVAL if max_steps is None else min(CHECK_INTERVAL, max_steps - self._counted)
+        # this statement and the ones the countdown lets through are counted up front
+        self._countdown = interval - 1
+        self._counted += interval
+
+    def _checked_binary_expr(self, expr):
+        # Interpreter.visit_binary_expr inlined, this runs for every binary expression.
+        # The length a string + or * would make is checked before it is built
+        function = expr.function
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if function is add:
+            if type(left) in STRINGS and type(right) in STRINGS:
+                self._check_string(len(left) + len(right))
+            return concatenate(left, right)
+        if function is mul:
+            if type(left) in STRINGS and isinstance(right, int):
+                self._check_string(len(left) * right)
+            elif isinstance(left, int) and type(right) in STRINGS:
+                self._check_string(left * len(right))
+        try:
+            return function(left, right)
+        except TypeError as error:
+            return compare_flattened(function, left, right, error)
+
+    def _check_string(self, length: int):
+        if length > self.limits.max_string:
+            raise LimitExceeded(f"String of {length} characters exceeds the limit of {self.limits.max_string}.")
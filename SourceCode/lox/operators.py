@@ -0,0 +1,40 @@
+import operator
+from lox.tokens import TokenType
+
+
+def add(left, right):
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left + right
+    elif isinstance(left, str) and isinstance(right, str):
+        return left + right
+    else:
+        raise RuntimeError("Operands must be two numbers or two strings")
+
+
+def logical_and(left, right):
+    return left and right
+
+
+def logical_or(left, right):
+    return left or right
+
+
+def unknown(left, right):
+    raise Exception("Unknown binary operator")
+
+
+# Binary nodes look their operator up here once, when they are built
+BINARY_OPERATORS = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+    TokenType.DIV: operator.truediv,
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.BANG_EQUAL: operator.ne,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.AND: logical_and,
+    TokenType.OR: logical_or,
+}
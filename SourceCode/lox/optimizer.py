@@ -0,0 +1,228 @@
+from typing import Optional
+from lox.expressions import (ExprVisitor, Assignment, Binary, Call, Comparison, Invariant, Literal, Logical, Unary,
+                             Variable, children)
+from lox.statements import StmtVisitor, BlockStmt, Expression, IfStmt, Print
+from lox.interpreter import Interpreter
+from lox.limits import LimitedInterpreter, Limits
+from lox.rope import flatten
+from lox.tokens import TokenType
+
+# operators whose result is a number or a string whenever they don't raise,
+# so x * 1 gives back x unchanged
+ARITHMETIC = {TokenType.PLUS, TokenType.MINUS, TokenType.MUL, TokenType.DIV}
+# operators whose result is always a number, so x - 0 gives back x unchanged
+NUMERIC = {TokenType.MINUS, TokenType.DIV}
+# operators a while condition can test with a Comparison
+COMPARISONS = {TokenType.LESS, TokenType.LESS_EQUAL, TokenType.GREATER, TokenType.GREATER_EQUAL,
+               TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL}
+
+
+class Optimizer(ExprVisitor, StmtVisitor):
+    # runs between Parser.parse() and the Resolver, folds literal-only subtrees,
+    # drops Grouping wrappers and simplifies identities such as x * 1.
+    #
+    # folding evaluates the node with the Interpreter itself, so folded values
+    # are exactly what the tree-walker would compute. A node whose evaluation
+    # raises, like 1 / 0, is kept so the error still happens at runtime. With
+    # limits, a string longer than their max_string isn't built but kept for
+    # the run to refuse.
+    #
+    # in a while loop, the largest subexpressions reading only variables the
+    # loop never assigns become Invariant nodes, evaluated once per run of the
+    # loop. They are still evaluated lazily, where the loop first reaches them,
+    # so errors and skipped branches behave as before. Loops containing a call
+    # are left alone, since a native function may rebind anything. A condition
+    # comparing a variable to a literal becomes a Comparison.
+    def __init__(self, hoist: bool = True, limits: Optional[Limits] = None):
+        if limits is not None and limits.max_string is not None:
+            # only the string length is checked, folding runs no statements
+            self.evaluator = LimitedInterpreter(Limits(max_string=limits.max_string))
+        else:
+            self.evaluator = Interpreter()
+        # hoist loop invariants and make Comparison conditions
+        self.hoist = hoist
+
+    def optimize(self, statements):
+        for stmt in statements:
+            stmt.accept(self)
+        return statements
+
+    def _fold(self, expr):
+        try:
+            # a long string comes back as a Rope, which only the Interpreter understands
+            return Literal(flatten(self.evaluator.evaluate(expr)))
+        except Exception:
+            return expr
+
+    def _produces(self, expr, operators) -> bool:
+        # true if expr evaluates to the result of one of operators, or raises
+        if isinstance(expr, Binary):
+            return expr.operator.type in operators
+        if isinstance(expr, Unary):
+            return expr.operator.type == TokenType.MINUS
+        return False
+
+    def _simplify(self, expr):
+        left, right, operator_type = expr.left, expr.right, expr.operator.type
+        if operator_type == TokenType.MUL:
+            if _is_int(right, 1) and self._produces(left, ARITHMETIC):
+                return left
+            if _is_int(left, 1) and self._produces(right, ARITHMETIC):
+                return right
+        elif operator_type == TokenType.MINUS:
+            if _is_int(right, 0) and self._produces(left, NUMERIC):
+                return left
+        return expr
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+        return stmt
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        stmt.body.accept(self)
+        if not self.hoist:
+            return stmt
+        nodes = list(_descendants(stmt))
+        if not any(isinstance(node, Call) for node in nodes):
+            assigned = {node.name.lexeme for node in nodes if isinstance(node, Assignment)}
+            stmt.condition = self._hoist_operand(stmt.condition, stmt, assigned)
+            self._hoist_statement(stmt.body, stmt, assigned)
+
+        condition = stmt.condition
+        if (isinstance(condition, Binary) and condition.operator.type in COMPARISONS
+                and isinstance(condition.left, Variable) and isinstance(condition.right, Literal)):
+            stmt.condition = Comparison(condition.left, condition.operator, condition.right)
+        return stmt
+
+    def _hoist_statement(self, stmt, loop, assigned):
+        # inner loops have hoisted what they can into their own cache already
+        if isinstance(stmt, (Print, Expression)):
+            stmt.expression = self._hoist_operand(stmt.expression, loop, assigned)
+        elif isinstance(stmt, IfStmt):
+            stmt.condition = self._hoist_operand(stmt.condition, loop, assigned)
+            self._hoist_statement(stmt.then_branch, loop, assigned)
+            if stmt.else_branch is not None:
+                self._hoist_statement(stmt.else_branch, loop, assigned)
+        elif isinstance(stmt, BlockStmt):
+            for statement in stmt.statements:
+                self._hoist_statement(statement, loop, assigned)
+
+    def _hoist_operand(self, expr, loop, assigned):
+        # expr, as an Invariant of loop if it is invariant as a whole
+        return self._cache(expr, loop) if self._hoist(expr, loop, assigned) else expr
+
+    def _cache(self, expr, loop):
+        # a literal or a variable costs as much to read as the cache
+        if not isinstance(expr, (Binary, Logical, Unary)):
+            return expr
+        loop.invariants += 1
+        return Invariant(expr, loop.invariants - 1)
+
+    def _hoist(self, expr, loop, assigned) -> bool:
+        # whether expr is loop invariant. If it isn't, its invariant operands are hoisted
+        if isinstance(expr, Literal):
+            return True
+        if isinstance(expr, Variable):
+            return expr.name.lexeme not in assigned
+        if isinstance(expr, (Binary, Logical)):
+            left = self._hoist(expr.left, loop, assigned)
+            right = self._hoist(expr.right, loop, assigned)
+            if left and right:
+                return True
+            if left:
+                expr.left = self._cache(expr.left, loop)
+            if right:
+                expr.right = self._cache(expr.right, loop)
+            return False
+        if isinstance(expr, Unary):
+            return self._hoist(expr.right, loop, assigned)
+        if isinstance(expr, Assignment):
+            expr.value = self._hoist_operand(expr.value, loop, assigned)
+        return False
+
+    def visit_block_stmt(self, stmt):
+        for statement in stmt.statements:
+            statement.accept(self)
+        return stmt
+
+    def visit_assignment_expr(self, expr):
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_binary_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            return self._fold(expr)
+        return self._simplify(expr)
+
+    def visit_logical_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if isinstance(expr.left, Literal):
+            # a literal left operand decides statically whether the right one runs
+            truthy = self.evaluator.is_truthy(expr.left.value)
+            if truthy == (expr.operator.type == TokenType.OR):
+                return expr.left
+            return expr.right
+        return expr
+
+    def visit_unary_expr(self, expr):
+        expr.right = expr.right.accept(self)
+        if isinstance(expr.right, Literal):
+            return self._fold(expr)
+        return expr
+
+    def visit_literal_expr(self, expr):
+        return expr
+
+    def visit_grouping_expr(self, expr):
+        # precedence is already in the tree shape
+        return expr.expression.accept(self)
+
+    def visit_variable_expr(self, expr):
+        return expr
+
+    def visit_invariant_expr(self, expr):
+        return expr
+
+    def visit_call_expr(self, expr):
+        expr.callee = expr.callee.accept(self)
+        expr.arguments = [argument.accept(self) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_set_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_super_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_this_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+
+def _descendants(node):
+    # node and every expression and statement under it
+    yield node
+    for child in children(node):
+        yield from _descendants(child)
+
+
+def _is_int(expr, value) -> bool:
+    # exact int literal, 1.0 and true would change the result type
+    return isinstance(expr, Literal) and type(expr.value) is int and expr.value == value
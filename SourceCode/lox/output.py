@@ -0,0 +1,56 @@
+import sys
+
+# lines a BufferedWriter holds before writing them out
+FLUSH_LINES = 1024
+
+
+class BufferedWriter:
+    # where print statements go, written to stream in batches of threshold lines.
+    #
+    # interpreters flush it when a run ends, normally or with an error, and
+    # before input() shows its prompt, so output keeps its order
+    def __init__(self, stream=None, threshold: int = FLUSH_LINES):
+        # None is whatever sys.stdout is when flushing, which lets redirect_stdout work
+        self.stream = stream
+        self.threshold = threshold
+        self.lines = []
+
+    def write(self, value):
+        self.lines.append(str(value))
+        if len(self.lines) >= self.threshold:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+            stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+class FileWriter(BufferedWriter):
+    # print output written to a file
+    def __init__(self, path, threshold: int = FLUSH_LINES):
+        super().__init__(open(path, "w"), threshold)
+
+    def close(self):
+        self.flush()
+        self.stream.close()
+
+
+class ListWriter:
+    # keeps every printed line in memory, for tests and embedding
+    def __init__(self):
+        self.lines = []
+
+    def write(self, value):
+        self.lines.append(str(value))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
@@ -1,31 +1,38 @@
 from lox.tokens import TokenType
-from lox.expressions import Binary, Grouping, Literal, Unary, Variable, Assignment, Call
+from lox.expressions import Binary, Grouping, Literal, Logical, Unary, Variable, Assignment, Call
 from lox.statements import Print, Expression, IfStmt, WhileStmt, BlockStmt
 
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.current = 0
+        # tokens can be a list or a generator such as Lexer.scan(), they are pulled one at a time
+        self.tokens = iter(tokens)
+        self._current = next(self.tokens)
+        self._previous = None
 
     def parse(self):
         # store parsed statements
-        statements = []
+        return list(self.statements())
+
+    def statements(self):
+        # yields top-level statements as soon as each is parsed
         while not self._is_at_end():
-            statements.append(self.statement())
-        return statements
+            yield self.statement()
 
     def statement(self):
+        start = self.peek()
         if self.match(TokenType.PRINT):
-            return self.print_statement()
+            stmt = self.print_statement()
         elif self.match(TokenType.IF):
-            return self.if_statement()
+            stmt = self.if_statement()
         elif self.match(TokenType.WHILE):
-            return self.while_statement()
+            stmt = self.while_statement()
         elif self.match(TokenType.LBRACE):
-            return self.block_statement()
+            stmt = self.block_statement()
         else:
-            return self.expression_statement()
+            stmt = self.expression_statement()
+        stmt.line, stmt.column = start.line, start.column
+        return stmt
 
     def print_statement(self):
         expr = self.expression()
@@ -53,7 +60,7 @@ class Parser:
         while self.match(TokenType.OR):
             operator = self.previous()
             right = self.logic_and()
-            expr = Binary(expr, operator, right)
+            expr = Logical(expr, operator, right)
         return expr
 
     def logic_and(self):
@@ -61,7 +68,7 @@ class Parser:
         while self.match(TokenType.AND):
             operator = self.previous()
             right = self.equality()
-            expr = Binary(expr, operator, right)
+            expr = Logical(expr, operator, right)
         return expr
 
     def equality(self):
@@ -146,17 +153,18 @@ class Parser:
     def advance(self):
         # move to next token
         if not self._is_at_end():
-            self.current += 1
-        return self.previous()
+            self._previous = self._current
+            self._current = next(self.tokens)
+        return self._previous
 
     def _is_at_end(self):
         return self.peek().type == TokenType.EOF
 
     def peek(self):
-        return self.tokens[self.current]
+        return self._current
 
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self._previous
 
     def consume(self, token_type, message):
         if self.check(token_type):
@@ -164,12 +172,15 @@ class Parser:
         raise Exception(message)
 
     def block_statement(self):
+        start = self.peek()
         self.consume(TokenType.LBRACE, "Expect '{' to start block.")
         statements = []
         while not self.check(TokenType.RBRACE) and not self._is_at_end():
             statements.append(self.statement())
         self.consume(TokenType.RBRACE, "Expect '}' after block.")
-        return BlockStmt(statements)
+        block = BlockStmt(statements)
+        block.line, block.column = start.line, start.column
+        return block
 
     def if_statement(self):
         self.consume(TokenType.LPAREN, "Expect '(' after 'if'.")
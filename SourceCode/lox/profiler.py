@@ -0,0 +1,167 @@
+from time import perf_counter
+from typing import Dict, List, Optional
+from lox.interpreter import Interpreter
+from lox.statements import Stmt
+
+# attributes holding an expression's leftmost operand, which comes first in the source
+LEFTMOST = ("left", "callee", "obj", "expression")
+# attributes holding a token an expression starts with
+TOKENS = ("name", "operator", "keyword")
+
+
+class NodeStats:
+    __slots__ = ("label", "description", "line", "column", "count", "total", "self_time")
+
+    def __init__(self, label: str, description: str, line: int, column: int):
+        self.label = label
+        self.description = description
+        self.line = line
+        self.column = column
+        self.count = 0
+        # seconds including and excluding the node's children
+        self.total = 0.0
+        self.self_time = 0.0
+
+
+class LineStats:
+    __slots__ = ("hits", "total", "self_time")
+
+    def __init__(self):
+        self.hits = 0
+        self.total = 0.0
+        self.self_time = 0.0
+
+
+class Frame:
+    # one node of the call tree the collapsed stacks are written from
+    __slots__ = ("children", "self_time")
+
+    def __init__(self):
+        self.children: Dict[str, Frame] = {}
+        self.self_time = 0.0
+
+
+def position(node, default):
+    # (line, column) of the first token of node, default if it has none
+    if isinstance(node, Stmt):
+        return node.line, node.column
+    for attribute in LEFTMOST:
+        if hasattr(node, attribute):
+            return position(getattr(node, attribute), default)
+    for attribute in TOKENS:
+        token = getattr(node, attribute, None)
+        if token is not None and token.line:
+            return token.line, token.column
+    return default
+
+
+def describe(node) -> str:
+    name = type(node).__name__
+    if hasattr(node, "operator"):
+        return f"{name} {node.operator.type.name.lower()}"
+    if hasattr(node, "name"):
+        return f"{name} {node.name.lexeme}"
+    return name
+
+
+class ProfilingInterpreter(Interpreter):
+    # Interpreter that counts and times every statement and expression it runs.
+    #
+    # Interpreter itself is left untouched, so profiling costs nothing unless
+    # this class is used instead. "total" includes a node's children and
+    # "self" doesn't. A line's total only counts its outermost running node, so
+    # nested expressions on one line aren't counted twice. Loops run statement
+    # by statement, so their bodies show up in the profile.
+    kernels = False
+
+    def __init__(self, output=None):
+        super().__init__(output)
+        self.nodes: Dict[object, NodeStats] = {}
+        self.lines: Dict[int, LineStats] = {}
+        self.root = Frame()
+        self._frame = self.root
+        self._position = (0, 0)
+        self._running_lines = set()
+        self._child_time = 0.0
+
+    def interpret(self, statements):
+        try:
+            for stmt in statements:
+                self.execute(stmt)
+        finally:
+            self.output.flush()
+
+    def execute(self, stmt):
+        self._profile(stmt)
+
+    def evaluate(self, expr):
+        return self._profile(expr)
+
+    def _profile(self, node):
+        stats = self.nodes.get(node)
+        if stats is None:
+            line, column = position(node, self._position)
+            stats = self.nodes[node] = NodeStats(f"{type(node).__name__}:{line}", describe(node), line, column)
+        line = stats.line
+        line_stats = self.lines.get(line)
+        if line_stats is None:
+            line_stats = self.lines[line] = LineStats()
+        parent_frame, parent_position = self._frame, self._position
+        frame = parent_frame.children.get(stats.label)
+        if frame is None:
+            frame = parent_frame.children[stats.label] = Frame()
+        outermost = line not in self._running_lines
+        if outermost:
+            self._running_lines.add(line)
+        self._frame, self._position = frame, (line, stats.column)
+        child_time, self._child_time = self._child_time, 0.0
+
+        start = perf_counter()
+        try:
+            return node.accept(self)
+        finally:
+            elapsed = perf_counter() - start
+            own = elapsed - self._child_time
+            self._child_time = child_time + elapsed
+            self._frame, self._position = parent_frame, parent_position
+            stats.count += 1
+            stats.total += elapsed
+            stats.self_time += own
+            frame.self_time += own
+            line_stats.self_time += own
+            if outermost:
+                self._running_lines.discard(line)
+                line_stats.hits += 1
+                line_stats.total += elapsed
+
+    def report(self, source: Optional[str] = None, limit: int = 20) -> str:
+        # hot spots by total time, per node and per line. With the script's
+        # source each line is shown next to its timings
+        text = source.splitlines() if source is not None else []
+        rows = [f"{'count':>10} {'total ms':>10} {'self ms':>10} {'us/hit':>8}  location  node"]
+        for stats in sorted(self.nodes.values(), key=lambda stats: stats.total, reverse=True)[:limit]:
+            rows.append(f"{stats.count:>10} {stats.total * 1000:10.2f} {stats.self_time * 1000:10.2f} "
+                        f"{stats.total / stats.count * 1e6:8.2f}  {stats.line}:{stats.column:<6} {stats.description}")
+        rows.append("")
+        rows.append(f"{'hits':>10} {'total ms':>10} {'self ms':>10}  line")
+        for line, stats in sorted(self.lines.items(), key=lambda item: item[1].total, reverse=True)[:limit]:
+            code = text[line - 1].strip() if 0 < line <= len(text) else ""
+            rows.append(f"{stats.hits:>10} {stats.total * 1000:10.2f} {stats.self_time * 1000:10.2f}  {line:<6} {code}")
+        return "\n".join(rows)
+
+    def collapsed(self) -> List[str]:
+        # flamegraph.pl / speedscope collapsed stacks, self time in microseconds
+        lines = []
+        pending = [(name, frame) for name, frame in self.root.children.items()]
+        while pending:
+            stack, frame = pending.pop()
+            microseconds = round(frame.self_time * 1e6)
+            if microseconds > 0:
+                lines.append(f"{stack} {microseconds}")
+            pending.extend((f"{stack};{name}", child) for name, child in frame.children.items())
+        return sorted(lines)
+
+    def write_collapsed(self, path):
+        with open(path, "w") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
@@ -0,0 +1,173 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+from lox.asyncinterpreter import AsyncInterpreter
+from lox.cache import ProgramCache
+from lox.compact import CompactEncoder, CompactInterpreter
+from lox.compiler import Compiler
+from lox.interpreter import Environment, Interpreter, NAMES, Runner
+from lox.limits import LimitedInterpreter, Limits
+from lox.lexer import Lexer
+from lox.optimizer import Optimizer
+from lox.parser import Parser
+from lox.profiler import ProfilingInterpreter
+from lox.pycompiler import PyCompiler
+from lox.resolver import Resolver
+from lox.rope import flatten
+from lox.vectorizer import Vectorizer
+from lox.vm import VM
+
+BACKENDS = ("interpreter", "vm", "python", "compact")
+
+
+class CompileError(Exception):
+    # a script that failed before it could run. phase is the step that failed
+    # as the command line reports it, "Lexer", "Parser" or "Compiler", and the
+    # error it raised is the __cause__
+    def __init__(self, phase: str, error: Exception):
+        super().__init__(str(error))
+        self.phase = phase
+
+
+class Program:
+    # a script lexed, parsed, resolved and compiled once, then run any number
+    # of times, each run with its own globals.
+    #
+    # names a run may find already bound, besides input and natives, have to
+    # be listed in globals: the Resolver decides from them whether an
+    # assignment inside a block updates a global or defines a local.
+    #
+    # limits are what every run is held to unless run() is given others.
+    # optimize folds constant strings only up to their max_string, so an
+    # optimized program can't run with a smaller max_string.
+    #
+    # with a cache, the parse of a source seen before is loaded instead.
+    # compile() compiles more statements against the globals the earlier ones
+    # assign, which is how --stream runs a file one statement at a time.
+    def __init__(self, source: str, globals: Iterable[str] = (), natives: Optional[Dict[str, Callable]] = None,
+                 backend: str = "interpreter", optimize: bool = False, vectorize: bool = False,
+                 limits: Optional[Limits] = None, cache: Optional[ProgramCache] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'")
+        if vectorize and backend != "interpreter":
+            raise ValueError("vectorize needs the interpreter backend")
+        if limits is not None and backend != "interpreter":
+            raise ValueError("limits need the interpreter backend")
+        self.backend = backend
+        self.optimized = optimize
+        self.limits = limits
+        self.natives = dict(natives or {})
+        self.global_names = {"input", *globals, *self.natives}
+        self.optimizer = Optimizer(limits=limits) if optimize else None
+        self.resolver = Resolver(self.global_names)
+        self.vectorizer = Vectorizer() if vectorize else None
+
+        statements = cache.load(source) if cache is not None else None
+        if statements is None:
+            statements = self.parse(source)
+            if cache is not None:
+                cache.store(source, statements)
+        self.code = self.compile(statements)
+
+    @staticmethod
+    def parse(source: str) -> list:
+        try:
+            tokens = Lexer(source).tokenize()
+        except Exception as error:
+            raise CompileError("Lexer", error) from error
+        try:
+            return Parser(tokens).parse()
+        except Exception as error:
+            raise CompileError("Parser", error) from error
+
+    def compile(self, statements: list):
+        # the code run() runs for statements on this program's backend
+        try:
+            if self.optimizer is not None:
+                statements = self.optimizer.optimize(statements)
+            self.resolver.resolve(statements)
+            if self.vectorizer is not None:
+                self.vectorizer.vectorize(statements)
+        except Exception as error:
+            raise CompileError("Parser", error) from error
+        try:
+            if self.backend == "vm":
+                return Compiler().compile(statements)
+            if self.backend == "python":
+                return PyCompiler().compile(statements)
+            if self.backend == "compact":
+                return CompactEncoder().encode(statements)
+            return statements
+        except Exception as error:
+            raise CompileError("Compiler", error) from error
+
+    def register(self, name: str, function: Callable):
+        # a native function every later run can call
+        if name not in self.global_names:
+            raise ValueError(f"'{name}' wasn't declared in globals when the program was compiled")
+        self.natives[name] = function
+
+    def run(self, globals=None, output=None, limits: Optional[Limits] = None) -> Dict[str, Any]:
+        # globals is a dict of initial values or an Environment kept between
+        # runs. Returns every global after the run by name
+        runner = self.runner(output, limits)
+        self._bind(runner, globals)
+        self.execute(runner)
+        return {NAMES[symbol]: flatten(value) for symbol, value in runner.globals.values.items()}
+
+    def runner(self, output=None, limits: Optional[Limits] = None, profile: bool = False) -> Runner:
+        # a new Runner for this program's backend, held to limits or the
+        # program's own, or a ProfilingInterpreter
+        if limits is None:
+            limits = self.limits
+        if profile:
+            if self.backend != "interpreter" or limits is not None:
+                raise ValueError("profile needs the interpreter backend without limits")
+            return ProfilingInterpreter(output)
+        if limits is not None:
+            if self.backend != "interpreter":
+                raise ValueError("limits need the interpreter backend")
+            if self.optimized and not _within(limits.max_string, self.limits.max_string if self.limits else None):
+                raise ValueError("max_string is smaller than the one the program was optimized for")
+            return LimitedInterpreter(limits, output)
+        if self.backend == "vm":
+            return VM(output)
+        if self.backend == "compact":
+            return CompactInterpreter(output)
+        return Interpreter(output)
+
+    def execute(self, runner: Runner, code=None):
+        # runs code, by default the program's, on a runner from runner(), whose
+        # globals are kept as they are
+        code = self.code if code is None else code
+        if self.backend == "python":
+            code.run(runner.globals, runner.output)
+        elif self.backend == "interpreter":
+            runner.interpret(code)
+        else:
+            runner.run(code)
+
+    async def run_async(self, globals=None, output=None) -> Dict[str, Any]:
+        # run() on an AsyncInterpreter, natives may be coroutine functions
+        if self.backend != "interpreter":
+            raise ValueError("run_async needs the interpreter backend")
+        runner = AsyncInterpreter(output)
+        self._bind(runner, globals)
+        await runner.interpret_async(self.code)
+        return {NAMES[symbol]: flatten(value) for symbol, value in runner.globals.values.items()}
+
+    def _bind(self, runner, globals):
+        if isinstance(globals, Environment):
+            runner.globals = runner.environment = globals
+            # input flushes this run's output
+            globals.define("input", runner.read_line)
+        for name, function in self.natives.items():
+            runner.globals.define(name, function)
+        if isinstance(globals, dict):
+            for name, value in globals.items():
+                if name not in self.global_names:
+                    raise ValueError(f"'{name}' wasn't declared in globals when the program was compiled")
+                runner.globals.define(name, value)
+
+
+def _within(limit: Optional[int], compiled: Optional[int]) -> bool:
+    # whether strings folded under the compiled limit all fit limit, None is unlimited
+    return limit is None or compiled is not None and compiled <= limit
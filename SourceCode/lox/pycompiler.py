@@ -0,0 +1,345 @@
+from typing import Dict, List, Set
+from lox.expressions import ExprVisitor, Assignment, Binary, Literal, Variable, Unary
+from lox.statements import StmtVisitor
+from lox.interpreter import Environment, Interpreter, UNSET
+from lox.operators import add
+from lox.resolver import GLOBAL
+from lox.symbols import SYMBOLS
+from lox.tokens import TokenType
+
+INDENTATION = "    "
+
+BINARY_OPERATORS = {
+    TokenType.MINUS: "-",
+    TokenType.MUL: "*",
+    TokenType.DIV: "/",
+    TokenType.EQUAL_EQUAL: "==",
+    TokenType.BANG_EQUAL: "!=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+}
+
+# operators whose result is already a bool, usable as a Python condition as-is
+COMPARISONS = {
+    TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL, TokenType.LESS,
+    TokenType.LESS_EQUAL, TokenType.GREATER, TokenType.GREATER_EQUAL,
+}
+
+# exact types that pass the number check in add(), bool is an int there too
+NUMBERS = frozenset((int, float, bool))
+
+
+def undefined(name: str):
+    raise RuntimeError(f"Undefined variable '{name}'.")
+
+
+def call(callee, *arguments):
+    if callable(callee):
+        return callee(*arguments)
+    raise RuntimeError("Can only call functions")
+
+
+class PyProgram:
+    # a compiled Python function standing for a whole Lox program
+    def __init__(self, source: str, constants: List):
+        self.source = source
+        namespace = {
+            "UNSET": UNSET, "NUMBERS": NUMBERS, "K": constants,
+            "add": add, "call": call, "undefined": undefined,
+        }
+        exec(compile(source, "<lox>", "exec"), namespace)
+        self.function = namespace["program"]
+
+    def run(self, environment: Environment, output=None):
+        # globals are read from and written back to environment.values, print
+        # statements go to output, see lox.output, or to print() without one
+        if output is None:
+            self.function(environment.values, print)
+            return
+        try:
+            self.function(environment.values, output.write)
+        finally:
+            output.flush()
+
+
+class InterpretedProgram:
+    # stands in for a PyProgram when CPython can't compile the translation,
+    # which nests a parenthesis per binary expression and a block per loop,
+    # if and global write-back: the statements run on an Interpreter instead
+    def __init__(self, statements):
+        self.statements = statements
+
+    def run(self, environment: Environment, output=None):
+        interpreter = Interpreter(output)
+        interpreter.globals = interpreter.environment = environment
+        interpreter.interpret(self.statements)
+
+
+class PyCompiler(ExprVisitor, StmtVisitor):
+    # translates resolved parser output into Python source so CPython's own
+    # bytecode runs the loops.
+    #
+    # block variables become Python locals named after their block and slot,
+    # globals are copied into locals on entry and written back on exit.
+    # Expressions keep the tree-walker's semantics: + goes through the same
+    # type check unless both operands are plain numbers, conditions use Lox
+    # truthiness and a global read before any assignment raises as before.
+    def __init__(self):
+        self.lines: List[str] = []
+        self.indent = 1
+        self.constants = []
+        self.temporaries = 0
+        # Lox global name -> Python local
+        self.globals: Dict[str, str] = {}
+        # globals certainly assigned by the top-level code compiled so far
+        self.assigned: Set[str] = set()
+        # BlockStmts enclosing the current node, innermost last, with their ids
+        self.blocks = []
+        self.block_count = 0
+        # block-local Python names a by-name lookup may probe, they must start UNSET
+        self.probed: Set[str] = set()
+        self.conditional = 0
+
+    def compile(self, statements):
+        # a PyProgram, or an InterpretedProgram for programs nested deeper than CPython allows
+        try:
+            return self._compile(statements)
+        except (SyntaxError, RecursionError):
+            return InterpretedProgram(statements)
+
+    def _compile(self, statements) -> PyProgram:
+        for stmt in statements:
+            stmt.accept(self)
+        if len(self.lines) == 0:
+            self._emit("pass")
+
+        header = ["def program(G, write):"]
+        # G is keyed on symbol ids
+        for name, local in self.globals.items():
+            header.append(f"{INDENTATION}{local} = G.get({SYMBOLS.intern(name)}, UNSET)  # {name}")
+        header.append(f"{INDENTATION}try:")
+        footer = [f"{INDENTATION}finally:"]
+        for name, local in self.globals.items():
+            footer.append(f"{INDENTATION * 2}if {local} is not UNSET: G[{SYMBOLS.intern(name)}] = {local}")
+        if len(self.globals) == 0:
+            footer.append(f"{INDENTATION * 2}pass")
+
+        source = "\n".join(header + self.lines + footer) + "\n"
+        return PyProgram(source, self.constants)
+
+    def _emit(self, line: str):
+        self.lines.append(INDENTATION * (self.indent + 1) + line)
+
+    def _temporary(self) -> str:
+        self.temporaries += 1
+        return f"t{self.temporaries}"
+
+    def _global(self, name: str) -> str:
+        if name not in self.globals:
+            self.globals[name] = f"g{len(self.globals)}"
+        return self.globals[name]
+
+    def _local(self, depth: int, slot: int) -> str:
+        return f"b{self.blocks[len(self.blocks) - 1 - depth][1]}_{slot}"
+
+    def _candidates(self, name: str) -> List[str]:
+        # every binding a by-name lookup of name could find, innermost first
+        candidates = []
+        for block, block_id in reversed(self.blocks):
+            if name in block.names:
+                candidates.append(f"b{block_id}_{block.names[name]}")
+        self.probed.update(candidates)
+        candidates.append(self._global(name))
+        return candidates
+
+    def _is_simple(self, expr) -> bool:
+        # evaluating expr twice is free and can't raise
+        if isinstance(expr, Literal):
+            return True
+        if isinstance(expr, Variable):
+            if expr.depth == GLOBAL:
+                return expr.name.lexeme in self.assigned
+            return expr.depth is not None
+        return False
+
+    def _truthy(self, expr) -> str:
+        # Python condition with is_truthy semantics
+        if isinstance(expr, Binary) and expr.operator.type in COMPARISONS:
+            return expr.accept(self)
+        if isinstance(expr, Unary) and expr.operator.type == TokenType.BANG:
+            return expr.accept(self)
+        value = self._temporary()
+        return f"({value} := {expr.accept(self)}) is not None and {value} is not False"
+
+    def _store(self, expr, value: str) -> str:
+        # Python expression assigning value to expr's variable and giving it back
+        name = expr.name.lexeme
+        if expr.depth == GLOBAL:
+            if not self.blocks and not self.conditional:
+                self.assigned.add(name)
+            return f"({self._global(name)} := {value})"
+        if expr.depth is not None:
+            return f"({self._local(expr.depth, expr.slot)} := {value})"
+
+        # assign the innermost bound candidate, otherwise define in the current block
+        candidates = self._candidates(name)
+        current = self._local(0, self.blocks[-1][0].names[name])
+        temporary = self._temporary()
+        # the first test only binds the value, it is never UNSET
+        branches = [f"({candidates[0]} := {temporary}) if ({temporary} := {value}) is not UNSET "
+                    f"and {candidates[0]} is not UNSET"]
+        for candidate in candidates[1:]:
+            branches.append(f"({candidate} := {temporary}) if {candidate} is not UNSET")
+        return "(" + " else ".join(branches) + f" else ({current} := {temporary}))"
+
+    def visit_print_stmt(self, stmt):
+        self._emit(f"write({stmt.expression.accept(self)})")
+
+    def visit_expression_stmt(self, stmt):
+        expr = stmt.expression
+        if isinstance(expr, Assignment) and expr.depth is not None:
+            # plain statement, the value isn't needed
+            value = expr.value.accept(self)
+            if expr.depth == GLOBAL:
+                if not self.blocks and not self.conditional:
+                    self.assigned.add(expr.name.lexeme)
+                self._emit(f"{self._global(expr.name.lexeme)} = {value}")
+            else:
+                self._emit(f"{self._local(expr.depth, expr.slot)} = {value}")
+            return
+        self._emit(expr.accept(self))
+
+    def visit_if_stmt(self, stmt):
+        self._emit(f"if {self._truthy(stmt.condition)}:")
+        self._nested(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self._emit("else:")
+            self._nested(stmt.else_branch)
+
+    def visit_while_stmt(self, stmt):
+        self._emit(f"while {self._truthy(stmt.condition)}:")
+        self._nested(stmt.body)
+
+    def _nested(self, stmt):
+        self.indent += 1
+        start = len(self.lines)
+        stmt.accept(self)
+        if len(self.lines) == start:
+            self._emit("pass")
+        self.indent -= 1
+
+    def visit_block_stmt(self, stmt):
+        # a block that defines nothing has no frame, see Resolver
+        block_id = None
+        if stmt.names:
+            self.block_count += 1
+            block_id = self.block_count
+            self.blocks.append((stmt, block_id))
+        start = len(self.lines)
+        try:
+            for statement in stmt.statements:
+                statement.accept(self)
+        finally:
+            if block_id is not None:
+                self.blocks.pop()
+        # a fresh scope per execution, only visible to by-name lookups
+        probed = [f"b{block_id}_{slot}" for slot in stmt.names.values() if f"b{block_id}_{slot}" in self.probed]
+        if probed:
+            self.lines.insert(start, INDENTATION * (self.indent + 1) + " = ".join(probed) + " = UNSET")
+
+    def visit_assignment_expr(self, expr):
+        return self._store(expr, expr.value.accept(self))
+
+    def visit_variable_expr(self, expr):
+        name = expr.name.lexeme
+        if expr.depth == GLOBAL:
+            local = self._global(name)
+            if name in self.assigned:
+                return local
+            return f"({local} if {local} is not UNSET else undefined({name!r}))"
+        if expr.depth is not None:
+            return self._local(expr.depth, expr.slot)
+        candidates = self._candidates(name)
+        branches = [f"{candidate} if {candidate} is not UNSET" for candidate in candidates]
+        return "(" + " else ".join(branches) + f" else undefined({name!r}))"
+
+    def visit_binary_expr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        operator_type = expr.operator.type
+        if operator_type in BINARY_OPERATORS:
+            return f"({left} {BINARY_OPERATORS[operator_type]} {right})"
+        if operator_type == TokenType.AND:
+            return f"({left} and {right})"
+        if operator_type == TokenType.OR:
+            return f"({left} or {right})"
+        if operator_type != TokenType.PLUS:
+            raise Exception("Unknown binary operator")
+
+        # + adds directly when both operands are plain numbers, anything else
+        # goes through add() for its type check and error
+        if not (self._is_simple(expr.left) and self._is_simple(expr.right)):
+            first, second = self._temporary(), self._temporary()
+            return (f"({first} + {second} if ({first} := {left}, {second} := {right}) "
+                    f"and type({first}) in NUMBERS and type({second}) in NUMBERS else add({first}, {second}))")
+        checks = [f"type({operand}) in NUMBERS" for operand, node in ((left, expr.left), (right, expr.right))
+                  if not (isinstance(node, Literal) and type(node.value) in NUMBERS)]
+        if not checks:
+            return f"add({left}, {right})"
+        return f"({left} + {right} if {' and '.join(checks)} else add({left}, {right}))"
+
+    def visit_logical_expr(self, expr):
+        left = expr.left.accept(self)
+        self.conditional += 1
+        try:
+            right = expr.right.accept(self)
+        finally:
+            self.conditional -= 1
+        value = self._temporary()
+        truthy = f"({value} := {left}) is not None and {value} is not False"
+        if expr.operator.type == TokenType.OR:
+            return f"({value} if {truthy} else {right})"
+        return f"({right} if {truthy} else {value})"
+
+    def visit_unary_expr(self, expr):
+        right = expr.right.accept(self)
+        if expr.operator.type == TokenType.MINUS:
+            return f"(-{right})"
+        elif expr.operator.type == TokenType.BANG:
+            return f"(not {right})"
+        else:
+            raise Exception("Unknown unary operator")
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+        if value is None or type(value) in (bool, str) or (type(value) is int and abs(value) < 1 << 63):
+            return repr(value)
+        if type(value) is float and value == value and abs(value) != float("inf"):
+            return repr(value)
+        # anything repr() can't round-trip goes through the constant list
+        self.constants.append(value)
+        return f"K[{len(self.constants) - 1}]"
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_invariant_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_call_expr(self, expr):
+        arguments = [expr.callee.accept(self)] + [argument.accept(self) for argument in expr.arguments]
+        return f"call({', '.join(arguments)})"
+
+    def visit_get_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_set_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_super_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_this_expr(self, expr):
+        raise NotImplementedError("not implemented")
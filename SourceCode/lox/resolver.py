@@ -0,0 +1,196 @@
+from typing import Dict, Iterable, List, Optional, Set
+from lox.expressions import ExprVisitor, Assignment, Variable, children
+from lox.statements import StmtVisitor, BlockStmt
+from lox.symbols import SYMBOLS
+
+# Variable/Assignment.depth values besides a scope distance
+GLOBAL = -1     # look the name up in Interpreter.globals
+DYNAMIC = None  # binding can't be known statically, walk the environment chain by name
+
+
+class BlockScope:
+    def __init__(self):
+        # every name that can be defined in this block, mapped to its slot
+        self.names: Dict[str, int] = {}
+        # names that are certainly bound at the current point of the walk
+        self.defined: Set[str] = set()
+        # names that are only bound if a short-circuited operand ran
+        self.maybe: Set[str] = set()
+
+    def slot(self, name: str) -> int:
+        if name not in self.names:
+            self.names[name] = len(self.names)
+        return self.names[name]
+
+
+class Resolver(ExprVisitor, StmtVisitor):
+    # runs between Parser.parse() and Interpreter.interpret(), gives every
+    # Variable/Assignment its symbol id and a (depth, slot) pair, and every
+    # BlockStmt its slot layout.
+    #
+    # assignments define variables on first use, so whether a name is bound
+    # depends on what has executed. A block only ever gains bindings from
+    # assignments directly inside it, which run in source order, so tracking
+    # them during the walk is enough. Anything a short-circuit makes uncertain
+    # falls back to a dynamic lookup.
+    #
+    # a block that defines no variable gets no frame at runtime, the backends
+    # run its statements in the enclosing environment. Which blocks those are
+    # is only known once the walk is done, so depths are counted again
+    # afterwards, leaving such blocks out.
+    def __init__(self, global_names: Iterable[str] = ()):
+        self.scopes: List[BlockScope] = []
+        self.globals: Set[str] = set(global_names)
+        self.maybe_globals: Set[str] = set()
+        self.conditional = 0
+
+    def resolve(self, statements):
+        for stmt in statements:
+            stmt.accept(self)
+        for stmt in statements:
+            _count_frames(stmt, [])
+        return statements
+
+    def _find(self, name: str) -> Optional[int]:
+        # index of the innermost block binding name, -1 for globals, None if unknown
+        for index in range(len(self.scopes) - 1, -1, -1):
+            scope = self.scopes[index]
+            if name in scope.defined:
+                return index
+            if name in scope.maybe:
+                return None
+        return GLOBAL
+
+    def _bind(self, scope: BlockScope, name: str):
+        if self.conditional:
+            if name not in scope.defined:
+                scope.maybe.add(name)
+        else:
+            scope.defined.add(name)
+            scope.maybe.discard(name)
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+
+    def visit_block_stmt(self, stmt):
+        scope = BlockScope()
+        self.scopes.append(scope)
+        try:
+            for statement in stmt.statements:
+                statement.accept(self)
+        finally:
+            self.scopes.pop()
+        stmt.names = scope.names
+
+    def visit_variable_expr(self, expr):
+        expr.symbol = SYMBOLS.intern(expr.name.lexeme)
+        index = self._find(expr.name.lexeme)
+        if index is None:
+            expr.depth, expr.slot = DYNAMIC, None
+        elif index == GLOBAL:
+            expr.depth, expr.slot = GLOBAL, None
+        else:
+            expr.depth = len(self.scopes) - 1 - index
+            expr.slot = self.scopes[index].names[expr.name.lexeme]
+
+    def visit_assignment_expr(self, expr):
+        expr.value.accept(self)
+        name = expr.name.lexeme
+        expr.symbol = SYMBOLS.intern(name)
+
+        if not self.scopes:
+            # top level, assigning and defining are the same dict store
+            expr.depth, expr.slot = GLOBAL, None
+            if self.conditional:
+                self.maybe_globals.add(name)
+            else:
+                self.globals.add(name)
+            return
+
+        current = self.scopes[-1]
+        index = self._find(name)
+        if index is not None and index != GLOBAL:
+            # existing block variable
+            expr.depth = len(self.scopes) - 1 - index
+            expr.slot = self.scopes[index].names[name]
+        elif index == GLOBAL and name in self.globals:
+            expr.depth, expr.slot = GLOBAL, None
+        elif index == GLOBAL and name not in self.maybe_globals:
+            # bound nowhere yet, so this defines it in the current block
+            expr.depth, expr.slot = 0, current.slot(name)
+            self._bind(current, name)
+        else:
+            # may assign an outer binding or define a local, decided at runtime
+            expr.depth, expr.slot = DYNAMIC, None
+            current.slot(name)
+            if name not in current.defined:
+                current.maybe.add(name)
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_logical_expr(self, expr):
+        expr.left.accept(self)
+        # the right operand may be skipped at runtime
+        self.conditional += 1
+        try:
+            expr.right.accept(self)
+        finally:
+            self.conditional -= 1
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+
+    def visit_literal_expr(self, expr):
+        pass
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_invariant_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_call_expr(self, expr):
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+
+    def visit_get_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_set_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_super_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+    def visit_this_expr(self, expr):
+        raise NotImplementedError("not implemented")
+
+
+def _count_frames(node, blocks: List[BlockStmt]):
+    # blocks enclose node, innermost last. Turns block distances into frame distances
+    if isinstance(node, (Variable, Assignment)) and node.depth is not None and node.depth != GLOBAL:
+        target = len(blocks) - 1 - node.depth
+        node.depth = sum(1 for block in blocks[target + 1:] if block.names)
+    block = isinstance(node, BlockStmt)
+    if block:
+        blocks.append(node)
+    for child in children(node):
+        _count_frames(child, blocks)
+    if block:
+        blocks.pop()
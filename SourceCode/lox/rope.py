@@ -0,0 +1,131 @@
+from itertools import islice
+from lox.operators import add
+
+# a string + whose result is at least this long makes a Rope instead of a str
+ROPE_LENGTH = 512
+
+
+class Rope:
+    # a string built by +, held as the pieces that were added together and
+    # joined only when it is used as a string: printed, compared, passed to a
+    # native function or put through any other operator, which all flatten it
+    # and then act on the str. So a loop appending to a variable copies its
+    # characters once instead of on every iteration.
+    #
+    # Ropes never change. One appended to shares its list of pieces with the
+    # result, which covers one piece more. Appending to the same Rope twice
+    # copies its pieces for the second result instead.
+    __slots__ = ("parts", "count", "length")
+
+    def __init__(self, parts: list, count: int, length: int):
+        # parts[:count] are this string's pieces
+        self.parts = parts
+        self.count = count
+        self.length = length
+
+    def append(self, piece: str) -> "Rope":
+        parts = self.parts
+        if len(parts) != self.count:
+            parts = parts[:self.count]
+        parts.append(piece)
+        return Rope(parts, self.count + 1, self.length + len(piece))
+
+    def flatten(self) -> str:
+        if self.count == 1:
+            return self.parts[0]
+        flat = "".join(islice(self.parts, self.count))
+        # later appends start from the joined string, and the pieces can be freed
+        self.parts, self.count = [flat], 1
+        return flat
+
+    def __str__(self):
+        return self.flatten()
+
+    def __repr__(self):
+        return repr(self.flatten())
+
+    def __len__(self):
+        return self.length
+
+    def __hash__(self):
+        return hash(self.flatten())
+
+    # comparisons with anything but a string are left to Python, which raises
+    # a TypeError naming Rope for <, <=, > and >=. Interpreters repeat those
+    # with compare_flattened() to raise the error a str gives instead
+    def __eq__(self, other):
+        return self.flatten() == flatten(other) if type(other) in STRINGS else NotImplemented
+
+    def __ne__(self, other):
+        return self.flatten() != flatten(other) if type(other) in STRINGS else NotImplemented
+
+    def __lt__(self, other):
+        return self.flatten() < flatten(other) if type(other) in STRINGS else NotImplemented
+
+    def __le__(self, other):
+        return self.flatten() <= flatten(other) if type(other) in STRINGS else NotImplemented
+
+    def __gt__(self, other):
+        return self.flatten() > flatten(other) if type(other) in STRINGS else NotImplemented
+
+    def __ge__(self, other):
+        return self.flatten() >= flatten(other) if type(other) in STRINGS else NotImplemented
+
+    def __sub__(self, other):
+        return self.flatten() - flatten(other)
+
+    def __rsub__(self, other):
+        return other - self.flatten()
+
+    def __mul__(self, other):
+        return self.flatten() * flatten(other)
+
+    def __rmul__(self, other):
+        return other * self.flatten()
+
+    def __truediv__(self, other):
+        return self.flatten() / flatten(other)
+
+    def __rtruediv__(self, other):
+        return other / self.flatten()
+
+    def __neg__(self):
+        return -self.flatten()
+
+
+# what a Rope compares with
+STRINGS = (str, Rope)
+
+
+def flatten(value):
+    # value, or the str a Rope stands for
+    return value.flatten() if type(value) is Rope else value
+
+
+def compare_flattened(function, left, right, error: TypeError):
+    # function(left, right) raised error. With a Rope operand that may be
+    # Python refusing to compare it, so function runs again on the strs, which
+    # raises the error plain strings give. Otherwise error is raised as it was
+    if type(left) is Rope or type(right) is Rope:
+        return function(flatten(left), flatten(right))
+    raise error
+
+
+def concatenate(left, right):
+    # add() as the Interpreter runs it: strings that get long become Ropes,
+    # anything else is up to add(). A NumericBinary that saw other operands
+    # calls this from then on, which isn't add, so it won't specialize again
+    if type(left) is Rope:
+        if type(right) is str:
+            return left.append(right)
+        if type(right) is Rope:
+            return left.append(right.flatten())
+    elif type(left) is str:
+        if type(right) is Rope:
+            right = right.flatten()
+        elif type(right) is not str:
+            return add(left, right)
+        if len(left) + len(right) < ROPE_LENGTH:
+            return left + right
+        return Rope([left, right], 2, len(left) + len(right))
+    return add(left, right)
@@ -14,13 +14,23 @@ class StmtVisitor(ABC):
 
 
 class Stmt(ABC):
+    __slots__ = ("line", "column")
+
+    def __init__(self) -> None:
+        # position of the statement's first token, set by the Parser
+        self.line = 0
+        self.column = 0
+
     @abstractmethod
     def accept(self, visitor: StmtVisitor) -> Any:
         pass
 
 
 class Expression(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
+        super().__init__()
         self.expression = expression
 
     def accept(self, visitor: StmtVisitor) -> Any:
@@ -28,7 +38,10 @@ class Expression(Stmt):
 
 
 class Print(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
+        super().__init__()
         self.expression = expression
 
     def accept(self, visitor: StmtVisitor) -> Any:
@@ -36,7 +49,10 @@ class Print(Stmt):
 
 
 class IfStmt(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
     def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Stmt = None):
+        super().__init__()
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
@@ -46,17 +62,29 @@ class IfStmt(Stmt):
 
 
 class WhileStmt(Stmt):
+    __slots__ = ("condition", "body", "invariants", "kernel")
+
     def __init__(self, condition: Expr, body: Stmt):
+        super().__init__()
         self.condition = condition
         self.body = body
+        # size of the cache of Invariant values, filled in by the Optimizer
+        self.invariants = 0
+        # CountedLoop the Vectorizer found this loop to be, if any
+        self.kernel = None
 
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_while_stmt(self)
 
 
 class BlockStmt(Stmt):
+    __slots__ = ("statements", "names")
+
     def __init__(self, statements: List[Stmt]):
+        super().__init__()
         self.statements = statements
+        # slot layout filled in by the Resolver
+        self.names = None
 
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_block_stmt(self)
@@ -0,0 +1,42 @@
+from threading import Lock
+from typing import Dict, List
+
+
+class SymbolTable:
+    # every identifier seen so far, numbered in order of first appearance.
+    #
+    # the Lexer interns identifiers here so tokens share one string per name,
+    # the Resolver gives Variable/Assignment nodes their name's id and
+    # environments key their values on ids.
+    #
+    # nothing is ever removed, ids live as long as the trees and environments
+    # holding them. The table grows by one entry per distinct name, so a host
+    # running scripts with endless fresh names, like generated ones, should
+    # run them in worker processes it replaces now and then.
+    #
+    # lookups of known names take no lock, a new name is added under one. Its
+    # name goes into names before its id into ids, so an id found in ids
+    # always has its name.
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = Lock()
+
+    def intern(self, name: str) -> int:
+        symbol = self.ids.get(name)
+        if symbol is None:
+            with self._lock:
+                symbol = self.ids.get(name)
+                if symbol is None:
+                    self.names.append(name)
+                    symbol = self.ids[name] = len(self.names) - 1
+        return symbol
+
+    def __len__(self):
+        return len(self.names)
+
+
+# shared by the whole process, so ids agree between every lexer, tree and
+# environment. Ids aren't stable across processes and are never pickled:
+# cached trees are stored before the Resolver runs
+SYMBOLS = SymbolTable()
@@ -41,10 +41,15 @@ class TokenType(Enum):
 
 
 class Token:
-    def __init__(self, type: TokenType, lexeme: str, literal: float):
+    __slots__ = ("type", "lexeme", "literal", "line", "column")
+
+    def __init__(self, type: TokenType, lexeme: str, literal: float, line: int = 0, column: int = 0):
         self.type = type
         self.lexeme = lexeme
         self.literal = literal
+        # 1-based position of the token's first character, 0 when made outside the Lexer
+        self.line = line
+        self.column = column
 
     def __repr__(self):
         return f"Token({self.type}, '{self.lexeme}', {self.literal})"
\ No newline at end of file
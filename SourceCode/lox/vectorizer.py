@@ -0,0 +1,306 @@
+from math import comb, isfinite
+from typing import Dict, List, Optional
+from lox.expressions import Assignment, Binary, Grouping, Invariant, Literal, Unary, Variable, children
+from lox.resolver import GLOBAL
+from lox.statements import BlockStmt, Expression, WhileStmt
+from lox.tokens import TokenType
+
+# operators a counted loop body may use, as Python source
+ARITHMETIC = {TokenType.PLUS: "+", TokenType.MINUS: "-", TokenType.MUL: "*", TokenType.DIV: "/"}
+# loop conditions, as Python source
+CONDITIONS = {TokenType.LESS: "<", TokenType.LESS_EQUAL: "<=", TokenType.GREATER: ">", TokenType.GREATER_EQUAL: ">="}
+# a counted loop only runs outside the Interpreter on values of exactly these types
+NUMBER_TYPES = (int, float)
+
+
+class CountedLoop:
+    # a while loop the Vectorizer found to be pure arithmetic stepping one
+    # induction variable towards a bound. The Interpreter hands it the loop
+    # first, and interprets the loop itself if run() returns False.
+    #
+    # run() reads every variable the loop uses, and gives up unless they all
+    # hold ints or floats and the bound is finite. If everything is an int and
+    # every other assignment adds or subtracts a polynomial of the induction
+    # variable, the results come from closed-form sums. Otherwise function, the
+    # loop translated to Python over locals, runs it: the same operations on the
+    # same values in the same order, so ints stay ints and floats round alike.
+    # A run that raises, like one dividing by zero, is redone by the Interpreter,
+    # nothing having been written back.
+    def __init__(self, nodes: List, stores: List[Assignment], bound, operator: TokenType, step, function,
+                 sums: Optional[List]):
+        # Variable or Assignment node to read each of function's arguments from
+        self.nodes = nodes
+        # where each of function's results is written, the induction variable first
+        self.stores = stores
+        # the literal the induction variable, nodes[0], steps towards, or the Variable node among nodes
+        self.bound = bound
+        self.operator = operator
+        self.step = step
+        self.function = function
+        # (argument index, sign, polynomial expression, runs after the step) per
+        # accumulator, in stores order. None without a closed form
+        self.sums = sums
+
+    def run(self, interpreter) -> bool:
+        values = []
+        for node in self.nodes:
+            try:
+                value = interpreter.visit_variable_expr(node)
+            except RuntimeError:
+                return False
+            if type(value) not in NUMBER_TYPES:
+                return False
+            values.append(value)
+        bound = values[self.nodes.index(self.bound)] if isinstance(self.bound, Variable) else self.bound
+        if type(bound) is float and not isfinite(bound):
+            return False
+
+        if self.sums is not None and type(self.step) is int and type(bound) is int \
+                and all(type(value) is int for value in values):
+            results = self._closed_form(values, bound)
+        else:
+            try:
+                results = self.function(*values)
+            except ArithmeticError:
+                return False
+        for node, value in zip(self.stores, results):
+            _store(interpreter, node, value)
+        return True
+
+    def _closed_form(self, values: List[int], bound: int) -> List[int]:
+        start = values[0]
+        count = _iterations(start, bound, self.operator, self.step)
+        results = [start + count * self.step]
+        names = {node.name.lexeme: value for node, value in zip(self.nodes, values)}
+        for index, sign, expr, after_step in self.sums:
+            polynomial = _polynomial(expr, names, self.nodes[0].name.lexeme)
+            first = start + self.step if after_step else start
+            results.append(values[index] + sign * _sum(polynomial, first, self.step, count))
+        return results
+
+
+class Vectorizer:
+    # runs after the Resolver, gives every while loop shaped like
+    #     while (i < n) { s = s + i * i  i = i + 1 }
+    # a CountedLoop: a block defining no variables, holding only assignments
+    # of +, -, *, / and unary - over number literals and variables, one of
+    # them i = i + step or i = i - step, with a literal step going towards n.
+    # n is a number literal or a variable the loop doesn't assign, and the
+    # condition is <, <=, > or >=.
+    def vectorize(self, statements):
+        for stmt in statements:
+            self._visit(stmt)
+        return statements
+
+    def _visit(self, node):
+        if isinstance(node, WhileStmt):
+            node.kernel = self.counted_loop(node)
+        for child in children(node):
+            self._visit(child)
+
+    def counted_loop(self, stmt: WhileStmt) -> Optional[CountedLoop]:
+        condition, body = _unwrap(stmt.condition), stmt.body
+        if not isinstance(body, BlockStmt) or body.names:
+            return None
+        if not all(isinstance(s, Expression) and isinstance(s.expression, Assignment) for s in body.statements):
+            return None
+        assignments = [s.expression for s in body.statements]
+        if not (isinstance(condition, Binary) and condition.operator.type in CONDITIONS
+                and isinstance(condition.left, Variable)):
+            return None
+        name = condition.left.name.lexeme
+        assigned = [assignment.name.lexeme for assignment in assignments]
+        if assigned.count(name) != 1 or any(assignment.depth is None for assignment in assignments):
+            return None
+        step_assignment = assignments[assigned.index(name)]
+        step = _step(step_assignment, name)
+        if step is None or (step > 0) != (condition.operator.type in (TokenType.LESS, TokenType.LESS_EQUAL)):
+            return None
+        bound = _unwrap(condition.right)
+        if isinstance(bound, Variable):
+            if bound.name.lexeme in assigned:
+                return None
+        elif not _is_number(bound):
+            return None
+        if not all(_is_arithmetic(assignment.value) for assignment in assignments):
+            return None
+
+        # arguments: the induction variable, the other assigned variables, then the ones only read
+        nodes: Dict[str, object] = {name: step_assignment}
+        for assignment in assignments:
+            nodes.setdefault(assignment.name.lexeme, assignment)
+        reads = [condition.left, bound] + [node for assignment in assignments for node in _walk(assignment.value)]
+        for node in reads:
+            if isinstance(node, Variable):
+                nodes.setdefault(node.name.lexeme, node)
+        locals_ = {variable: f"v{index}" for index, variable in enumerate(nodes)}
+        stores = list(dict.fromkeys([name] + assigned))
+
+        bound_source = locals_[bound.name.lexeme] if isinstance(bound, Variable) else repr(bound.value)
+        lines = [f"def loop({', '.join(locals_.values())}):",
+                 f"    while {locals_[name]} {CONDITIONS[condition.operator.type]} {bound_source}:"]
+        for assignment in assignments:
+            lines.append(f"        {locals_[assignment.name.lexeme]} = {_source(assignment.value, locals_)}")
+        lines.append(f"    return {', '.join(locals_[variable] for variable in stores)},")
+        namespace = {}
+        exec(compile("\n".join(lines), "<counted loop>", "exec"), namespace)
+
+        return CountedLoop(list(nodes.values()), [nodes[variable] for variable in stores],
+                           nodes[bound.name.lexeme] if isinstance(bound, Variable) else bound.value,
+                           condition.operator.type, step, namespace["loop"],
+                           self._sums(assignments, name, assigned, list(nodes)))
+
+    def _sums(self, assignments, name: str, assigned: List[str], arguments: List[str]) -> Optional[List]:
+        # the closed form's accumulators, s = s + p(i), s = p(i) + s or s = s - p(i)
+        if len(set(assigned)) != len(assigned):
+            return None
+        sums, after_step = [], False
+        for assignment in assignments:
+            variable, value = assignment.name.lexeme, _unwrap(assignment.value)
+            if variable == name:
+                after_step = True
+                continue
+            if not (isinstance(value, Binary) and value.operator.type in (TokenType.PLUS, TokenType.MINUS)):
+                return None
+            if _is_variable(value.left, variable):
+                sign, expr = (1 if value.operator.type == TokenType.PLUS else -1), value.right
+            elif value.operator.type == TokenType.PLUS and _is_variable(value.right, variable):
+                sign, expr = 1, value.left
+            else:
+                return None
+            if any(isinstance(node, Variable) and node.name.lexeme in assigned and node.name.lexeme != name
+                   for node in _walk(expr)):
+                return None
+            if any(isinstance(node, Binary) and node.operator.type == TokenType.DIV
+                   or isinstance(node, Literal) and type(node.value) is not int for node in _walk(expr)):
+                return None
+            sums.append((arguments.index(variable), sign, expr, after_step))
+        return sums
+
+
+def _unwrap(expr):
+    while isinstance(expr, (Grouping, Invariant)):
+        expr = expr.expression
+    return expr
+
+
+def _walk(expr):
+    # expr and every expression under it
+    yield expr
+    for child in children(expr):
+        yield from _walk(child)
+
+
+def _is_number(expr) -> bool:
+    return isinstance(expr, Literal) and type(expr.value) in NUMBER_TYPES
+
+
+def _is_variable(expr, name: str) -> bool:
+    expr = _unwrap(expr)
+    return isinstance(expr, Variable) and expr.name.lexeme == name
+
+
+def _is_arithmetic(expr) -> bool:
+    expr = _unwrap(expr)
+    if isinstance(expr, Binary):
+        return expr.operator.type in ARITHMETIC and _is_arithmetic(expr.left) and _is_arithmetic(expr.right)
+    if isinstance(expr, Unary):
+        return expr.operator.type == TokenType.MINUS and _is_arithmetic(expr.right)
+    return isinstance(expr, Variable) or _is_number(expr)
+
+
+def _step(assignment: Assignment, name: str):
+    # the non-zero literal i = i + step adds, or None
+    value = _unwrap(assignment.value)
+    if not isinstance(value, Binary):
+        return None
+    if value.operator.type == TokenType.PLUS:
+        if _is_variable(value.left, name) and _is_number(_unwrap(value.right)):
+            step = _unwrap(value.right).value
+        elif _is_variable(value.right, name) and _is_number(_unwrap(value.left)):
+            step = _unwrap(value.left).value
+        else:
+            return None
+    elif value.operator.type == TokenType.MINUS and _is_variable(value.left, name) and _is_number(_unwrap(value.right)):
+        step = -_unwrap(value.right).value
+    else:
+        return None
+    return step if step != 0 and isfinite(step) else None
+
+
+def _source(expr, locals_: Dict[str, str]) -> str:
+    expr = _unwrap(expr)
+    if isinstance(expr, Binary):
+        return f"({_source(expr.left, locals_)} {ARITHMETIC[expr.operator.type]} {_source(expr.right, locals_)})"
+    if isinstance(expr, Unary):
+        return f"(-{_source(expr.right, locals_)})"
+    if isinstance(expr, Variable):
+        return locals_[expr.name.lexeme]
+    return f"({expr.value!r})"
+
+
+def _store(interpreter, node: Assignment, value):
+    # visit_assignment_expr's store, for a node the Resolver bound statically
+    depth = node.depth
+    if depth == GLOBAL:
+        interpreter.globals.values[node.symbol] = value
+        return
+    environment = interpreter.environment
+    while depth:
+        environment = environment.parent
+        depth -= 1
+    environment.values[node.slot] = value
+
+
+def _iterations(start: int, bound: int, operator: TokenType, step: int) -> int:
+    # how many times the condition holds, counting from start in steps
+    if operator in (TokenType.GREATER, TokenType.GREATER_EQUAL):
+        start, bound, step = -start, -bound, -step
+    if operator in (TokenType.LESS, TokenType.GREATER):
+        return max(0, -((start - bound) // step))
+    return max(0, (bound - start) // step + 1)
+
+
+def _polynomial(expr, values: Dict[str, int], induction: str) -> List[int]:
+    # coefficients of expr as a polynomial of the induction variable, lowest power first
+    expr = _unwrap(expr)
+    if isinstance(expr, Literal):
+        return [expr.value]
+    if isinstance(expr, Variable):
+        return [0, 1] if expr.name.lexeme == induction else [values[expr.name.lexeme]]
+    if isinstance(expr, Unary):
+        return [-c for c in _polynomial(expr.right, values, induction)]
+    left = _polynomial(expr.left, values, induction)
+    right = _polynomial(expr.right, values, induction)
+    if expr.operator.type == TokenType.MUL:
+        product = [0] * (len(left) + len(right) - 1)
+        for i, a in enumerate(left):
+            for j, b in enumerate(right):
+                product[i + j] += a * b
+        return product
+    if expr.operator.type == TokenType.MINUS:
+        right = [-c for c in right]
+    total = [0] * max(len(left), len(right))
+    for i, c in enumerate(left):
+        total[i] += c
+    for i, c in enumerate(right):
+        total[i] += c
+    return total
+
+
+def _sum(polynomial: List[int], first: int, step: int, count: int) -> int:
+    # polynomial(first) + polynomial(first + step) + ... over count terms
+    degree = len(polynomial) - 1
+    # the polynomial of k that polynomial(first + step * k) is
+    shifted = [sum(polynomial[d] * comb(d, j) * first ** (d - j) for d in range(j, degree + 1)) * step ** j
+               for j in range(degree + 1)]
+    return sum(c * s for c, s in zip(shifted, _power_sums(degree, count)))
+
+
+def _power_sums(degree: int, count: int) -> List[int]:
+    # 0^j + 1^j + ... + (count - 1)^j for j up to degree, from
+    # count^(j+1) = sum of C(j+1, i) * (the sum for i) over i <= j
+    sums = []
+    for j in range(degree + 1):
+        sums.append((count ** (j + 1) - sum(comb(j + 1, i) * sums[i] for i in range(j))) // (j + 1))
+    return sums
@@ -0,0 +1,156 @@
+import operator
+from lox.bytecode import (
+    Chunk, OP_CONSTANT, OP_GET, OP_SET, OP_POP, OP_PRINT, OP_ADD, OP_SUBTRACT, OP_MULTIPLY, OP_DIVIDE,
+    OP_EQUAL, OP_NOT_EQUAL, OP_LESS, OP_LESS_EQUAL, OP_GREATER, OP_GREATER_EQUAL, OP_AND, OP_OR,
+    OP_NEGATE, OP_NOT, OP_JUMP, OP_JUMP_IF_FALSE, OP_JUMP_IF_TRUE_OR_POP, OP_JUMP_IF_FALSE_OR_POP,
+    OP_CALL, OP_PUSH_SCOPE, OP_POP_SCOPE, OP_STORE, OP_JUMP_IF_TRUE, OP_GET_GLOBAL, OP_SET_GLOBAL,
+    OP_STORE_GLOBAL, OP_GET_LOCAL, OP_SET_LOCAL, OP_STORE_LOCAL,
+)
+from lox.interpreter import NAMES, Runner
+
+# binary opcodes that are exactly their Python operator
+BINARY_FUNCTIONS = {
+    OP_SUBTRACT: operator.sub, OP_MULTIPLY: operator.mul, OP_DIVIDE: operator.truediv,
+    OP_LESS: operator.lt, OP_LESS_EQUAL: operator.le, OP_GREATER: operator.gt, OP_GREATER_EQUAL: operator.ge,
+    OP_EQUAL: operator.eq, OP_NOT_EQUAL: operator.ne,
+}
+# exact types add() takes for numbers, bool is an int there too
+NUMBERS = frozenset((int, float, bool))
+
+
+class VM(Runner):
+    # stack machine running a compiled Chunk, mirrors Interpreter output exactly
+    def run(self, chunk: Chunk):
+        instructions = chunk.instructions()
+        scopes = chunk.scopes
+        block_scope = self._block_scope
+        # frames are keyed on scope index, which another chunk numbers differently
+        self.frames.clear()
+        global_values = self.globals.values
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        write = self.output.write
+        environment = self.environment
+        ip = 0
+
+        # opcodes as locals, global lookups dominate the dispatch otherwise
+        get_local, store_local, get_global, store_global, constant = (
+            OP_GET_LOCAL, OP_STORE_LOCAL, OP_GET_GLOBAL, OP_STORE_GLOBAL, OP_CONSTANT)
+        add, jump_if_true, jump_if_false, jump, push_scope, pop_scope = (
+            OP_ADD, OP_JUMP_IF_TRUE, OP_JUMP_IF_FALSE, OP_JUMP, OP_PUSH_SCOPE, OP_POP_SCOPE)
+        # every other binary opcode is one table lookup, then one branch
+        binary = BINARY_FUNCTIONS
+
+        try:
+            while True:
+                op, operand = instructions[ip]
+                ip += 1
+
+                # most frequent opcodes first
+                if op == get_global:
+                    try:
+                        push(global_values[operand])
+                    except KeyError:
+                        raise RuntimeError(f"Undefined variable '{NAMES[operand]}'.") from None
+                elif op == constant:
+                    push(operand)
+                elif op == get_local:
+                    depth, slot = operand
+                    scope = environment
+                    while depth:
+                        scope = scope.parent
+                        depth -= 1
+                    push(scope.values[slot])
+                elif op in binary:
+                    right = pop()
+                    stack[-1] = binary[op](stack[-1], right)
+                elif op == add:
+                    right = pop()
+                    left = stack[-1]
+                    if type(left) in NUMBERS and type(right) in NUMBERS:
+                        stack[-1] = left + right
+                    elif isinstance(left, str) and isinstance(right, str):
+                        stack[-1] = left + right
+                    else:
+                        raise RuntimeError("Operands must be two numbers or two strings")
+                elif op == store_global:
+                    global_values[operand] = pop()
+                elif op == store_local:
+                    depth, slot = operand
+                    scope = environment
+                    while depth:
+                        scope = scope.parent
+                        depth -= 1
+                    scope.values[slot] = pop()
+                elif op == jump_if_true:
+                    value = pop()
+                    if value is not None and value is not False:
+                        ip = operand
+                elif op == jump_if_false:
+                    value = pop()
+                    if value is None or value is False:
+                        ip = operand
+                elif op == jump:
+                    ip = operand
+                elif op == push_scope:
+                    environment = block_scope(operand, scopes[operand], environment)
+                elif op == pop_scope:
+                    environment = environment.parent
+                elif op == OP_SET_LOCAL:
+                    depth, slot = operand
+                    scope = environment
+                    while depth:
+                        scope = scope.parent
+                        depth -= 1
+                    scope.values[slot] = stack[-1]
+                elif op == OP_SET_GLOBAL:
+                    global_values[operand] = stack[-1]
+                elif op == OP_GET:
+                    push(environment.get(operand))
+                elif op == OP_STORE:
+                    environment.assign_or_define(operand, pop())
+                elif op == OP_SET:
+                    environment.assign_or_define(operand, stack[-1])
+                elif op == OP_POP:
+                    pop()
+                elif op == OP_PRINT:
+                    write(pop())
+                elif op == OP_AND:
+                    right = pop()
+                    stack[-1] = stack[-1] and right
+                elif op == OP_OR:
+                    right = pop()
+                    stack[-1] = stack[-1] or right
+                elif op == OP_NEGATE:
+                    stack[-1] = -stack[-1]
+                elif op == OP_NOT:
+                    stack[-1] = not stack[-1]
+                elif op == OP_JUMP_IF_TRUE_OR_POP:
+                    value = stack[-1]
+                    if value is None or value is False:
+                        pop()
+                    else:
+                        ip = operand
+                elif op == OP_JUMP_IF_FALSE_OR_POP:
+                    value = stack[-1]
+                    if value is None or value is False:
+                        ip = operand
+                    else:
+                        pop()
+                elif op == OP_CALL:
+                    arguments = stack[len(stack) - operand:]
+                    del stack[len(stack) - operand:]
+                    callee = pop()
+                    if callable(callee):
+                        push(callee(*arguments))
+                    else:
+                        raise RuntimeError("Can only call functions")
+                elif op is None:
+                    # the end of the code, see Chunk.instructions
+                    break
+                else:
+                    raise RuntimeError(f"Unknown opcode {op}")
+        finally:
+            self.environment = self.globals
+            self.output.flush()
@@ -0,0 +1,10 @@
+from lox.interpreter import Interpreter
+from lox.lexer import Lexer
+from lox.parser import Parser
+from lox.resolver import Resolver
+
+
+def parse(source):
+    # statements ready for an Interpreter
+    statements = Parser(Lexer(source).tokenize()).parse()
+    return Resolver(Interpreter().globals.names()).resolve(statements)
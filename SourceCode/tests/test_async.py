@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+
+from lox.output import ListWriter
+from lox.program import Program
+
+READ_THREE = """
+total = 0
+i = 0
+while (i < 3) {
+    total = total + input("> ")
+    i = i + 1
+}
+print total
+"""
+
+SCRIPTS = 20
+# seconds each input() takes to answer
+DELAY = 0.05
+
+
+def slow_input(value):
+    # an input() answering value after DELAY
+    async def read(prompt):
+        await asyncio.sleep(DELAY)
+        return value
+    return read
+
+
+def run_all(program, inputs):
+    outputs = [ListWriter() for _ in inputs]
+
+    async def gather():
+        return await asyncio.gather(*(
+            program.run_async({"input": read}, output) for read, output in zip(inputs, outputs)))
+
+    return asyncio.run(gather()), outputs
+
+
+def test_slow_inputs_run_concurrently():
+    program = Program(READ_THREE)
+    start = time.perf_counter()
+    results, outputs = run_all(program, [slow_input(number) for number in range(SCRIPTS)])
+    elapsed = time.perf_counter() - start
+    # one after another this would take SCRIPTS * 3 * DELAY = 3 s
+    assert elapsed < SCRIPTS * 3 * DELAY / 4
+    assert [output.lines for output in outputs] == [[str(number * 3)] for number in range(SCRIPTS)]
+    assert [result["total"] for result in results] == [number * 3 for number in range(SCRIPTS)]
+
+
+def test_natives_may_return_an_awaitable():
+    def later(value):
+        return asyncio.sleep(0, result=value * 2)
+
+    program = Program("x = later(21) + 1\nprint x", natives={"later": later})
+    results, outputs = run_all(program, [slow_input(0)])
+    assert outputs[0].lines == ["43"]
+    assert results[0]["x"] == 43
+
+
+def test_plain_natives_and_call_free_code():
+    source = "i = 0\nwhile (i < 100) {\n    i = i + 1\n}\nif (i == 100 and twice(i) == 200) {\n    print i\n}"
+    program = Program(source, natives={"twice": lambda value: value * 2})
+    _, outputs = run_all(program, [slow_input(0)])
+    assert outputs[0].lines == ["100"]
+
+
+def test_errors_reach_the_caller():
+    program = Program('x = input("> ") + "a"')
+    with pytest.raises(RuntimeError, match="Operands must be two numbers or two strings"):
+        run_all(program, [slow_input(1)])
+
+
+def test_run_async_needs_the_interpreter_backend():
+    with pytest.raises(ValueError):
+        asyncio.run(Program("print 1", backend="vm").run_async())
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import pickle
+
+import pytest
+
+import lox.program
+from lox.cache import MAGIC, ProgramCache, interpreter_version
+from lox.lexer import Lexer
+from lox.output import ListWriter
+from lox.parser import Parser
+from lox.program import Program
+
+SOURCE = 'a = 1\nwhile (a < 10) {\n    a = a * 2 + 1\n}\nprint a == 15 and "yes" or "no"\nprint -a'
+
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+class Planted:
+    # unpickling this would create a directory
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return os.mkdir, (self.path,)
+
+
+def plant(cache, source, payload, version=None):
+    # an entry whose header checks out, as anyone who can write to the directory could make
+    source_digest = hashlib.sha256(source.encode()).digest()
+    path = cache._path(source_digest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    version = interpreter_version() if version is None else version
+    path.write_bytes(MAGIC + version + source_digest + hashlib.sha256(payload).digest() + payload)
+    return path
+
+
+@pytest.fixture
+def lexed(monkeypatch):
+    # the sources Program lexes, a warm load lexes and parses nothing
+    sources = []
+
+    class CountingLexer(Lexer):
+        def tokenize(self):
+            sources.append(self.source)
+            return super().tokenize()
+
+    monkeypatch.setattr(lox.program, "Lexer", CountingLexer)
+    return sources
+
+
+def run(source, cache):
+    output = ListWriter()
+    Program(source, cache=cache).run(output=output)
+    return output.lines
+
+
+def test_round_trip(tmp_path):
+    cache = ProgramCache(tmp_path)
+    assert cache.load(SOURCE) is None
+    cache.store(SOURCE, parse(SOURCE))
+    statements = cache.load(SOURCE)
+    assert pickle.dumps(statements) == pickle.dumps(parse(SOURCE))
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    cache = ProgramCache(tmp_path)
+    cache.store(SOURCE, parse(SOURCE))
+    (entry,) = tmp_path.glob("*.pickle")
+    entry.write_bytes(entry.read_bytes()[:-1] + b"!")
+    assert cache.load(SOURCE) is None
+    assert not entry.exists()
+
+
+def test_planted_entry_runs_no_code(tmp_path):
+    cache = ProgramCache(tmp_path / "cache")
+    marker = tmp_path / "marker"
+    path = plant(cache, SOURCE, pickle.dumps(Planted(str(marker))))
+    assert cache.load(SOURCE) is None
+    assert not marker.exists()
+    assert not path.exists()
+
+
+def test_planted_entry_using_allowed_classes_only_gets_a_tree(tmp_path):
+    cache = ProgramCache(tmp_path)
+    plant(cache, SOURCE, pickle.dumps(parse("print 2")))
+    statements = cache.load(SOURCE)
+    assert pickle.dumps(statements) == pickle.dumps(parse("print 2"))
+
+
+def test_warm_load_skips_lexing_and_parsing(tmp_path, lexed):
+    cache = ProgramCache(tmp_path)
+    cold = run(SOURCE, cache)
+    assert lexed == [SOURCE]
+    warm = run(SOURCE, cache)
+    assert lexed == [SOURCE]
+    assert warm == cold == ["yes", "-15"]
+
+
+@pytest.mark.parametrize("damage", ["corrupt", "stale", "truncated"])
+def test_bad_entry_falls_back_to_a_cold_parse(tmp_path, lexed, damage):
+    cache = ProgramCache(tmp_path)
+    payload = pickle.dumps(parse("print 2"))
+    if damage == "stale":
+        # written by an interpreter that may parse differently
+        path = plant(cache, SOURCE, payload, version=bytes(len(interpreter_version())))
+    else:
+        path = plant(cache, SOURCE, payload)
+        data = path.read_bytes()
+        path.write_bytes(data[:-1] + b"!" if damage == "corrupt" else data[:len(MAGIC) + 10])
+    assert run(SOURCE, cache) == ["yes", "-15"]
+    assert lexed == [SOURCE]
+    # the fresh parse replaced the entry
+    assert run(SOURCE, cache) == ["yes", "-15"]
+    assert lexed == [SOURCE]
+
+
+def test_oldest_entries_are_evicted(tmp_path):
+    sources = [f"print {number}" for number in range(4)]
+    sizes = []
+    for source in sources[:3]:
+        ProgramCache(tmp_path).store(source, parse(source))
+        sizes.append(sum(entry.stat().st_size for entry in tmp_path.glob("*.pickle")))
+    entries = {source: ProgramCache(tmp_path)._path(hashlib.sha256(source.encode()).digest()) for source in sources}
+    for age, source in enumerate(sources[:3]):
+        os.utime(entries[source], (1000000 + age, 1000000 + age))
+    # loading the oldest makes it the newest
+    cache = ProgramCache(tmp_path, max_bytes=sizes[-1])
+    assert cache.load(sources[0]) is not None
+    cache.store(sources[3], parse(sources[3]))
+    assert not entries[sources[1]].exists()
+    assert all(entries[source].exists() for source in (sources[0], sources[2], sources[3]))
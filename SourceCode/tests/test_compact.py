@@ -0,0 +1,27 @@
+import pytest
+
+from lox.compact import CompactEncoder
+from lox.output import ListWriter
+from lox.program import Program
+from tests.common import parse
+
+
+def run(source, optimize=False):
+    output = ListWriter()
+    Program(source, backend="compact", optimize=optimize).run(output=output)
+    return output.lines
+
+
+@pytest.mark.parametrize("source", ["print 0.0\nprint -0.0 * 1.0", "print -0.0 * 1.0\nprint 0.0"])
+def test_signed_zeros_are_separate_constants(source):
+    # optimize folds -0.0 * 1.0 into a -0.0 literal
+    assert sorted(run(source, optimize=True)) == ["-0.0", "0.0"]
+
+
+def test_equal_constants_of_different_types_are_kept_apart():
+    assert run("print 1\nprint 1.0\nprint true") == ["1", "1.0", "True"]
+
+
+def test_equal_constants_share_a_slot():
+    program = CompactEncoder().encode(parse('a = 1\nb = 1\nc = "x"\nd = "x"'))
+    assert program.constants == [1, "x"]
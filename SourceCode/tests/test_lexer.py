@@ -0,0 +1,156 @@
+import io
+
+import pytest
+
+from lox.lexer import Lexer, LexerError
+from lox.tokens import TokenType
+
+SAMPLE = """total = 0
+i = 1.5
+while (i <= 10 and !done) {
+    total = total + i * 2 – 3 / 4
+    if (total >= 100 or i != 7) {
+        print "big: " + name
+    } else {
+        x = input("> ")
+    }
+    i = i + 1
+}
+print total == 12.25
+"""
+
+# SAMPLE as the character-by-character lexer the regex one replaced read it,
+# quirks included: = and the comparisons take the next character as lexeme
+OLD_TOKENS = [
+    (TokenType.IDENTIFIER, 'total', 'total'),
+    (TokenType.EQUAL, ' ', None),
+    (TokenType.NUMBER, '0', 0),
+    (TokenType.IDENTIFIER, 'i', 'i'),
+    (TokenType.EQUAL, ' ', None),
+    (TokenType.NUMBER, '1.5', 1.5),
+    (TokenType.WHILE, 'while', 'while'),
+    (TokenType.LPAREN, '(', None),
+    (TokenType.IDENTIFIER, 'i', 'i'),
+    (TokenType.LESS_EQUAL, ' ', None),
+    (TokenType.NUMBER, '10', 10),
+    (TokenType.AND, 'and', 'and'),
+    (TokenType.BANG, 'd', None),
+    (TokenType.IDENTIFIER, 'done', 'done'),
+    (TokenType.RPAREN, ')', None),
+    (TokenType.LBRACE, '{', None),
+    (TokenType.IDENTIFIER, 'total', 'total'),
+    (TokenType.EQUAL, ' ', None),
+    (TokenType.IDENTIFIER, 'total', 'total'),
+    (TokenType.PLUS, '+', None),
+    (TokenType.IDENTIFIER, 'i', 'i'),
+    (TokenType.MUL, '*', None),
+    (TokenType.NUMBER, '2', 2),
+    (TokenType.MINUS, '–', None),
+    (TokenType.NUMBER, '3', 3),
+    (TokenType.DIV, '/', None),
+    (TokenType.NUMBER, '4', 4),
+    (TokenType.IF, 'if', 'if'),
+    (TokenType.LPAREN, '(', None),
+    (TokenType.IDENTIFIER, 'total', 'total'),
+    (TokenType.GREATER_EQUAL, ' ', None),
+    (TokenType.NUMBER, '100', 100),
+    (TokenType.OR, 'or', 'or'),
+    (TokenType.IDENTIFIER, 'i', 'i'),
+    (TokenType.BANG_EQUAL, ' ', None),
+    (TokenType.NUMBER, '7', 7),
+    (TokenType.RPAREN, ')', None),
+    (TokenType.LBRACE, '{', None),
+    (TokenType.PRINT, 'print', 'print'),
+    (TokenType.STRING, '"big: "', 'big: '),
+    (TokenType.PLUS, '+', None),
+    (TokenType.IDENTIFIER, 'name', 'name'),
+    (TokenType.RBRACE, '}', None),
+    (TokenType.ELSE, 'else', 'else'),
+    (TokenType.LBRACE, '{', None),
+    (TokenType.IDENTIFIER, 'x', 'x'),
+    (TokenType.EQUAL, ' ', None),
+    (TokenType.INPUT, 'input', 'input'),
+    (TokenType.LPAREN, '(', None),
+    (TokenType.STRING, '"> "', '> '),
+    (TokenType.RPAREN, ')', None),
+    (TokenType.RBRACE, '}', None),
+    (TokenType.IDENTIFIER, 'i', 'i'),
+    (TokenType.EQUAL, ' ', None),
+    (TokenType.IDENTIFIER, 'i', 'i'),
+    (TokenType.PLUS, '+', None),
+    (TokenType.NUMBER, '1', 1),
+    (TokenType.RBRACE, '}', None),
+    (TokenType.PRINT, 'print', 'print'),
+    (TokenType.IDENTIFIER, 'total', 'total'),
+    (TokenType.EQUAL_EQUAL, ' ', None),
+    (TokenType.NUMBER, '12.25', 12.25),
+    (TokenType.EOF, '', None),
+]
+
+
+def tokens(source):
+    return [(token.type, token.lexeme, token.literal) for token in Lexer(source).tokenize()]
+
+
+def test_same_tokens_as_the_old_lexer():
+    assert tokens(SAMPLE) == OLD_TOKENS
+    # 1 == 1.0, so the golden list alone doesn't tell them apart
+    literals = [token.literal for token in Lexer(SAMPLE).tokenize() if token.type == TokenType.NUMBER]
+    assert [type(literal) for literal in literals] == [int, float, int, int, int, int, int, int, int, float]
+
+
+def test_positions():
+    positions = [(token.lexeme, token.line, token.column) for token in Lexer(SAMPLE).tokenize()[16:21]]
+    assert positions == [("total", 4, 5), (" ", 4, 11), ("total", 4, 13), ("+", 4, 19), ("i", 4, 21)]
+
+
+@pytest.mark.parametrize("source, message, line, column", [
+    ('print 1\nx = "never\nclosed\nprint 2', "Unterminated string literal", 2, 5),
+    ("a = 1\n  b = 2.", "Invalid number: '2.'", 2, 7),
+    ("a = 1\nb = @", "Unexpected character: @", 2, 5),
+])
+def test_error_positions(source, message, line, column):
+    with pytest.raises(LexerError, match=message) as error:
+        Lexer(source).tokenize()
+    assert (error.value.line, error.value.column) == (line, column)
+
+
+def positioned(lexer):
+    return [(token.type, token.lexeme, token.literal, token.line, token.column) for token in lexer.tokenize()]
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 24))
+def test_tokens_straddling_chunks(chunk_size):
+    # chunks of 1 split every longer token, larger ones move the boundaries around
+    expected = positioned(Lexer(SAMPLE))
+    assert positioned(Lexer(io.StringIO(SAMPLE), chunk_size=chunk_size)) == expected
+    chunks = [SAMPLE[start:start + chunk_size] for start in range(0, len(SAMPLE), chunk_size)]
+    assert positioned(Lexer(chunks)) == expected
+
+
+def test_characters_straddling_reads():
+    source = 'café = "naïve – ok"\nprint café'
+    # one byte per read splits every multibyte character
+    assert positioned(Lexer(io.BytesIO(source.encode("utf-8")), chunk_size=1)) == positioned(Lexer(source))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 8])
+def test_error_positions_in_chunks(chunk_size):
+    with pytest.raises(LexerError, match="Unterminated string literal") as error:
+        Lexer(io.StringIO('print 1\nx = "never\nclosed\nprint 2'), chunk_size=chunk_size).tokenize()
+    assert (error.value.line, error.value.column) == (2, 5)
+
+
+def test_hash_inside_a_string():
+    assert tokens('print "a # b"') == [
+        (TokenType.PRINT, "print", "print"), (TokenType.STRING, '"a # b"', "a # b"), (TokenType.EOF, "", None)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64])
+def test_comment_on_the_last_line(chunk_size):
+    # no newline after the comment
+    source = "x = 1 # one\n# a whole line\nprint x # done"
+    expected = [(TokenType.IDENTIFIER, "x", 1, 1), (TokenType.EQUAL, " ", 1, 3), (TokenType.NUMBER, "1", 1, 5),
+                (TokenType.PRINT, "print", 3, 1), (TokenType.IDENTIFIER, "x", 3, 7), (TokenType.EOF, "", 3, 15)]
+    for lexer in (Lexer(source), Lexer(io.StringIO(source), chunk_size=chunk_size)):
+        assert [(token.type, token.lexeme, token.line, token.column) for token in lexer.tokenize()] == expected
@@ -0,0 +1,157 @@
+import time
+import tracemalloc
+
+import pytest
+
+from lox.limits import CHECK_INTERVAL, LimitedInterpreter, LimitExceeded, Limits
+from lox.optimizer import Optimizer
+from lox.output import ListWriter
+from lox.program import Program
+from lox.symbols import SYMBOLS
+from tests.common import parse
+
+FOREVER = """
+i = 0
+while (true) {
+    i = i + 1
+}
+"""
+
+
+def limited(source, limits):
+    # the interpreter after the LimitExceeded the run has to end with
+    interpreter = LimitedInterpreter(limits, ListWriter())
+    with pytest.raises(LimitExceeded) as error:
+        interpreter.interpret(parse(source))
+    return interpreter, str(error.value)
+
+
+@pytest.mark.parametrize("max_steps", [0, 1, 2, CHECK_INTERVAL - 1, CHECK_INTERVAL, CHECK_INTERVAL + 1, 100000])
+def test_step_limit_is_exact(max_steps):
+    interpreter, message = limited(FOREVER, Limits(max_steps=max_steps))
+    assert interpreter.steps == max_steps
+    assert message == f"Step limit of {max_steps} exceeded."
+
+
+def test_script_within_the_step_limit_runs():
+    source = "i = 0\nwhile (i < 3) {\n    i = i + 1\n}\nprint i"
+    interpreter = LimitedInterpreter(Limits(max_steps=100), ListWriter())
+    interpreter.interpret(parse(source))
+    assert interpreter.output.lines == ["3"]
+
+
+def test_step_count_starts_over_with_every_run():
+    interpreter = LimitedInterpreter(Limits(max_steps=5), ListWriter())
+    statements = parse("a = 1\nb = 2\nc = 3")
+    interpreter.interpret(statements)
+    interpreter.interpret(statements)
+    assert interpreter.steps == 3
+
+
+def test_empty_strings_fit_a_zero_limit():
+    interpreter = LimitedInterpreter(Limits(max_string=0), ListWriter())
+    interpreter.interpret(parse('s = "" + ""\nt = s * 5\nprint t == ""'))
+    assert interpreter.output.lines == ["True"]
+    with pytest.raises(LimitExceeded, match="String of 1 characters exceeds the limit of 0."):
+        interpreter.interpret(parse('s = "" + "a"'))
+
+
+def test_timeout():
+    _, message = limited(FOREVER, Limits(timeout=0.05))
+    assert message == "Timeout of 0.05 seconds exceeded."
+
+
+def test_timeout_with_statements_getting_slower():
+    # every squaring takes about three times as long as the one before, so
+    # CHECK_INTERVAL of them are never reached
+    start = time.perf_counter()
+    _, message = limited("x = 3\nwhile (true) {\n    x = x * x\n}", Limits(timeout=0.2))
+    assert message == "Timeout of 0.2 seconds exceeded."
+    assert time.perf_counter() - start < 2
+
+
+@pytest.mark.parametrize("limits", [Limits(timeout=0.05), Limits(max_steps=5000)])
+def test_steps_are_the_statements_that_ran(limits):
+    # i = 0 and the while, then the body block and its statement per iteration.
+    # A timeout may stop the run inside the block, before its statement
+    interpreter, _ = limited(FOREVER, limits)
+    iterations = interpreter.globals.get(SYMBOLS.intern("i"))
+    assert interpreter.steps - (2 + 2 * iterations) in ((0, 1) if limits.timeout else (0,))
+
+
+def test_string_limit_on_plus():
+    _, message = limited('s = "abcd"\ns = s + s\ns = s + s', Limits(max_string=10))
+    assert message == "String of 16 characters exceeds the limit of 10."
+
+
+def test_string_at_the_limit_is_allowed():
+    interpreter = LimitedInterpreter(Limits(max_string=8), ListWriter())
+    interpreter.interpret(parse('s = "abcd"\nprint s + s'))
+    assert interpreter.output.lines == ["abcdabcd"]
+
+
+@pytest.mark.parametrize("expression", ['"abcd" * 100000000', '100000000 * "abcd"'])
+def test_string_limit_on_times_allocates_nothing(expression):
+    tracemalloc.start()
+    try:
+        _, message = limited(f"s = {expression}", Limits(max_string=100))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert message == "String of 400000000 characters exceeds the limit of 100."
+    assert peak < 1024 * 1024
+
+
+def test_string_limit_on_a_multiplier_too_large_to_allocate():
+    _, message = limited('s = "ab" * 1000000000000000', Limits(max_string=100))
+    assert message == "String of 2000000000000000 characters exceeds the limit of 100."
+
+
+def test_string_limit_on_a_rope():
+    source = 's = ""\ni = 0\nwhile (true) {\n    s = s + "abcdefghij"\n    i = i + 1\n}'
+    _, message = limited(source, Limits(max_string=5000))
+    assert message == "String of 5010 characters exceeds the limit of 5000."
+
+
+def test_other_errors_are_unchanged():
+    interpreter = LimitedInterpreter(Limits(max_string=100), ListWriter())
+    with pytest.raises(RuntimeError, match="Operands must be two numbers or two strings"):
+        interpreter.interpret(parse('s = "a" + 1'))
+    with pytest.raises(TypeError, match="can't multiply sequence by non-int of type 'float'"):
+        interpreter.interpret(parse('s = "a" * 1.5'))
+
+
+def test_program_limits():
+    program = Program(FOREVER)
+    with pytest.raises(LimitExceeded):
+        program.run(output=ListWriter(), limits=Limits(max_steps=1000))
+    with pytest.raises(ValueError):
+        Program(FOREVER, backend="vm").run(limits=Limits(max_steps=1000))
+
+
+@pytest.mark.parametrize("expression", ['"ab" * 100000000', '"abcdef" + "abcdef"'])
+def test_optimizer_keeps_strings_over_the_limit_for_the_run(expression):
+    statements = Optimizer(limits=Limits(max_string=10)).optimize(parse(f"print {expression}"))
+    interpreter = LimitedInterpreter(Limits(max_string=10), ListWriter())
+    with pytest.raises(LimitExceeded, match="exceeds the limit of 10"):
+        interpreter.interpret(statements)
+
+
+def test_optimizer_folds_strings_within_the_limit():
+    statements = Optimizer(limits=Limits(max_string=10)).optimize(parse('print "ab" * 5'))
+    assert statements[0].expression.value == "ababababab"
+
+
+def test_optimized_program_limits():
+    program = Program('print "ab" * 100000000', optimize=True, limits=Limits(max_string=10))
+    with pytest.raises(LimitExceeded, match="String of 200000000 characters exceeds the limit of 10."):
+        program.run(output=ListWriter())
+    # folds made for max_string=10 fit any larger limit, but not a smaller one or none
+    output = ListWriter()
+    Program('print "ab" * 5', optimize=True, limits=Limits(max_string=10)).run(
+        output=output, limits=Limits(max_string=20))
+    assert output.lines == ["ababababab"]
+    with pytest.raises(ValueError):
+        program.run(output=ListWriter(), limits=Limits(max_string=5))
+    with pytest.raises(ValueError):
+        Program(FOREVER, optimize=True).run(limits=Limits(max_string=10))
@@ -0,0 +1,62 @@
+import pytest
+
+from lox.output import ListWriter
+from lox.program import BACKENDS, Program
+
+GUARDS = """
+hits = 0
+if (false and seen("and")) {
+    hits = hits + 1
+}
+if (true or seen("or")) {
+    hits = hits + 1
+}
+if (true and seen("and right")) {
+    hits = hits + 1
+}
+if (false or seen("or right")) {
+    hits = hits + 1
+}
+print hits
+"""
+
+
+def run(source, backend="interpreter", optimize=False):
+    calls = []
+
+    def seen(label):
+        calls.append(label)
+        return True
+
+    output = ListWriter()
+    Program(source, natives={"seen": seen}, backend=backend, optimize=optimize).run(output=output)
+    return output.lines, calls
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_right_side_runs_only_when_the_left_does_not_decide(backend, optimize):
+    assert run(GUARDS, backend, optimize) == (["3"], ["and right", "or right"])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_guard_in_a_loop(backend):
+    source = """
+i = 0
+while (i < 10) {
+    if (i < 3 and seen(i)) {
+        i = i
+    }
+    i = i + 1
+}
+"""
+    assert run(source, backend) == ([], [0, 1, 2])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("expression, expected", [
+    ("false or 2", "2"), ("1 and 2", "2"), ("false and 1", "False"), ("0 or 1", "0"), ('"" and 3', "3"),
+])
+def test_operands_follow_lox_truthiness(backend, expression, expected):
+    # only false (and a native's None) is falsy, 0 and "" are not
+    assert run(f"print {expression}", backend)[0] == [expected]
@@ -0,0 +1,156 @@
+import pytest
+
+from lox.expressions import Binary, Literal
+from lox.optimizer import Optimizer
+from lox.output import ListWriter
+from lox.parser import Parser
+from lox.lexer import Lexer
+from lox.program import BACKENDS, Program
+from lox.statements import WhileStmt
+from lox.tokens import TokenType
+
+VALUES = {"true": True, "false": False, "3": 3, "2.5": 2.5, "-0.0": -0.0, '"ab"': "ab"}
+
+EXPRESSIONS = [
+    "x * 1", "1 * x", "x - 0", "x * 1.0", "x - 0.0", "x * true", "x - false",
+    "(x + x) * 1", "1 * (x * x)", "(x - x) - 0", "-x * 1", "-x - 0", "(x / 2) - 0", "(x * 1) * 1 - 0",
+    "2 * 3 + 4", "(1 + 2) * x", "1 / 0 * x", "-(-x)", "!x", '"a" + "b" + x', "1 - 0.5", "7 / 2 - 0",
+    "1 == 1.0", "-0.0 * 1", "0 - 0.0", "true and x", "false or x",
+]
+
+
+def run(source, x, **options):
+    # what the script prints and the error it ends with, if any
+    output = ListWriter()
+    try:
+        Program(source, globals=["x"], **options).run({"x": x}, output)
+    except Exception as error:
+        # "ab" - 0 raises Python's own TypeError
+        return output.lines, (type(error), str(error))
+    return output.lines, None
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_same_result_as_the_plain_interpreter(backend, expression):
+    source = f"print {expression}"
+    for name, x in VALUES.items():
+        assert run(source, x, backend=backend, optimize=True) == run(source, x), name
+
+
+def optimized(expression):
+    [stmt] = Optimizer().optimize(Parser(Lexer(f"print {expression}").tokenize()).parse())
+    return stmt.expression
+
+
+@pytest.mark.parametrize("expression, value", [
+    ("2 * 3 + 4", 10), ("(1 + 2) / 2", 1.5), ('"a" + 1 / 0', None), ("-(2 - 5)", 3), ("1 < 2 and 3", 3),
+])
+def test_literals_fold(expression, value):
+    expr = optimized(expression)
+    if value is None:
+        # 1 / 0 raises, so the whole expression is left for the run
+        assert isinstance(expr, Binary)
+    else:
+        assert isinstance(expr, Literal) and type(expr.value) is type(value) and expr.value == value
+
+
+@pytest.mark.parametrize("expression, top", [
+    # the result of + - * / is a number or a string, so the identity holds
+    ("(x + 1) * 1", TokenType.PLUS), ("1 * (x * 2)", TokenType.MUL), ("(x - 2) - 0", TokenType.MINUS),
+    ("(x / 2) - 0", TokenType.DIV),
+    # x may be a bool, and true * 1 is 1
+    ("x * 1", TokenType.MUL), ("x - 0", TokenType.MINUS),
+    # x + 1 may be a string
+    ("(x + 1) - 0", TokenType.MINUS),
+    # 1.0 and true would change the type
+    ("(x + 1) * 1.0", TokenType.MUL), ("(x * 2) * true", TokenType.MUL),
+])
+def test_identities(expression, top):
+    # the operator at the top of the tree once the identity is dropped, or kept
+    expr = optimized(expression)
+    assert isinstance(expr, Binary) and expr.operator.type == top
+
+
+HOISTING = [
+    # a * 10 looks invariant until the if assigns a
+    """
+a = 1
+i = 0
+total = 0
+while (i < 5) {
+    total = total + a * 10
+    if (i == 2) {
+        a = 2
+    }
+    i = i + 1
+}
+print total
+""",
+    # assigned in an else branch, and by an and's right operand
+    """
+a = 1
+b = 1
+i = 0
+while (i < 6) {
+    print a + b * 100
+    if (i < 2) {
+        i = i
+    } else {
+        a = a + 1
+    }
+    if (i == 3 and (b = 2) == 2) {
+        i = i
+    }
+    i = i + 1
+}
+""",
+    # assigned by an inner loop, and a bound the outer loop changes
+    """
+n = 2
+i = 0
+while (i < 3) {
+    j = 0
+    while (j < n) {
+        print n * 10 + j
+        j = j + 1
+    }
+    while (n < 4) {
+        n = n + 1
+    }
+    i = i + 1
+}
+""",
+    # truly invariant, but only reached on some iterations and raising there
+    """
+s = "a"
+i = 0
+while (i < 4) {
+    if (i == 3) {
+        print s - 1
+    }
+    print s + s
+    i = i + 1
+}
+""",
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("source", HOISTING)
+def test_hoisting_matches_the_plain_interpreter(backend, source):
+    expected = run(source, None)
+    assert run(source, None, backend=backend, optimize=True) == expected
+
+
+def loops(source):
+    return [stmt for stmt in Optimizer().optimize(Parser(Lexer(source).tokenize()).parse())
+            if isinstance(stmt, WhileStmt)]
+
+
+def test_only_invariants_are_hoisted():
+    [loop] = loops(HOISTING[0])
+    assert loop.invariants == 0
+    # s - 1 and s + s
+    [loop] = loops(HOISTING[3])
+    assert loop.invariants == 2
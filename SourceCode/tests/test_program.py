@@ -0,0 +1,36 @@
+import pytest
+
+from lox.output import ListWriter
+from lox.profiler import ProfilingInterpreter
+from lox.program import BACKENDS, CompileError, Program
+
+
+@pytest.mark.parametrize("source, phase", [('print "abc', "Lexer"), ("x = (1", "Parser")])
+def test_compile_errors_name_their_phase(source, phase):
+    with pytest.raises(CompileError) as error:
+        Program(source)
+    assert error.value.phase == phase
+    assert str(error.value) == str(error.value.__cause__)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_statements_compiled_one_at_a_time_share_globals(backend):
+    # what --stream does
+    program = Program("", backend=backend, optimize=True)
+    runner = program.runner(ListWriter())
+    for source in ["x = 1", "if (true) {\n    x = x + 1\n    y = 5\n}", "print x"]:
+        program.execute(runner, program.compile(Program.parse(source)))
+    assert runner.output.lines == ["2"]
+    # y was local to the block
+    with pytest.raises(RuntimeError, match="Undefined variable 'y'."):
+        program.execute(runner, program.compile(Program.parse("print y")))
+
+
+def test_profile_runner():
+    program = Program("i = 0\nwhile (i < 3) {\n    i = i + 1\n}")
+    runner = program.runner(ListWriter(), profile=True)
+    assert type(runner) is ProfilingInterpreter
+    program.execute(runner)
+    assert "WhileStmt" in runner.report("")
+    with pytest.raises(ValueError):
+        Program("print 1", backend="vm").runner(profile=True)
@@ -0,0 +1,43 @@
+import pytest
+
+from lox.output import ListWriter
+from lox.program import BACKENDS, Program
+from lox.pycompiler import InterpretedProgram, PyProgram
+
+LONG_CHAIN = "x = 1\ny = " + " + ".join(["x"] * 250) + "\nprint y"
+
+
+def nested_loops(depth):
+    # the outer three loops run twice, the others once
+    lines = ["i = 0"]
+    for level in range(depth):
+        lines += [f"k{level} = 0", f"while (k{level} < {2 if level < 3 else 1}) {{", f"k{level} = k{level} + 1"]
+    lines += ["i = i + 1"] + ["}"] * depth + ["print i"]
+    return "\n".join(lines)
+
+
+def run(source, backend):
+    output = ListWriter()
+    Program(source, backend=backend).run(output=output)
+    return output.lines
+
+
+@pytest.mark.parametrize("source, expected", [(LONG_CHAIN, "250"), (nested_loops(20), "8")])
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_deeply_nested_programs_run_on_every_backend(source, expected, backend):
+    assert run(source, backend) == [expected]
+
+
+@pytest.mark.parametrize("source", [LONG_CHAIN, nested_loops(20)])
+def test_too_deep_for_cpython_falls_back_to_the_interpreter(source):
+    assert type(Program(source, backend="python").code) is InterpretedProgram
+
+
+def test_shallow_programs_are_translated():
+    program = Program(nested_loops(3) + "\ny = " + " + ".join(["i"] * 20), backend="python")
+    assert type(program.code) is PyProgram
+
+
+def test_fallback_keeps_globals_between_runs():
+    program = Program(LONG_CHAIN.replace("x = 1\n", ""), globals=["x"], backend="python")
+    assert program.run(globals={"x": 2}, output=ListWriter())["y"] == 500
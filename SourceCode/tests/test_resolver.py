@@ -0,0 +1,85 @@
+import pytest
+
+from lox.expressions import Variable, children
+from lox.output import ListWriter
+from lox.program import BACKENDS, Program
+from lox.resolver import DYNAMIC, GLOBAL
+from tests.common import parse
+
+SHADOWING = """
+x = "global"
+if (true) {
+    if (true) {
+        x = "assigned"
+        y = "inner"
+        print y
+    }
+    y = "outer"
+    if (true) {
+        print y
+        y = y + "!"
+        z = "innermost"
+        if (true) {
+            print y + " " + z
+            z = z + "?"
+        }
+        print z
+    }
+    print x + " " + y
+}
+if (false or (w = 1) == 1) {
+    w = 2
+    print w
+}
+print x
+"""
+
+# what the interpreter looking every name up by walking the environment chain printed
+EXPECTED = ["inner", "outer", "outer! innermost", "innermost?", "assigned outer!", "2", "assigned"]
+
+
+def walk(node):
+    yield node
+    for child in children(node):
+        yield from walk(child)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_shadowing_in_nested_blocks(backend):
+    output = ListWriter()
+    Program(SHADOWING, backend=backend).run(output=output)
+    assert output.lines == EXPECTED
+
+
+def test_depths_and_slots():
+    reads = [(node.name.lexeme, node.name.line, node.depth, node.slot)
+             for stmt in parse(SHADOWING) for node in walk(stmt) if isinstance(node, Variable)]
+    assert reads == [
+        # the first y is local to the block it's assigned in
+        ("y", 7, 0, 0),
+        # the later y is the outer block's own
+        ("y", 11, 1, 0), ("y", 12, 1, 0),
+        # the innermost block only assigns z, so it has no frame to count
+        ("y", 15, 1, 0), ("z", 15, 0, 0), ("z", 16, 0, 0), ("z", 18, 0, 0),
+        ("x", 20, GLOBAL, None), ("y", 20, 0, 0),
+        # w is only bound if the or's right operand ran
+        ("w", 24, DYNAMIC, None),
+        ("x", 26, GLOBAL, None),
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_block_variables_end_with_the_block(backend):
+    source = """
+i = 0
+while (i < 3) {
+    total = i * 10
+    i = i + 1
+    print total
+}
+print total
+"""
+    output = ListWriter()
+    with pytest.raises(RuntimeError, match="Undefined variable 'total'."):
+        Program(source, backend=backend).run(output=output)
+    assert output.lines == ["0", "10", "20"]
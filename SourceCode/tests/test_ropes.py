@@ -0,0 +1,97 @@
+import pytest
+
+from lox.limits import Limits
+from lox.output import ListWriter
+from lox.program import BACKENDS, Program
+from lox.rope import ROPE_LENGTH, Rope
+
+LONG = "a" * ROPE_LENGTH
+
+APPEND = """
+s = ""
+i = 0
+while (i < 2000) {
+    s = s + "ab"
+    i = i + 1
+}
+"""
+
+
+def run(source, limits=None, **options):
+    output = ListWriter()
+    result = Program(source, **options).run(output=output, limits=limits)
+    return output.lines, result
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_long_constant_string_on_every_backend(backend, optimize):
+    half = "b" * ROPE_LENGTH
+    source = f's = "{half}" + "{half}"\nprint s + "x"'
+    lines, result = run(source, backend=backend, optimize=optimize)
+    assert lines == [half * 2 + "x"]
+    assert result["s"] == half * 2
+
+
+def test_appending_builds_a_rope_and_returns_a_str():
+    lines, result = run(APPEND + "print s")
+    assert lines == ["ab" * 2000]
+    assert type(result["s"]) is str
+
+
+def test_appending_to_an_older_rope_leaves_newer_ones_alone():
+    source = APPEND + 't = s + "x"\nu = s + "y"\nprint t\nprint u\nprint s'
+    lines, _ = run(source)
+    assert lines == ["ab" * 2000 + "x", "ab" * 2000 + "y", "ab" * 2000]
+
+
+def test_comparisons_flatten():
+    source = APPEND + 'print s == s + ""\nprint s != s + "x"\nprint s < s + "a"\nprint "ab" + s == "ab" + s'
+    lines, _ = run(source)
+    assert lines == ["True", "True", "True", "True"]
+
+
+def test_natives_get_plain_strings():
+    seen = []
+    program = Program(APPEND + "show(s)", globals=["show"], natives={"show": seen.append})
+    program.run(output=ListWriter())
+    assert seen == ["ab" * 2000]
+    assert type(seen[0]) is str
+
+
+@pytest.mark.parametrize("expression", ["5 < s", "s < 5", "s >= 1.5", "1 <= s", "s - 1", "1 - s", "-s", "s / 2"])
+@pytest.mark.parametrize("limits", [None, Limits(max_string=10 ** 6)])
+def test_errors_match_plain_strings(expression, limits):
+    # the same expression on a str that never became a Rope
+    plain = f's = "{"ab" * 100}"\nprint {expression}'
+    with pytest.raises(TypeError) as expected:
+        run(plain, limits)
+    with pytest.raises(TypeError) as roped:
+        run(APPEND + f"print {expression}", limits)
+    assert str(roped.value) == str(expected.value)
+
+
+def test_rope_compares_as_its_string():
+    rope = Rope([LONG, "b"], 2, ROPE_LENGTH + 1)
+    assert rope == LONG + "b"
+    assert LONG + "b" == rope
+    assert rope != 1
+    assert hash(rope) == hash(LONG + "b")
+
+
+@pytest.mark.parametrize("condition", ["s < 5", "s >= 1.5"])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_loop_condition_errors_match_plain_strings(condition, optimize):
+    # with optimize the condition is a Comparison, which the loop runs without visit_binary_expr
+    plain = f's = "{"ab" * 100}"\nwhile ({condition}) {{\n    s = 1\n}}'
+    with pytest.raises(TypeError) as expected:
+        run(plain, optimize=optimize)
+    with pytest.raises(TypeError) as roped:
+        run(APPEND + f"while ({condition}) {{\n    s = 1\n}}", optimize=optimize)
+    assert str(roped.value) == str(expected.value)
+
+
+def test_errors_in_a_loop_body_are_left_alone():
+    source = APPEND + "while (s != 1) {\n    x = -s\n}"
+    with pytest.raises(TypeError, match="bad operand type for unary -: 'str'"):
+        run(source, optimize=True)
@@ -0,0 +1,60 @@
+import pytest
+
+from lox.expressions import Binary, NumericBinary, Variable, children
+from lox.interpreter import Interpreter
+from lox.output import ListWriter
+from lox.program import Program
+from lox.rope import ROPE_LENGTH, Rope
+from lox.symbols import SYMBOLS
+from tests.common import parse
+
+# x + y runs on ints twice, specializing, and then on whatever x and y become
+SWITCHING = """
+z = 0
+x = 1
+y = 2
+i = 0
+while (i < 4) {
+    z = x + y
+    if (i == 1) {
+        x = a
+        y = b
+    }
+    i = i + 1
+}
+"""
+
+
+def plus(statements):
+    # the x + y node
+    nodes = list(statements)
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, Binary) and isinstance(node.left, Variable) and node.left.name.lexeme == "x":
+            return node
+        nodes.extend(children(node))
+
+
+def test_native_values_python_would_add():
+    # Python's + concatenates lists, add() refuses them
+    program = Program(SWITCHING, globals=["a", "b"])
+    with pytest.raises(RuntimeError, match="Operands must be two numbers or two strings"):
+        program.run({"a": [1], "b": [2]})
+    assert type(plus(program.code)) is Binary
+
+
+def test_strings_after_numbers_still_make_a_rope():
+    half = "h" * (ROPE_LENGTH // 2)
+    statements = parse(f'a = "{half}"\nb = "{half}"\n' + SWITCHING)
+    interpreter = Interpreter(ListWriter())
+    interpreter.interpret(statements)
+    assert type(interpreter.globals.get(SYMBOLS.intern("z"))) is Rope
+    assert type(plus(statements)) is Binary
+
+
+def test_numbers_stay_specialized():
+    statements = parse("a = 0.5\nb = 2\n" + SWITCHING)
+    interpreter = Interpreter(ListWriter())
+    interpreter.interpret(statements)
+    assert interpreter.globals.get(SYMBOLS.intern("z")) == 2.5
+    assert type(plus(statements)) is NumericBinary
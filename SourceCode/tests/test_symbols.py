@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from lox.symbols import SymbolTable
+
+
+def test_ids_follow_first_appearance():
+    table = SymbolTable()
+    assert [table.intern(name) for name in ["a", "b", "a", "c"]] == [0, 1, 0, 2]
+    assert table.names == ["a", "b", "c"]
+    assert len(table) == 3
+
+
+def test_interning_from_many_threads_gives_one_id_per_name():
+    table = SymbolTable()
+    threads = 8
+    barrier = Barrier(threads)
+
+    def intern_all(offset):
+        barrier.wait()
+        # every thread interns the same names, starting at different points
+        names = [f"name{i}" for i in range(2000)]
+        return {name: table.intern(name) for name in names[offset:] + names[:offset]}
+
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(intern_all, range(0, 2000, 2000 // threads)))
+    assert all(result == results[0] for result in results)
+    assert len(table) == 2000
+    assert all(table.names[symbol] == name for name, symbol in results[0].items())
@@ -0,0 +1,106 @@
+import pytest
+
+from lox.program import Program
+from lox.statements import WhileStmt
+
+LOOPS = [
+    """
+s = 0
+i = start
+while (i < n) {
+    s = s + i * i
+    i = i + 1
+}
+""",
+    # counting down, with the sum taken after the step
+    """
+s = 0
+i = start
+while (i > n) {
+    i = i - 3
+    s = s + i
+}
+""",
+    """
+s = 1
+i = start
+while (i >= n) {
+    s = s - i * (i - 1)
+    i = i - 2
+}
+""",
+    """
+s = 0
+r = 0
+i = start
+while (i <= n) {
+    s = s - i * i * i
+    r = 7 + r
+    i = 4 + i
+}
+""",
+]
+
+# counted loops without a closed form, run as translated to Python
+TRANSLATED = [
+    """
+t = 5
+i = start
+while (i > n) {
+    i = i - 3
+    t = 2 * i - t
+}
+""",
+    """
+s = 1
+i = start
+while (i >= n) {
+    s = i * (i - 1) - s
+    i = i - 2
+}
+""",
+]
+
+# the loops run zero times for some of these, and a step may overshoot the bound
+STARTS = [-7, 0, 3, 10]
+BOUNDS = [-5, 0, 3, 10, 2.5]
+
+
+def run(source, start, n, vectorize):
+    # the globals the loop leaves, input is bound to each run's own reader
+    program = Program(source, globals=["start", "n"], vectorize=vectorize)
+    results = program.run({"start": start, "n": n})
+    del results["input"]
+    return results
+
+
+@pytest.mark.parametrize("source", LOOPS + TRANSLATED)
+def test_same_globals_as_the_interpreted_loop(source):
+    for start in STARTS + [1.5]:
+        for n in BOUNDS:
+            expected = run(source, start, n, False)
+            result = run(source, start, n, True)
+            assert result == expected and [type(value) for value in result.values()] == \
+                [type(value) for value in expected.values()], (start, n)
+
+
+def kernel(source):
+    [loop] = [stmt for stmt in Program(source, globals=["start", "n"], vectorize=True).code
+              if isinstance(stmt, WhileStmt)]
+    return loop.kernel
+
+
+@pytest.mark.parametrize("source", LOOPS)
+def test_loops_have_a_closed_form(source):
+    assert kernel(source) is not None and kernel(source).sums is not None
+
+
+@pytest.mark.parametrize("source", TRANSLATED)
+def test_other_loops_are_translated(source):
+    assert kernel(source) is not None and kernel(source).sums is None
+
+
+def test_zero_iterations():
+    source = "s = 0\ni = start\nwhile (i > n) {\n    s = s + i\n    i = i - 1\n}"
+    for n in (3, 10):
+        assert run(source, 3, n, True) == {"start": 3, "n": n, "s": 0, "i": 3}
@@ -0,0 +1,80 @@
+import pytest
+
+from lox.bytecode import JUMPS
+from lox.compiler import Compiler
+from lox.interpreter import Interpreter
+from lox.output import ListWriter
+from lox.program import Program
+from lox.vm import VM
+from tests.common import parse
+
+SOURCE = """
+i = 0
+total = 0
+while (i < 10) {
+    total = total + i * 2 - 1
+    if (i == 3 or i >= 8) {
+        hit = i
+        print hit
+    }
+    i = i + 1
+}
+if (true) {
+    s = "a"
+    if (s == "a") {
+        s = s + "b"
+    }
+    print s
+}
+print total
+print !(total > 1) and true
+print -total / 4
+"""
+
+
+def run_vm(source):
+    vm = VM(ListWriter())
+    vm.run(Compiler().compile(parse(source)))
+    return vm.output.lines
+
+
+def test_output_matches_the_interpreter():
+    interpreter = Interpreter(ListWriter())
+    interpreter.interpret(parse(SOURCE))
+    assert run_vm(SOURCE) == interpreter.output.lines
+
+
+def test_instructions_resolve_jump_targets():
+    chunk = Compiler().compile(parse("i = 0\nwhile (i < 3) {\n    i = i + 1\n}"))
+    instructions = chunk.instructions()
+    assert instructions[-1] == (None, None)
+    assert chunk.instructions() is instructions
+    targets = [operand for op, operand in instructions if op in JUMPS]
+    assert targets and all(0 <= target < len(instructions) for target in targets)
+
+
+def test_empty_program():
+    assert run_vm("") == []
+
+
+def test_undefined_variable():
+    with pytest.raises(RuntimeError, match="Undefined variable 'missing'."):
+        run_vm("print missing")
+
+
+@pytest.mark.parametrize("source", ['print 1 + "a"', 'print "a" + false', 'print "a" + 1'])
+def test_add_needs_two_numbers_or_two_strings(source):
+    with pytest.raises(RuntimeError, match="Operands must be two numbers or two strings"):
+        run_vm(source)
+
+
+def test_add_takes_booleans_as_numbers():
+    assert run_vm("print true + 1\nprint 1.5 + 1") == ["2", "2.5"]
+
+
+@pytest.mark.parametrize("source", ["print 0.0\nprint -0.0 * 1.0", "print -0.0 * 1.0\nprint 0.0"])
+def test_signed_zeros_are_separate_constants(source):
+    # optimize folds -0.0 * 1.0 into a -0.0 literal
+    output = ListWriter()
+    Program(source, backend="vm", optimize=True).run(output=output)
+    assert sorted(output.lines) == ["-0.0", "0.0"]